@@ -0,0 +1,10 @@
+import os
+from typing import Dict
+
+# Variables set by an MPI launcher or singleton initialization. They are removed
+# from the environment of launched processes so each one starts a fresh job.
+MPI_ENV_PREFIXES = ("OMPI_", "PMIX_", "PMI_", "HYDRA_", "I_MPI_")
+
+
+def create_launch_env() -> Dict[str, str]:
+    return {k: v for k, v in os.environ.items() if not k.startswith(MPI_ENV_PREFIXES)}
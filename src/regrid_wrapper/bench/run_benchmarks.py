@@ -0,0 +1,58 @@
+import sys
+from typing import List
+
+import hydra
+from omegaconf import DictConfig
+
+from regrid_wrapper.bench.suite import (
+    BenchmarkConfig,
+    BenchmarkReport,
+    compare_reports,
+    format_comparisons,
+    run_benchmarks,
+)
+from regrid_wrapper.context.logging import LOGGER
+
+
+def do_run_benchmarks(cfg: BenchmarkConfig) -> BenchmarkReport | None:
+    logger = LOGGER.getChild("run_benchmarks")
+    logger.info(cfg)
+    report = run_benchmarks(cfg)
+    if report is None:
+        return None
+    report_path = cfg.report_path or cfg.work_directory / "bench-report.json"
+    report.save(report_path)
+    logger.info(f"wrote benchmark report: {report_path}")
+    return report
+
+
+def do_compare_baseline(cfg: BenchmarkConfig, report: BenchmarkReport) -> List[str]:
+    # Returns the cases slower than the baseline by more than the tolerance. A
+    # missing baseline is written from ``report``.
+    logger = LOGGER.getChild("run_benchmarks")
+    assert cfg.baseline_path is not None
+    if cfg.update_baseline or not cfg.baseline_path.exists():
+        report.save(cfg.baseline_path)
+        logger.info(f"wrote benchmark baseline: {cfg.baseline_path}")
+        return []
+    comparisons = compare_reports(report, BenchmarkReport.load(cfg.baseline_path))
+    logger.info("\n" + format_comparisons(comparisons, cfg.tolerance))
+    regressions = [ii.name for ii in comparisons if ii.is_regression(cfg.tolerance)]
+    if len(regressions) > 0:
+        logger.warning(f"benchmark regressions: {regressions}")
+    return regressions
+
+
+@hydra.main(version_base=None, config_path="conf", config_name="bench-config")
+def do_run_benchmarks_cli(cfg: DictConfig) -> None:
+    # Regressions exit with a non-zero status. Only rank 0 compares reports.
+    bench_cfg = BenchmarkConfig.model_validate(cfg)
+    report = do_run_benchmarks(bench_cfg)
+    if report is None or bench_cfg.baseline_path is None:
+        return
+    if len(do_compare_baseline(bench_cfg, report)) > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    do_run_benchmarks_cli()
@@ -0,0 +1,26 @@
+import hydra
+from omegaconf import DictConfig
+
+from regrid_wrapper.bench.scaling import ScalingConfig, ScalingReport, run_scaling
+from regrid_wrapper.context.logging import LOGGER
+
+
+def do_run_scaling(cfg: ScalingConfig) -> ScalingReport:
+    logger = LOGGER.getChild("run_scaling")
+    logger.info(cfg)
+    report = run_scaling(cfg)
+    report_path = cfg.report_path or cfg.work_directory / f"scaling-{cfg.mode}.json"
+    report.save(report_path)
+    logger.info(f"wrote scaling report: {report_path}")
+    logger.info("\n" + report.format())
+    return report
+
+
+@hydra.main(version_base=None, config_path="conf", config_name="scaling-config")
+def do_run_scaling_cli(cfg: DictConfig) -> None:
+    scaling_cfg = ScalingConfig.model_validate(cfg)
+    do_run_scaling(scaling_cfg)
+
+
+if __name__ == "__main__":
+    do_run_scaling_cli()
@@ -0,0 +1,182 @@
+import json
+import subprocess
+import sys
+from enum import StrEnum, unique
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from pydantic import BaseModel, Field
+
+from regrid_wrapper.bench.launch import create_launch_env
+from regrid_wrapper.bench.suite import BenchmarkReport
+from regrid_wrapper.context.common import PathType
+from regrid_wrapper.context.logging import LOGGER
+
+_LOGGER = LOGGER.getChild(__name__)
+
+
+@unique
+class ScalingMode(StrEnum):
+    # Fixed total problem size.
+    STRONG = "strong"
+    # Fixed problem size per rank. Source and destination rows grow with the
+    # number of ranks.
+    WEAK = "weak"
+
+
+class ScalingConfig(BaseModel):
+    work_directory: PathType
+    case: str = "dust"
+    mode: ScalingMode = ScalingMode.STRONG
+    nprocs: Tuple[int, ...] = Field(default=(1, 2, 4, 8), min_length=1)
+    # Shapes are ``(ny, nx)``. In weak mode they are the shapes for the first
+    # entry of ``nprocs``.
+    src_shape: Tuple[int, int] = (2700, 3950)
+    dst_shape: Tuple[int, int] = (232, 396)
+    ntime: int = Field(default=12, gt=0)
+    repeat: int = Field(default=3, gt=0)
+    mpirun: Tuple[str, ...] = ("mpirun",)
+    mpirun_args: Tuple[str, ...] = ()
+    report_path: PathType | None = None
+
+    def shapes(self, nproc: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        if self.mode == ScalingMode.STRONG:
+            return self.src_shape, self.dst_shape
+        factor = nproc / self.nprocs[0]
+        return (
+            (max(round(self.src_shape[0] * factor), 1), self.src_shape[1]),
+            (max(round(self.dst_shape[0] * factor), 1), self.dst_shape[1]),
+        )
+
+
+class PhaseScaling(BaseModel):
+    # Seconds per occurrence on the slowest rank.
+    time: float
+    speedup: float
+    efficiency: float
+
+
+class ScalingPoint(BaseModel):
+    nproc: int
+    src_shape: Tuple[int, int]
+    dst_shape: Tuple[int, int]
+    phases: Dict[str, PhaseScaling]
+
+
+class ScalingReport(BaseModel):
+    case: str
+    mode: ScalingMode
+    points: Tuple[ScalingPoint, ...]
+
+    def save(self, path: Path) -> None:
+        path.write_text(self.model_dump_json(indent=2))
+
+    @classmethod
+    def load(cls, path: Path) -> "ScalingReport":
+        return cls.model_validate(json.loads(path.read_text()))
+
+    def format(self) -> str:
+        lines = [
+            f"{'phase':<48}{'nproc':>7}{'time':>12}{'speedup':>10}{'efficiency':>12}"
+        ]
+        for phase in self.points[0].phases:
+            for point in self.points:
+                if phase not in point.phases:
+                    continue
+                ps = point.phases[phase]
+                lines.append(
+                    f"{phase:<48}{point.nproc:>7}{ps.time:>12.3f}"
+                    f"{ps.speedup:>10.2f}{ps.efficiency:>12.2f}"
+                )
+        return "\n".join(lines)
+
+
+def get_phase_times(report: BenchmarkReport, case: str) -> Dict[str, float]:
+    # Phases are the instrument spans opened while the case was running.
+    ret = {}
+    for name, stats in report.spans.items():
+        if name == case or name.startswith(f"{case}/"):
+            ret[name] = stats.max / max(stats.count, 1)
+    return ret
+
+
+def compute_scaling(
+    mode: ScalingMode, case: str, reports: List[BenchmarkReport]
+) -> ScalingReport:
+    # Speedup and efficiency are relative to the report with the fewest ranks.
+    # In weak mode efficiency is the base time over the current time and speedup
+    # is the scaled speedup.
+    reports = sorted(reports, key=lambda x: x.nproc)
+    base = reports[0]
+    base_times = get_phase_times(base, case)
+    points = []
+    for report in reports:
+        ratio = report.nproc / base.nproc
+        phases = {}
+        for name, value in get_phase_times(report, case).items():
+            if name not in base_times or value <= 0:
+                continue
+            relative = base_times[name] / value
+            if mode == ScalingMode.STRONG:
+                speedup, efficiency = relative, relative / ratio
+            else:
+                speedup, efficiency = relative * ratio, relative
+            phases[name] = PhaseScaling(
+                time=value, speedup=speedup, efficiency=efficiency
+            )
+        points.append(
+            ScalingPoint(
+                nproc=report.nproc,
+                src_shape=report.src_shape,
+                dst_shape=report.dst_shape,
+                phases=phases,
+            )
+        )
+    return ScalingReport(case=case, mode=mode, points=tuple(points))
+
+
+def create_benchmark_command(cfg: ScalingConfig, nproc: int) -> List[str]:
+    src_shape, dst_shape = cfg.shapes(nproc)
+    directory = cfg.work_directory / f"nproc-{nproc}"
+    data_directory = (
+        cfg.work_directory
+        / f"data-{src_shape[0]}x{src_shape[1]}-{dst_shape[0]}x{dst_shape[1]}"
+    )
+    overrides = [
+        f"work_directory={directory}",
+        f"data_directory={data_directory}",
+        f"src_shape=[{src_shape[0]},{src_shape[1]}]",
+        f"dst_shape=[{dst_shape[0]},{dst_shape[1]}]",
+        f"ntime={cfg.ntime}",
+        f"repeat={cfg.repeat}",
+        f"cases=[{cfg.case}]",
+        f"report_path={directory / 'bench-report.json'}",
+        f"hydra.run.dir={directory / 'hydra'}",
+    ]
+    return [
+        *cfg.mpirun,
+        "-n",
+        str(nproc),
+        *cfg.mpirun_args,
+        sys.executable,
+        "-m",
+        "regrid_wrapper.bench.run_benchmarks",
+        *overrides,
+    ]
+
+
+def run_scaling(cfg: ScalingConfig) -> ScalingReport:
+    # Runs serially outside of ``mpirun``. Each entry in ``nprocs`` is a separate
+    # benchmark job.
+    reports = []
+    for nproc in cfg.nprocs:
+        cmd = create_benchmark_command(cfg, nproc)
+        _LOGGER.info(f"running: {' '.join(cmd)}")
+        (cfg.work_directory / f"nproc-{nproc}").mkdir(parents=True, exist_ok=True)
+        subprocess.run(cmd, check=True, env=create_launch_env())
+        reports.append(
+            BenchmarkReport.load(
+                cfg.work_directory / f"nproc-{nproc}" / "bench-report.json"
+            )
+        )
+    return compute_scaling(cfg.mode, cfg.case, reports)
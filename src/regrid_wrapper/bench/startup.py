@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+from regrid_wrapper.bench.launch import create_launch_env
+
+# Entry points whose startup latency is guarded.
+STARTUP_MODULES = (
+    "regrid_wrapper.hydra.task_prep",
+    "regrid_wrapper.hydra.run_operations",
+)
+# Seconds allowed for importing an entry point in a fresh interpreter.
+IMPORT_TIME_BUDGET = 5.0
+
+
+def measure_import_time(module: str) -> float:
+    # Seconds spent importing ``module`` in a fresh interpreter, excluding
+    # interpreter startup.
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=create_launch_env(),
+    )
+    return float(result.stdout.strip().splitlines()[-1])
@@ -0,0 +1,576 @@
+import abc
+import json
+import shutil
+import statistics
+import time
+from pathlib import Path
+from typing import ClassVar, Dict, List, Tuple, Type
+
+from pydantic import BaseModel, Field
+
+from regrid_wrapper.bench.startup import STARTUP_MODULES, measure_import_time
+from regrid_wrapper.bench.synthetic import (
+    SyntheticGrid,
+    create_synthetic_rrfs_grid_file,
+    create_source_file,
+)
+from regrid_wrapper.concrete.rave_emissions import RaveEmissionsToRrfs
+from regrid_wrapper.concrete.rave_to_rrfs import RaveToRrfs
+from regrid_wrapper.concrete.rrfs_dust_data import RRFS_DUST_DATA_ENV, RrfsDustData
+from regrid_wrapper.concrete.rrfs_smoke_dust_veg_map import RrfsSmokeDustVegetationMap
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.common import PathType
+from regrid_wrapper.context.instrument import INSTRUMENT, SpanStats
+from regrid_wrapper.context.logging import LOGGER, open_shared_log_files
+from regrid_wrapper.esmpy.field_wrapper import (
+    FieldWrapper,
+    GridSpec,
+    GridWrapper,
+    NcToField,
+    NcToGrid,
+    load_variable_data,
+    open_nc,
+    resize_nc,
+)
+from regrid_wrapper.geom.bounding_box import BoundingBox
+from regrid_wrapper.model.spec import (
+    GenerateWeightFileAndRegridFields,
+    GenerateWeightFileSpec,
+    OutputEncodingSpec,
+    RegridRaveEmissionsSpec,
+)
+from regrid_wrapper.sparse.engine import SparseWeights, load_field_stack
+from regrid_wrapper.strategy.core import RegridProcessor
+
+_LOGGER = LOGGER.getChild(__name__)
+
+VEG_MAP_FIELD = "emiss_factor"
+RAVE_FIELDS = ("FRP_MEAN", "FRE")
+RAVE_HOURS = 3
+
+
+class BenchmarkConfig(BaseModel):
+    work_directory: PathType
+    # Synthetic inputs are reused when they already exist here. Defaults to a
+    # directory under ``work_directory``.
+    data_directory: PathType | None = None
+    # Shapes are ``(ny, nx)``. The defaults match the NA 3km sources and the
+    # CONUS 13km target.
+    src_shape: Tuple[int, int] = (2700, 3950)
+    dst_shape: Tuple[int, int] = (232, 396)
+    src_bbox: BoundingBox = BoundingBox(
+        min_lon=190.0, max_lon=330.0, min_lat=5.0, max_lat=75.0
+    )
+    dst_bbox: BoundingBox = BoundingBox(
+        min_lon=235.0, max_lon=295.0, min_lat=22.0, max_lat=52.0
+    )
+    ntime: int = Field(default=12, gt=0)
+    repeat: int = Field(default=3, gt=0)
+    cases: Tuple[str, ...] | None = None
+    baseline_path: PathType | None = None
+    report_path: PathType | None = None
+    update_baseline: bool = False
+    # Relative slowdown of the median time that counts as a regression.
+    tolerance: float = Field(default=0.1, ge=0)
+
+
+class SyntheticData(BaseModel):
+    directory: PathType
+
+    @property
+    def veg_map_path(self) -> Path:
+        return self.directory / "veg_map.nc"
+
+    @property
+    def dust_path(self) -> Path:
+        return self.directory / "dust12m_data.nc"
+
+    @property
+    def rave_grid_path(self) -> Path:
+        return self.directory / "grid_in.nc"
+
+    @property
+    def dst_grid_path(self) -> Path:
+        return self.directory / "ds_out_base.nc"
+
+    @property
+    def rave_paths(self) -> Tuple[Path, ...]:
+        # Hourly RAVE emissions on the RAVE grid.
+        stamps = [f"20230617{str(ii).zfill(2)}00" for ii in range(RAVE_HOURS)]
+        return tuple(
+            self.directory / f"Hourly_Emissions_3km_{ii}_{ii}.nc" for ii in stamps
+        )
+
+    @property
+    def paths(self) -> Tuple[Path, ...]:
+        return (
+            self.veg_map_path,
+            self.dust_path,
+            self.rave_grid_path,
+            self.dst_grid_path,
+        ) + self.rave_paths
+
+    def create(self, cfg: BenchmarkConfig) -> None:
+        if COMM.rank == 0 and all(ii.exists() for ii in self.paths):
+            _LOGGER.info(f"reusing synthetic data: {self.directory}")
+        elif COMM.rank == 0:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            src_grid = SyntheticGrid(shape=cfg.src_shape, bbox=cfg.src_bbox)
+            dst_grid = SyntheticGrid(shape=cfg.dst_shape, bbox=cfg.dst_bbox)
+            _LOGGER.info(f"creating synthetic data: {self.directory}")
+            create_source_file(self.veg_map_path, src_grid, fields=[VEG_MAP_FIELD])
+            create_source_file(
+                self.dust_path,
+                src_grid,
+                timed_fields=RRFS_DUST_DATA_ENV.fields,
+                ntime=cfg.ntime,
+            )
+            create_synthetic_rrfs_grid_file(self.rave_grid_path, src_grid)
+            create_synthetic_rrfs_grid_file(self.dst_grid_path, dst_grid)
+            for path in self.rave_paths:
+                create_synthetic_rrfs_grid_file(
+                    path, src_grid, fields=RAVE_FIELDS, with_corners=False
+                )
+        COMM.barrier()
+
+
+class AbstractBenchmarkCase(abc.ABC):
+    name: ClassVar[str]
+
+    def __init__(self, data: SyntheticData, directory: Path) -> None:
+        self._data = data
+        self._directory = directory
+
+    def setup(self, iteration: int) -> None:
+        # Work done here is not timed.
+        if COMM.rank == 0:
+            self._directory.mkdir(parents=True, exist_ok=True)
+        COMM.barrier()
+
+    @abc.abstractmethod
+    def run(self, iteration: int) -> None: ...
+
+    def teardown(self, iteration: int) -> None: ...
+
+
+class LoadGridCase(AbstractBenchmarkCase):
+    name = "load_grid"
+
+    def run(self, iteration: int) -> None:
+        nc2grid = _create_source_grid_definition_(self._data.dust_path)
+        nc2grid.create_uncached_grid_wrapper().value.destroy()
+
+
+class LoadFieldCase(AbstractBenchmarkCase):
+    name = "load_field"
+
+    def setup(self, iteration: int) -> None:
+        super().setup(iteration)
+        nc2grid = _create_source_grid_definition_(self._data.dust_path)
+        self._gwrap = nc2grid.create_uncached_grid_wrapper()
+
+    def run(self, iteration: int) -> None:
+        fwrap = _create_dust_field_wrapper_(self._data.dust_path, self._gwrap)
+        fwrap.value.destroy()
+
+    def teardown(self, iteration: int) -> None:
+        self._gwrap.value.destroy()
+
+
+class LoadVariableCase(AbstractBenchmarkCase):
+    # Reads the data of a dust field without creating the field. The masked
+    # case is the netCDF4 default of building a masked array. It costs time
+    # only: reading a 46 MiB field took 0.06-0.07 s masked against 0.03-0.04 s
+    # raw with the same traced memory peak.
+    name = "load_variable"
+    raw: ClassVar[bool] = True
+
+    def setup(self, iteration: int) -> None:
+        super().setup(iteration)
+        nc2grid = _create_source_grid_definition_(self._data.dust_path)
+        gwrap = nc2grid.create_uncached_grid_wrapper()
+        fwrap = _create_dust_field_wrapper_(self._data.dust_path, gwrap)
+        self._dims = fwrap.dims
+        fwrap.value.destroy()
+        gwrap.value.destroy()
+
+    def run(self, iteration: int) -> None:
+        with open_nc(self._data.dust_path) as ds:
+            _ = load_variable_data(
+                ds.variables[RRFS_DUST_DATA_ENV.fields[0]], self._dims, raw=self.raw
+            )
+
+
+class LoadVariableMaskedCase(LoadVariableCase):
+    name = "load_variable_masked"
+    raw = False
+
+
+class ResizeNcCase(AbstractBenchmarkCase):
+    name = "resize_nc"
+
+    def setup(self, iteration: int) -> None:
+        super().setup(iteration)
+        with open_nc(self._data.dst_grid_path) as ds:
+            ny, nx = ds.variables["grid_latt"].shape
+        with open_nc(self._data.dust_path) as ds:
+            ntime = ds.dimensions[RRFS_DUST_DATA_ENV.dim_time].size
+        self._new_sizes = {"lat": ny, "lon": nx, RRFS_DUST_DATA_ENV.dim_time: ntime}
+
+    def run(self, iteration: int) -> None:
+        resize_nc(
+            self._data.dust_path,
+            self._directory / f"resized-{iteration}.nc",
+            self._new_sizes,
+            copy_values_for=[RRFS_DUST_DATA_ENV.dim_time],
+        )
+
+
+class FillNcVariableCase(AbstractBenchmarkCase):
+    name = "fill_nc_variable"
+
+    def setup(self, iteration: int) -> None:
+        super().setup(iteration)
+        self._path = self._directory / f"filled-{iteration}.nc"
+        if COMM.rank == 0:
+            shutil.copyfile(self._data.dust_path, self._path)
+        COMM.barrier()
+        nc2grid = _create_source_grid_definition_(self._path)
+        self._fwrap = _create_dust_field_wrapper_(
+            self._path, nc2grid.create_uncached_grid_wrapper()
+        )
+
+    def run(self, iteration: int) -> None:
+        self._fwrap.fill_nc_variable(self._path)
+
+    def teardown(self, iteration: int) -> None:
+        self._fwrap.value.destroy()
+        self._fwrap.gwrap.value.destroy()
+
+
+class VegMapCase(AbstractBenchmarkCase):
+    name = "veg_map"
+
+    def run(self, iteration: int) -> None:
+        output_directory = self._directory / str(iteration)
+        if COMM.rank == 0:
+            output_directory.mkdir()
+        COMM.barrier()
+        spec = GenerateWeightFileAndRegridFields(
+            src_path=self._data.veg_map_path,
+            dst_path=self._data.dst_grid_path,
+            output_weight_filename=output_directory / "weights.nc",
+            output_filename=output_directory / "veg_map.nc",
+            fields=(VEG_MAP_FIELD,),
+            name=self.name,
+        )
+        RegridProcessor(RrfsSmokeDustVegetationMap(spec=spec)).execute()
+
+
+class DustCase(AbstractBenchmarkCase):
+    name = "dust"
+    encoding: ClassVar[OutputEncodingSpec | None] = None
+
+    def run(self, iteration: int) -> None:
+        op = _create_dust_operation_(
+            self._data, self._directory, iteration, encoding=self.encoding
+        )
+        RegridProcessor(op).execute()
+
+    def teardown(self, iteration: int) -> None:
+        if COMM.rank == 0:
+            path = self._directory / str(iteration) / "dust12m_data.nc"
+            _LOGGER.info("%s output bytes: %d", self.name, path.stat().st_size)
+
+
+class DustZlibCase(DustCase):
+    name = "dust_zlib"
+    encoding = OutputEncodingSpec(zlib=True)
+
+
+class ReadOutputCase(AbstractBenchmarkCase):
+    # Reads every field of a dust output written with ``encoding``.
+    name = "read_output"
+    encoding: ClassVar[OutputEncodingSpec | None] = None
+
+    def setup(self, iteration: int) -> None:
+        super().setup(iteration)
+        self._path = self._directory / "output" / "dust12m_data.nc"
+        exists = COMM.bcast({"exists": self._path.exists()}, root=0)["exists"]
+        if not exists:
+            op = _create_dust_operation_(
+                self._data, self._directory, "output", encoding=self.encoding
+            )
+            RegridProcessor(op).execute()
+        nc2grid = _create_source_grid_definition_(self._path)
+        self._gwrap = nc2grid.create_uncached_grid_wrapper()
+
+    def run(self, iteration: int) -> None:
+        for field in RRFS_DUST_DATA_ENV.fields:
+            fwrap = _create_dust_field_wrapper_(self._path, self._gwrap, name=field)
+            fwrap.value.destroy()
+
+    def teardown(self, iteration: int) -> None:
+        self._gwrap.value.destroy()
+
+
+class ReadOutputZlibCase(ReadOutputCase):
+    name = "read_output_zlib"
+    encoding = OutputEncodingSpec(zlib=True)
+
+
+class RaveToRrfsCase(AbstractBenchmarkCase):
+    name = "rave_to_rrfs"
+
+    def run(self, iteration: int) -> None:
+        spec = GenerateWeightFileSpec(
+            src_path=self._data.rave_grid_path,
+            dst_path=self._data.dst_grid_path,
+            output_weight_filename=self._directory / f"weights-{iteration}.nc",
+            name=self.name,
+        )
+        RegridProcessor(RaveToRrfs(spec=spec)).execute()
+
+
+class RaveEmissionsCase(AbstractBenchmarkCase):
+    name = "rave_emissions"
+
+    def setup(self, iteration: int) -> None:
+        super().setup(iteration)
+        self._weight_path = _create_rave_weights_(self._data, self._directory)
+
+    def run(self, iteration: int) -> None:
+        spec = RegridRaveEmissionsSpec(
+            src_paths=self._data.rave_paths,
+            dst_path=self._data.dst_grid_path,
+            weight_filename=self._weight_path,
+            output_directory=self._directory / str(iteration),
+            fields=RAVE_FIELDS,
+            name=self.name,
+        )
+        RegridProcessor(RaveEmissionsToRrfs(spec=spec)).execute()
+
+
+class SparseApplyCase(AbstractBenchmarkCase):
+    # Applies the RAVE weights to the fields of one hour on every rank.
+    name = "sparse_apply"
+
+    def setup(self, iteration: int) -> None:
+        super().setup(iteration)
+        weight_path = _create_rave_weights_(self._data, self._directory)
+        self._stack = load_field_stack(self._data.rave_paths[0], RAVE_FIELDS)
+        with open_nc(self._data.dst_grid_path) as ds:
+            dst_shape = ds.variables["grid_latt"].shape
+        self._weights = SparseWeights.from_file(
+            weight_path, self._stack.shape[-2:], dst_shape
+        )
+
+    def run(self, iteration: int) -> None:
+        _ = self._weights.apply(self._stack)
+
+    def teardown(self, iteration: int) -> None:
+        del self._stack, self._weights
+
+
+class AbstractImportCase(AbstractBenchmarkCase):
+    module: ClassVar[str]
+
+    def run(self, iteration: int) -> None:
+        if COMM.rank == 0:
+            _ = measure_import_time(self.module)
+
+
+class ImportTaskPrepCase(AbstractImportCase):
+    name = "import_task_prep"
+    module = STARTUP_MODULES[0]
+
+
+class ImportRunOperationsCase(AbstractImportCase):
+    name = "import_run_operations"
+    module = STARTUP_MODULES[1]
+
+
+def _create_dust_operation_(
+    data: SyntheticData,
+    directory: Path,
+    iteration: int | str,
+    encoding: OutputEncodingSpec | None = None,
+) -> RrfsDustData:
+    output_directory = directory / str(iteration)
+    if COMM.rank == 0:
+        output_directory.mkdir()
+    COMM.barrier()
+    spec = GenerateWeightFileAndRegridFields(
+        src_path=data.dust_path,
+        dst_path=data.dst_grid_path,
+        output_weight_filename=output_directory / "weights.nc",
+        output_filename=output_directory / "dust12m_data.nc",
+        fields=RRFS_DUST_DATA_ENV.fields,
+        name=DustCase.name,
+        output_encoding=encoding,
+    )
+    return RrfsDustData(spec=spec)
+
+
+def _create_rave_weights_(data: SyntheticData, directory: Path) -> Path:
+    # Weights from the RAVE grid to the destination grid. They are generated
+    # once per case directory.
+    path = directory / "weights.nc"
+    exists = COMM.bcast({"exists": path.exists()}, root=0)["exists"]
+    if not exists:
+        spec = GenerateWeightFileSpec(
+            src_path=data.rave_grid_path,
+            dst_path=data.dst_grid_path,
+            output_weight_filename=path,
+            name=RaveToRrfsCase.name,
+        )
+        RegridProcessor(RaveToRrfs(spec=spec)).execute()
+    return path
+
+
+def _create_source_grid_definition_(path: Path) -> NcToGrid:
+    return NcToGrid(
+        path=path,
+        spec=GridSpec(
+            x_center="geolon", y_center="geolat", x_dim=("lon",), y_dim=("lat",)
+        ),
+    )
+
+
+def _create_dust_field_wrapper_(
+    path: Path, gwrap: GridWrapper, name: str = RRFS_DUST_DATA_ENV.fields[0]
+) -> FieldWrapper:
+    nc2field = NcToField(
+        path=path,
+        name=name,
+        dim_time=(RRFS_DUST_DATA_ENV.dim_time,),
+        gwrap=gwrap,
+    )
+    return nc2field.create_field_wrapper()
+
+
+BENCHMARK_CASES: Dict[str, Type[AbstractBenchmarkCase]] = {
+    ii.name: ii
+    for ii in [
+        LoadGridCase,
+        LoadFieldCase,
+        LoadVariableCase,
+        LoadVariableMaskedCase,
+        ResizeNcCase,
+        FillNcVariableCase,
+        VegMapCase,
+        DustCase,
+        DustZlibCase,
+        ReadOutputCase,
+        ReadOutputZlibCase,
+        RaveToRrfsCase,
+        RaveEmissionsCase,
+        SparseApplyCase,
+        ImportTaskPrepCase,
+        ImportRunOperationsCase,
+    ]
+}
+
+
+class BenchmarkResult(BaseModel):
+    # Wall-clock seconds between barriers for each repeat.
+    times: Tuple[float, ...]
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+
+class BenchmarkReport(BaseModel):
+    nproc: int
+    src_shape: Tuple[int, int]
+    dst_shape: Tuple[int, int]
+    results: Dict[str, BenchmarkResult]
+    spans: Dict[str, SpanStats]
+
+    def save(self, path: Path) -> None:
+        path.write_text(self.model_dump_json(indent=2))
+
+    @classmethod
+    def load(cls, path: Path) -> "BenchmarkReport":
+        return cls.model_validate(json.loads(path.read_text()))
+
+
+class BenchmarkComparison(BaseModel):
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+    def is_regression(self, tolerance: float) -> bool:
+        return self.ratio > 1.0 + tolerance
+
+
+def compare_reports(
+    current: BenchmarkReport, baseline: BenchmarkReport
+) -> List[BenchmarkComparison]:
+    if (current.src_shape, current.dst_shape, current.nproc) != (
+        baseline.src_shape,
+        baseline.dst_shape,
+        baseline.nproc,
+    ):
+        _LOGGER.warning("baseline was recorded with different sizes or nproc")
+    return [
+        BenchmarkComparison(
+            name=name,
+            baseline=baseline.results[name].median,
+            current=result.median,
+        )
+        for name, result in current.results.items()
+        if name in baseline.results
+    ]
+
+
+def format_comparisons(comparisons: List[BenchmarkComparison], tolerance: float) -> str:
+    lines = [f"{'case':<20}{'baseline':>12}{'current':>12}{'ratio':>8}"]
+    for ii in comparisons:
+        flag = "  REGRESSION" if ii.is_regression(tolerance) else ""
+        lines.append(
+            f"{ii.name:<20}{ii.baseline:>12.3f}{ii.current:>12.3f}{ii.ratio:>8.2f}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def run_benchmarks(cfg: BenchmarkConfig) -> BenchmarkReport | None:
+    # Collective over all ranks. Only rank 0 receives the report.
+    open_shared_log_files()
+    data = SyntheticData(directory=cfg.data_directory or cfg.work_directory / "data")
+    data.create(cfg)
+    import esmpy
+
+    names = cfg.cases if cfg.cases is not None else tuple(BENCHMARK_CASES)
+    _ = esmpy.Manager()
+    INSTRUMENT.reset()
+    results = {}
+    for name in names:
+        case = BENCHMARK_CASES[name](data, cfg.work_directory / name)
+        times = []
+        for iteration in range(cfg.repeat):
+            case.setup(iteration)
+            COMM.barrier()
+            start = time.perf_counter()
+            with INSTRUMENT.span(name):
+                case.run(iteration)
+            COMM.barrier()
+            times.append(time.perf_counter() - start)
+            case.teardown(iteration)
+        results[name] = BenchmarkResult(times=tuple(times))
+        _LOGGER.info(f"benchmark {name}: median={results[name].median:.3f}s")
+    run_report = INSTRUMENT.reduce()
+    if run_report is None:
+        return None
+    return BenchmarkReport(
+        nproc=COMM.size,
+        src_shape=cfg.src_shape,
+        dst_shape=cfg.dst_shape,
+        results=results,
+        spans=run_report.spans,
+    )
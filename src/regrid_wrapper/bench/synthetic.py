@@ -0,0 +1,133 @@
+from pathlib import Path
+from typing import Sequence, Tuple
+
+import netCDF4 as nc
+import numpy as np
+from pydantic import BaseModel, Field
+
+from regrid_wrapper.geom.bounding_box import BoundingBox
+
+# Rows are written in blocks so production-sized files never have to fit in
+# memory at once.
+ROW_BLOCK_SIZE = 256
+
+
+class SyntheticGrid(BaseModel):
+    # ``shape`` is ``(ny, nx)``. Coordinates are a regular mesh over ``bbox``
+    # with sinusoidal distortion so the grid is curvilinear.
+    shape: Tuple[int, int]
+    bbox: BoundingBox
+    distortion: float = Field(default=0.05, ge=0, lt=0.5)
+
+    def centers(self, rows: slice) -> Tuple[np.ndarray, np.ndarray]:
+        ny, nx = self.shape
+        return self._coords_(
+            np.arange(ny, dtype=float)[rows] + 0.5, np.arange(nx, dtype=float) + 0.5
+        )
+
+    def corners(self, rows: slice) -> Tuple[np.ndarray, np.ndarray]:
+        ny, nx = self.shape
+        return self._coords_(
+            np.arange(ny + 1, dtype=float)[rows], np.arange(nx + 1, dtype=float)
+        )
+
+    def _coords_(self, jj: np.ndarray, ii: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        ny, nx = self.shape
+        dlon = self.bbox.width / nx
+        dlat = self.bbox.height / ny
+        jj_mesh, ii_mesh = np.meshgrid(jj, ii, indexing="ij")
+        lon = (
+            self.bbox.min_lon
+            + ii_mesh * dlon
+            + self.distortion * dlon * np.sin(2 * np.pi * jj_mesh / ny)
+        )
+        lat = (
+            self.bbox.min_lat
+            + jj_mesh * dlat
+            + self.distortion * dlat * np.sin(2 * np.pi * ii_mesh / nx)
+        )
+        return lon, lat
+
+
+def create_analytic_field(lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    deg_to_rad = np.pi / 180.0
+    return 2.0 + np.cos(deg_to_rad * lon) ** 2 * np.cos(2.0 * deg_to_rad * (90.0 - lat))
+
+
+def _iter_row_blocks_(nrows: int) -> Sequence[slice]:
+    return [
+        slice(start, min(start + ROW_BLOCK_SIZE, nrows))
+        for start in range(0, nrows, ROW_BLOCK_SIZE)
+    ]
+
+
+def create_synthetic_rrfs_grid_file(
+    path: Path,
+    grid: SyntheticGrid,
+    fields: Sequence[str] = (),
+    with_corners: bool = True,
+) -> None:
+    # Matches the layout of ``ds_out_base.nc`` and the RAVE ``grid_in.nc``. RAVE
+    # emissions files have fields and no corners.
+    ny, nx = grid.shape
+    with nc.Dataset(path, "w") as ds:
+        ds.createDimension("grid_yt", ny)
+        ds.createDimension("grid_xt", nx)
+        lont = ds.createVariable("grid_lont", float, ("grid_yt", "grid_xt"))
+        latt = ds.createVariable("grid_latt", float, ("grid_yt", "grid_xt"))
+        field_vars = [
+            ds.createVariable(ii, float, ("grid_yt", "grid_xt")) for ii in fields
+        ]
+        for rows in _iter_row_blocks_(ny):
+            lon, lat = grid.centers(rows)
+            lont[rows] = lon
+            latt[rows] = lat
+            for var in field_vars:
+                var[rows] = create_analytic_field(lon, lat)
+        if not with_corners:
+            return
+        ds.createDimension("grid_y", ny + 1)
+        ds.createDimension("grid_x", nx + 1)
+        lonc = ds.createVariable("grid_lon", float, ("grid_y", "grid_x"))
+        latc = ds.createVariable("grid_lat", float, ("grid_y", "grid_x"))
+        for rows in _iter_row_blocks_(ny + 1):
+            lon, lat = grid.corners(rows)
+            lonc[rows] = lon
+            latc[rows] = lat
+
+
+def create_source_file(
+    path: Path,
+    grid: SyntheticGrid,
+    fields: Sequence[str] = (),
+    timed_fields: Sequence[str] = (),
+    ntime: int = 12,
+) -> None:
+    # Matches the NA 3km ``veg_map.nc`` and ``dust12m_data.nc`` layout. ``fields``
+    # are 2D and ``timed_fields`` carry a leading time dimension, which is only
+    # created when there are timed fields.
+    ny, nx = grid.shape
+    with nc.Dataset(path, "w") as ds:
+        ds.createDimension("lat", ny)
+        ds.createDimension("lon", nx)
+        if timed_fields:
+            ds.createDimension("time", ntime)
+            ds.createVariable("time", float, ("time",))[:] = np.arange(
+                ntime, dtype=float
+            )
+        geolon = ds.createVariable("geolon", float, ("lat", "lon"))
+        geolat = ds.createVariable("geolat", float, ("lat", "lon"))
+        field_vars = [ds.createVariable(ii, float, ("lat", "lon")) for ii in fields]
+        timed_vars = [
+            ds.createVariable(ii, float, ("time", "lat", "lon")) for ii in timed_fields
+        ]
+        for rows in _iter_row_blocks_(ny):
+            lon, lat = grid.centers(rows)
+            geolon[rows] = lon
+            geolat[rows] = lat
+            values = create_analytic_field(lon, lat)
+            for var in field_vars:
+                var[rows] = values
+            for var in timed_vars:
+                for tidx in range(ntime):
+                    var[tidx, rows] = (tidx + 1) * values
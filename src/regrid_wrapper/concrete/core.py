@@ -1,63 +1,234 @@
-from typing import Iterator
+from pathlib import Path
+from typing import Collection, Dict, Iterator, List, Sequence, Tuple
 
+from regrid_wrapper.concrete.rave_emissions import (
+    RaveEmissionsToRrfs,
+    select_rave_paths,
+)
 from regrid_wrapper.concrete.rave_to_rrfs import RaveToRrfs
 from regrid_wrapper.concrete.rrfs_dust_data import RRFS_DUST_DATA_ENV, RrfsDustData
 from regrid_wrapper.concrete.rrfs_smoke_dust_veg_map import RrfsSmokeDustVegetationMap
 from regrid_wrapper.context.logging import LOGGER
-from regrid_wrapper.model.config import SmokeDustRegridConfig, ComponentKey
+from regrid_wrapper.model.config import (
+    SmokeDustRegridConfig,
+    ComponentKey,
+    RrfsGridKey,
+)
 from regrid_wrapper.model.spec import (
     GenerateWeightFileAndRegridFields,
     GenerateWeightFileSpec,
+    RegridFieldsFromWeightFile,
+    RegridFieldsSpec,
+    RegridRaveEmissionsSpec,
 )
+from regrid_wrapper.strategy.multi_target import MultiTargetRegridOperation
 from regrid_wrapper.strategy.operation import AbstractRegridOperation
 
 
-def iter_operations(cfg: SmokeDustRegridConfig) -> Iterator[AbstractRegridOperation]:
-    logger = LOGGER.getChild("iter_operations")
+def _create_regrid_fields_spec_(
+    cfg: SmokeDustRegridConfig,
+    target_grid: RrfsGridKey,
+    src_path: Path,
+    dst_path: Path,
+    weight_filename: str,
+    output_filename: Path,
+    fields: Tuple[str, ...],
+    name: str,
+) -> RegridFieldsSpec:
+    previous_weight_path = cfg.previous_weight_path(target_grid, weight_filename)
+    if previous_weight_path is not None:
+        return RegridFieldsFromWeightFile(
+            src_path=src_path,
+            dst_path=dst_path,
+            weight_filename=previous_weight_path,
+            output_filename=output_filename,
+            fields=fields,
+            name=name,
+            resume=cfg.resume,
+            output_encoding=cfg.output_encoding,
+            precision=cfg.precision,
+            time_chunk_size=cfg.time_chunk_size,
+        )
+    return GenerateWeightFileAndRegridFields(
+        src_path=src_path,
+        dst_path=dst_path,
+        output_weight_filename=cfg.output_directory(target_grid) / weight_filename,
+        output_filename=output_filename,
+        fields=fields,
+        name=name,
+        weight_cache=cfg.weight_cache,
+        resume=cfg.resume,
+        output_encoding=cfg.output_encoding,
+        precision=cfg.precision,
+        time_chunk_size=cfg.time_chunk_size,
+    )
+
+
+def _create_rave_emissions_operation_(
+    cfg: SmokeDustRegridConfig,
+    target_grid: RrfsGridKey,
+    weight_filename: Path,
+    name: str,
+) -> RaveEmissionsToRrfs:
+    assert cfg.rave_emissions is not None
+    spec = RegridRaveEmissionsSpec(
+        src_paths=select_rave_paths(
+            cfg.rave_emissions.src_glob,
+            start=cfg.rave_emissions.start,
+            end=cfg.rave_emissions.end,
+        ),
+        dst_path=cfg.model_grid_path(target_grid),
+        weight_filename=weight_filename,
+        output_directory=cfg.rave_emissions_output_directory(target_grid),
+        fields=cfg.rave_emissions.fields,
+        max_in_flight=cfg.rave_emissions.max_in_flight,
+        name=name,
+        resume=cfg.resume,
+        output_encoding=cfg.output_encoding,
+    )
+    return RaveEmissionsToRrfs(spec=spec)
+
+
+FusibleOperation = RrfsDustData | RrfsSmokeDustVegetationMap
+
+
+def fuse_operations(
+    ops: Sequence[AbstractRegridOperation],
+) -> List[AbstractRegridOperation]:
+    # Operations regridding between the same coordinates with the same method
+    # share the weights generated by the first of them. Every operation still
+    # writes its own output and weight file.
+    logger = LOGGER.getChild("fuse_operations")
+    leaders: Dict[Tuple[str, str, str], Path] = {}
+    ret = []
+    for op in ops:
+        if not isinstance(op, FusibleOperation) or not isinstance(
+            op.spec, GenerateWeightFileAndRegridFields
+        ):
+            ret.append(op)
+            continue
+        src_grid_def, dst_grid_def = op.grid_definitions()
+        key = (
+            src_grid_def.fingerprint(),
+            dst_grid_def.fingerprint(),
+            op.regrid_options().model_dump_json(),
+        )
+        if key not in leaders:
+            leaders[key] = op.spec.output_weight_filename
+            ret.append(op)
+            continue
+        logger.info(f"fusing {op.spec.name} with weights: {leaders[key]}")
+        spec = op.spec.model_copy(update={"shared_weight_filename": leaders[key]})
+        ret.append(type(op)(spec=spec))
+    return ret
+
+
+def group_multi_target_operations(
+    ops: Sequence[AbstractRegridOperation],
+) -> List[AbstractRegridOperation]:
+    # Field operations reading the same source file run as one operation so the
+    # source fields are loaded once for all target grids. Groups take the position
+    # of their first member.
+    groups: Dict[Tuple[type, Path], List[AbstractRegridOperation]] = {}
+    order: List[AbstractRegridOperation | Tuple[type, Path]] = []
+    for op in ops:
+        if not isinstance(op, FusibleOperation):
+            order.append(op)
+            continue
+        key = (type(op), op.spec.src_path)
+        if key not in groups:
+            groups[key] = []
+            order.append(key)
+        groups[key].append(op)
+
+    ret = []
+    for item in order:
+        if not isinstance(item, tuple):
+            ret.append(item)
+        elif len(groups[item]) == 1:
+            ret.append(groups[item][0])
+        else:
+            ret.append(MultiTargetRegridOperation(groups[item]))
+    return ret
+
+
+def iter_operations(
+    cfg: SmokeDustRegridConfig, names: Collection[str] | None = None
+) -> Iterator[AbstractRegridOperation]:
+    # Filtering by name happens before the specs are created since spec validation
+    # fails once another process has written an operation's outputs.
+    ops = []
     for target_grid in cfg.target_grids:
-        for target_component in cfg.target_components:
-            name = f"{target_grid}-{target_component}"
-            logger.debug(f"creating operation: {name}")
-            output_directory = cfg.output_directory(target_grid)
-            model_grid_path = cfg.model_grid_path(target_grid)
-            match target_component:
-                case ComponentKey.VEG_MAP:
-                    spec = GenerateWeightFileAndRegridFields(
-                        src_path=cfg.source_definition.components[
-                            target_component
-                        ].grid,
-                        dst_path=model_grid_path,
-                        output_weight_filename=output_directory
-                        / f"weights-veg_map-NA_3km-to-{target_grid}.nc",
-                        output_filename=output_directory / "veg_map.nc",
-                        fields=["emiss_factor"],
-                        name=name,
-                    )
-                    yield RrfsSmokeDustVegetationMap(spec=spec)
-                case ComponentKey.RAVE_GRID:
+        target_ops = list(_iter_target_grid_operations_(cfg, target_grid, names))
+        if cfg.fuse_operations:
+            target_ops = fuse_operations(target_ops)
+        ops += target_ops
+    if cfg.group_multi_target_operations:
+        ops = group_multi_target_operations(ops)
+    yield from ops
+
+
+def _iter_target_grid_operations_(
+    cfg: SmokeDustRegridConfig,
+    target_grid: RrfsGridKey,
+    names: Collection[str] | None,
+) -> Iterator[AbstractRegridOperation]:
+    logger = LOGGER.getChild("iter_operations")
+    for target_component in cfg.target_components:
+        name = f"{target_grid}-{target_component}"
+        is_selected = names is None or name in names
+        logger.debug(f"creating operation: {name}")
+        output_directory = cfg.output_directory(target_grid)
+        model_grid_path = cfg.model_grid_path(target_grid)
+        match target_component:
+            case ComponentKey.VEG_MAP if is_selected:
+                spec = _create_regrid_fields_spec_(
+                    cfg,
+                    target_grid,
+                    src_path=cfg.source_definition.components[target_component].grid,
+                    dst_path=model_grid_path,
+                    weight_filename=f"weights-veg_map-NA_3km-to-{target_grid}.nc",
+                    output_filename=output_directory / "veg_map.nc",
+                    fields=("emiss_factor",),
+                    name=name,
+                )
+                yield RrfsSmokeDustVegetationMap(spec=spec)
+            case ComponentKey.RAVE_GRID:
+                output_weight_filename = output_directory / "weight_file.nc"
+                if is_selected:
                     spec = GenerateWeightFileSpec(
                         src_path=cfg.source_definition.components[
                             target_component
                         ].grid,
                         dst_path=model_grid_path,
-                        output_weight_filename=output_directory / "weight_file.nc",
+                        output_weight_filename=output_weight_filename,
                         name=name,
+                        weight_cache=cfg.weight_cache,
+                        resume=cfg.resume,
                     )
                     yield RaveToRrfs(spec=spec)
-                case ComponentKey.DUST:
-                    spec = GenerateWeightFileAndRegridFields(
-                        src_path=cfg.source_definition.components[
-                            target_component
-                        ].grid,
-                        dst_path=model_grid_path,
-                        output_weight_filename=output_directory
-                        / f"weights-dust_data-to-{target_grid}.nc",
-                        output_filename=output_directory / "dust12m_data.nc",
-                        fields=RRFS_DUST_DATA_ENV.fields,
-                        name=name,
-                    )
-                    yield RrfsDustData(spec=spec)
-                case _:
-                    raise NotImplementedError(
-                        f"Unsupported target component {target_component}"
+                emissions_name = f"{target_grid}-RAVE_EMISSIONS"
+                if cfg.rave_emissions is not None and (
+                    names is None or emissions_name in names
+                ):
+                    yield _create_rave_emissions_operation_(
+                        cfg, target_grid, output_weight_filename, emissions_name
                     )
+            case ComponentKey.DUST if is_selected:
+                spec = _create_regrid_fields_spec_(
+                    cfg,
+                    target_grid,
+                    src_path=cfg.source_definition.components[target_component].grid,
+                    dst_path=model_grid_path,
+                    weight_filename=f"weights-dust_data-to-{target_grid}.nc",
+                    output_filename=output_directory / "dust12m_data.nc",
+                    fields=RRFS_DUST_DATA_ENV.fields,
+                    name=name,
+                )
+                yield RrfsDustData(spec=spec)
+            case ComponentKey.VEG_MAP | ComponentKey.DUST:
+                logger.debug(f"skipping unselected operation: {name}")
+            case _:
+                raise NotImplementedError(
+                    f"Unsupported target component {target_component}"
+                )
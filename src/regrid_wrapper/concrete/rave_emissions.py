@@ -0,0 +1,267 @@
+import glob
+import re
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from threading import Lock
+from typing import Any, Deque, Dict, Tuple, Sequence
+
+import netCDF4 as nc
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.instrument import INSTRUMENT
+from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.model.spec import RegridRaveEmissionsSpec
+from regrid_wrapper.sparse.engine import SparseWeights, load_field_stack
+from regrid_wrapper.strategy.operation import AbstractRegridOperation
+
+_LOGGER = LOGGER.getChild(__name__)
+
+RAVE_TIMESTAMP_PATTERN = re.compile(r"_(\d{12})_")
+RRFS_GRID_VARIABLES = ("grid_latt", "grid_lont")
+
+# netCDF4/HDF5 are not thread-safe so file access is serialized. The sparse
+# products still overlap with reads and writes, and headers and grid
+# coordinates are read once so the lock is only held for an hour's own data.
+_NC_LOCK = Lock()
+
+
+def parse_rave_timestamp(path: Path) -> datetime:
+    match = RAVE_TIMESTAMP_PATTERN.search(path.name)
+    if match is None:
+        raise ValueError(f"no timestamp in RAVE filename: {path}")
+    return datetime.strptime(match.group(1), "%Y%m%d%H%M")
+
+
+def select_rave_paths(
+    pattern: str, start: datetime | None = None, end: datetime | None = None
+) -> Tuple[Path, ...]:
+    paths = sorted(Path(ii) for ii in glob.glob(pattern))
+    if start is None and end is None:
+        return tuple(paths)
+    selected = []
+    for path in paths:
+        timestamp = parse_rave_timestamp(path)
+        if start is not None and timestamp < start:
+            continue
+        if end is not None and timestamp > end:
+            continue
+        selected.append(path)
+    return tuple(selected)
+
+
+class RaveVariableHeader(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    dimensions: Tuple[str, ...]
+    dtype: np.dtype
+    # Attribute values keep their netCDF types.
+    attrs: Dict[str, Any]
+    is_gridded: bool
+
+
+class RaveOutputHeader(BaseModel):
+    # Layout shared by every hourly output file. It is read once from the first
+    # source file and the destination grid.
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    attrs: Dict[str, Any]
+    # Unlimited dimensions have no size.
+    dimensions: Dict[str, int | None]
+    grid_dims: Tuple[str, ...]
+    src_grid_shape: Tuple[int, ...]
+    grid_shape: Tuple[int, ...]
+    variables: Dict[str, RaveVariableHeader]
+    grid_values: Dict[str, np.ndarray]
+
+    @classmethod
+    def from_paths(
+        cls, src_path: Path, grid_path: Path, fields: Sequence[str]
+    ) -> "RaveOutputHeader":
+        with nc.Dataset(grid_path) as grid_ds, nc.Dataset(src_path) as src:
+            grid_dims = src.variables[fields[0]].dimensions[-2:]
+            grid_shape = grid_ds.variables[RRFS_GRID_VARIABLES[0]].shape
+            dimensions = {}
+            for name, dim in src.dimensions.items():
+                if name in grid_dims:
+                    dimensions[name] = grid_shape[grid_dims.index(name)]
+                else:
+                    dimensions[name] = None if dim.isunlimited() else dim.size
+            variables = {}
+            for name, var in src.variables.items():
+                is_gridded = bool(set(var.dimensions) & set(grid_dims))
+                if is_gridded and not (name in fields or name in RRFS_GRID_VARIABLES):
+                    _LOGGER.warning(f"skipping gridded variable: {name}")
+                    continue
+                variables[name] = RaveVariableHeader(
+                    dimensions=var.dimensions,
+                    dtype=var.dtype,
+                    attrs={ii: var.getncattr(ii) for ii in var.ncattrs()},
+                    is_gridded=is_gridded,
+                )
+            return cls(
+                attrs={ii: src.getncattr(ii) for ii in src.ncattrs()},
+                dimensions=dimensions,
+                grid_dims=grid_dims,
+                src_grid_shape=src.variables[fields[0]].shape[-2:],
+                grid_shape=grid_shape,
+                variables=variables,
+                grid_values={
+                    ii: grid_ds.variables[ii][:]
+                    for ii in RRFS_GRID_VARIABLES
+                    if ii in variables
+                },
+            )
+
+
+class RaveEmissionsToRrfs(AbstractRegridOperation):
+
+    def __init__(self, spec: RegridRaveEmissionsSpec) -> None:
+        super().__init__(spec)
+        self._header: RaveOutputHeader | None = None
+
+    def initialize(self) -> None:
+        super().initialize()
+        assert isinstance(self._spec, RegridRaveEmissionsSpec)
+        src_paths = self._spec.src_paths[COMM.rank :: COMM.size]
+        if len(src_paths) > 0:
+            self._header = RaveOutputHeader.from_paths(
+                src_paths[0], self._spec.dst_path, self._spec.fields
+            )
+
+    def run(self) -> None:
+        assert isinstance(self._spec, RegridRaveEmissionsSpec)
+
+        if not self._spec.weight_filename.exists():
+            raise IOError(f"weight file does not exist: {self._spec.weight_filename}")
+        if COMM.rank == 0:
+            self._spec.output_directory.mkdir(exist_ok=True)
+        COMM.barrier()
+
+        # Hours are independent so each rank streams its own share of the files.
+        src_paths = self._spec.src_paths[COMM.rank :: COMM.size]
+        self._logger.info(f"regridding {len(src_paths)} RAVE files")
+        if len(src_paths) > 0:
+            weights = self._load_weights_()
+            self._run_pipeline_(weights, src_paths)
+        COMM.barrier()
+
+    @INSTRUMENT.span("load_weights")
+    def _load_weights_(self) -> SparseWeights:
+        assert isinstance(self._spec, RegridRaveEmissionsSpec)
+        assert self._header is not None
+        with _NC_LOCK:
+            return SparseWeights.from_file(
+                self._spec.weight_filename,
+                self._header.src_grid_shape,
+                self._header.grid_shape,
+                nthreads=self._spec.nthreads,
+            )
+
+    def _run_pipeline_(self, weights: SparseWeights, src_paths: Sequence[Path]) -> None:
+        assert isinstance(self._spec, RegridRaveEmissionsSpec)
+        max_in_flight = self._spec.max_in_flight
+        span_parent = INSTRUMENT.path()
+        pending = iter(src_paths)
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            with ThreadPoolExecutor(max_workers=1) as writer:
+                reads: Deque[Future] = deque(
+                    reader.submit(self._read_, ii, span_parent)
+                    for ii in islice(pending, max_in_flight)
+                )
+                writes: Deque[Future] = deque()
+                while reads:
+                    src_path, src_stack, values, shapes = reads.popleft().result()
+                    for ii in islice(pending, 1):
+                        reads.append(reader.submit(self._read_, ii, span_parent))
+                    self._logger.info("regridding: %s", src_path)
+                    with INSTRUMENT.span("apply"):
+                        dst_stack = weights.apply(src_stack)
+                    del src_stack
+                    writes.append(
+                        writer.submit(
+                            self._write_,
+                            src_path,
+                            dst_stack,
+                            values,
+                            shapes,
+                            span_parent,
+                        )
+                    )
+                    while len(writes) > max_in_flight:
+                        writes.popleft().result()
+                for write in writes:
+                    write.result()
+
+    def _read_(
+        self, src_path: Path, span_parent: str
+    ) -> Tuple[
+        Path, np.ma.MaskedArray, Dict[str, np.ndarray], Dict[str, Tuple[int, ...]]
+    ]:
+        # Fill values are masked in the stack and stay masked through the
+        # regrid. Ungridded variables, e.g. the time, are read with the fields
+        # along with the leading shapes of the fields.
+        assert isinstance(self._spec, RegridRaveEmissionsSpec)
+        assert self._header is not None
+        names = [k for k, v in self._header.variables.items() if not v.is_gridded]
+        with INSTRUMENT.span("read", parent=span_parent), _NC_LOCK:
+            stack = load_field_stack(src_path, self._spec.fields)
+            with nc.Dataset(src_path) as src:
+                values = {ii: src.variables[ii][:] for ii in names}
+                shapes = {ii: src.variables[ii].shape[:-2] for ii in self._spec.fields}
+        return src_path, stack, values, shapes
+
+    def _write_(
+        self,
+        src_path: Path,
+        dst_stack: np.ma.MaskedArray,
+        values: Dict[str, np.ndarray],
+        shapes: Dict[str, Tuple[int, ...]],
+        span_parent: str,
+    ) -> None:
+        # Only the output file is opened. Masked elements are written as the
+        # variable's fill value.
+        assert isinstance(self._spec, RegridRaveEmissionsSpec)
+        assert self._header is not None
+        header = self._header
+        grid_shape = header.grid_shape
+        dst_path = self._spec.output_path(src_path)
+
+        start = 0
+        for field in self._spec.fields:
+            count = int(np.prod(shapes[field]))
+            values[field] = dst_stack[start : start + count].reshape(
+                shapes[field] + grid_shape
+            )
+            start += count
+        values.update(header.grid_values)
+
+        with INSTRUMENT.span("write", parent=span_parent), _NC_LOCK:
+            with nc.Dataset(dst_path, "w") as dst:
+                dst.setncatts(_filter_attrs_(header.attrs))
+                for dim_name, size in header.dimensions.items():
+                    dst.createDimension(dim_name, size)
+                for varname, var in header.variables.items():
+                    kwargs = {}
+                    if self._spec.output_encoding is not None:
+                        # Written whole by one process so a chunk is a grid.
+                        # The output format is always netCDF.
+                        kwargs = self._spec.output_encoding.create_variable_kwargs(
+                            var.dimensions, dict(zip(header.grid_dims, grid_shape))
+                        )
+                    new_var = dst.createVariable(
+                        varname,
+                        var.dtype,
+                        var.dimensions,
+                        fill_value=var.attrs.get("_FillValue"),
+                        **kwargs,
+                    )
+                    new_var.setncatts(_filter_attrs_(var.attrs))
+                    new_var[:] = values[varname]
+        self._logger.info("wrote: %s", dst_path)
+
+
+def _filter_attrs_(attrs: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in attrs.items() if not k.startswith("_")}
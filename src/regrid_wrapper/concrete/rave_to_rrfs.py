@@ -1,8 +1,9 @@
 from pathlib import Path
+from typing import Tuple
 
-import esmpy
 
-from regrid_wrapper.esmpy.field_wrapper import NcToGrid, GridSpec, GridWrapper
+from regrid_wrapper.esmpy.field_wrapper import NcToGrid, GridSpec, FieldWrapper
+from regrid_wrapper.esmpy.weight_store import RegridOptions, WeightStore
 from regrid_wrapper.model.spec import GenerateWeightFileSpec
 from regrid_wrapper.strategy.operation import AbstractRegridOperation
 
@@ -10,8 +11,8 @@ from regrid_wrapper.strategy.operation import AbstractRegridOperation
 class RaveToRrfs(AbstractRegridOperation):
 
     @staticmethod
-    def _create_grid_wrapper_(path: Path) -> GridWrapper:
-        nc2grid = NcToGrid(
+    def _create_grid_definition_(path: Path) -> NcToGrid:
+        return NcToGrid(
             path=path,
             spec=GridSpec(
                 x_center="grid_lont",
@@ -24,25 +25,47 @@ class RaveToRrfs(AbstractRegridOperation):
                 y_corner_dim=("grid_y",),
             ),
         )
-        gwrap = nc2grid.create_grid_wrapper()
-        return gwrap
 
-    def run(self) -> None:
+    def grid_definitions(self) -> Tuple[NcToGrid, ...]:
         assert isinstance(self._spec, GenerateWeightFileSpec)
+        return (
+            self._create_grid_definition_(self._spec.src_path),
+            self._create_grid_definition_(self._spec.dst_path),
+        )
 
-        src_gwrap = self._create_grid_wrapper_(self._spec.src_path)
-        dst_gwrap = self._create_grid_wrapper_(self._spec.dst_path)
+    def run(self) -> None:
+        import esmpy
 
-        src_field = esmpy.Field(src_gwrap.value, name="src")
-        dst_field = esmpy.Field(dst_gwrap.value, name="dst")
+        assert isinstance(self._spec, GenerateWeightFileSpec)
 
-        self._logger.info("starting weight file generation")
-        regrid_method = esmpy.RegridMethod.CONSERVE
-        regridder = esmpy.Regrid(
-            src_field,
-            dst_field,
-            regrid_method=regrid_method,
-            filename=str(self._spec.output_weight_filename),
+        src_grid_def, dst_grid_def = self.grid_definitions()
+        options = RegridOptions(
+            regrid_method=esmpy.RegridMethod.CONSERVE,
             unmapped_action=esmpy.UnmappedAction.IGNORE,
             ignore_degenerate=True,
         )
+
+        if self._spec.weight_cache is not None:
+            store = WeightStore(spec=self._spec.weight_cache)
+            key = store.create_key(src_grid_def, dst_grid_def, options)
+            if store.fetch(key, self._spec.output_weight_filename):
+                self._logger.info(f"weight cache hit: {key}")
+                return
+
+        src_gwrap = src_grid_def.create_grid_wrapper()
+        dst_gwrap = dst_grid_def.create_grid_wrapper()
+
+        src_fwrap = FieldWrapper(
+            value=esmpy.Field(src_gwrap.value, name="src"),
+            dims=src_gwrap.dims,
+            gwrap=src_gwrap,
+        )
+        dst_fwrap = FieldWrapper(
+            value=esmpy.Field(dst_gwrap.value, name="dst"),
+            dims=dst_gwrap.dims,
+            gwrap=dst_gwrap,
+        )
+
+        _ = self._create_regridder_(
+            src_fwrap, dst_fwrap, options, self._spec.output_weight_filename
+        )
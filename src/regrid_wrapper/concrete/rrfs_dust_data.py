@@ -1,12 +1,12 @@
-from copy import copy
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Dict, Tuple
 
-import esmpy
 
 from pydantic import BaseModel, ConfigDict
 
 
+from regrid_wrapper.context.instrument import INSTRUMENT
+from regrid_wrapper.context.metadata import METADATA_CACHE
 from regrid_wrapper.esmpy.field_wrapper import (
     NcToGrid,
     GridSpec,
@@ -14,8 +14,18 @@ from regrid_wrapper.esmpy.field_wrapper import (
     resize_nc,
     GridWrapper,
     FieldWrapper,
+    create_field_wrapper_like,
+    get_decomposition_chunk_sizes,
+    get_precision_dtypes,
+    iter_time_chunks,
+)
+from regrid_wrapper.esmpy.weight_store import RegridOptions
+from regrid_wrapper.esmpy.zarr_store import consolidate_zarr_store
+from regrid_wrapper.model.spec import (
+    Precision,
+    RegridFieldsSpec,
+    get_output_write_path,
 )
-from regrid_wrapper.model.spec import GenerateWeightFileAndRegridFields
 from regrid_wrapper.strategy.operation import AbstractRegridOperation
 
 
@@ -31,87 +41,163 @@ RRFS_DUST_DATA_ENV = RrfsDustDataEnv()
 class RrfsDustData(AbstractRegridOperation):
 
     def run(self) -> None:
-        assert isinstance(self._spec, GenerateWeightFileAndRegridFields)
+        import esmpy
+
+        assert isinstance(self._spec, RegridFieldsSpec)
 
         src_gwrap = self._create_source_grid_wrapper_()
         dst_gwrap = self._create_destination_grid_wrapper_()
 
-        archetype_field_name = RRFS_DUST_DATA_ENV.fields[0]
-        src_fwrap = self._create_field_wrapper_(
-            archetype_field_name, self._spec.src_path, src_gwrap
-        )
-
-        new_sizes = {
-            RRFS_DUST_DATA_ENV.dim_time: src_fwrap.dims.get(
-                RRFS_DUST_DATA_ENV.dim_time
-            ).size
+        # Source metadata is broadcast once for the whole operation.
+        src_metadata = METADATA_CACHE.get_shared(self._spec.src_path)
+        ntime = src_metadata.dimensions[RRFS_DUST_DATA_ENV.dim_time]
+        fill_values = {
+            ii: src_metadata.variables[ii].fill_value
+            for ii in RRFS_DUST_DATA_ENV.fields
         }
+        new_sizes = {RRFS_DUST_DATA_ENV.dim_time: ntime}
         for axis in [
             (src_gwrap.spec.x_dim, dst_gwrap.spec.x_dim),
             (src_gwrap.spec.y_dim, dst_gwrap.spec.y_dim),
         ]:
             for dimname in axis[0]:
                 new_sizes[dimname] = dst_gwrap.dims.get(axis[1]).size
+
+        # The destination grid is shared through the grid registry so renaming
+        # happens on a deep copy of its dimensions.
+        dst_gwrap_output = dst_gwrap.model_copy(
+            update={
+                "spec": src_gwrap.spec,
+                "dims": dst_gwrap.dims.model_copy(deep=True),
+            }
+        )
+        for src_dim, dst_dim in zip(src_gwrap.dims.value, dst_gwrap_output.dims.value):
+            dst_dim.name = src_dim.name
+
         self._logger.info(f"resizing netcdf. new_sizes={new_sizes}")
         if self._spec.output_filename.exists():
             raise ValueError("output file must not exist")
+        output_path = get_output_write_path(
+            self._spec.output_filename, self._spec.output_encoding
+        )
         resize_nc(
             self._spec.src_path,
-            self._spec.output_filename,
+            output_path,
             new_sizes,
             copy_values_for=[RRFS_DUST_DATA_ENV.dim_time],
+            encoding=self._spec.output_encoding,
+            chunk_sizes=get_decomposition_chunk_sizes(dst_gwrap_output.dims),
+            dtypes=get_precision_dtypes(
+                RRFS_DUST_DATA_ENV.fields, self._spec.precision
+            ),
         )
-
-        dst_gwrap_output = copy(dst_gwrap)
-        dst_gwrap_output.spec = src_gwrap.spec
-        for src_dim, dst_dim in zip(src_gwrap.dims.value, dst_gwrap_output.dims.value):
-            dst_dim.name = src_dim.name
-        dst_gwrap_output.fill_nc_variables(self._spec.output_filename)
-
-        dst_fwrap = self._create_field_wrapper_(
-            archetype_field_name, self._spec.output_filename, dst_gwrap_output
-        )
-
-        self._logger.info("starting weight file generation")
-        regrid_method = esmpy.RegridMethod.BILINEAR
-        regridder = esmpy.Regrid(
-            src_fwrap.value,
-            dst_fwrap.value,
-            regrid_method=regrid_method,
-            filename=str(self._spec.output_weight_filename),
-            unmapped_action=esmpy.UnmappedAction.ERROR,
-        )
-
+        dst_gwrap_output.fill_nc_variables(output_path)
+
+        # Fields are read, regridded and written one time chunk at a time. A
+        # route handle is only valid for fields with the ungridded dimension it
+        # was computed for so regridders are kept per chunk length. Only the
+        # first one computes weights. A shorter last chunk reads them back from
+        # the weight file.
+        time_chunks = iter_time_chunks(ntime, self._spec.time_chunk_size)
+        self._logger.info(f"time chunks: {time_chunks}")
+        options = self.regrid_options()
+        regridders: Dict[int, esmpy.Regrid] = {}
         for field_to_regrid in RRFS_DUST_DATA_ENV.fields:
-            self._logger.info(f"regridding field: {field_to_regrid}")
-            src_fwrap_regrid = self._create_field_wrapper_(
-                field_to_regrid, self._spec.src_path, src_gwrap
-            )
-            dst_fwrap_regrid = self._create_field_wrapper_(
-                field_to_regrid, self._spec.output_filename, dst_gwrap_output
-            )
-            regridder(
-                src_fwrap_regrid.value,
-                dst_fwrap_regrid.value,
-                zero_region=esmpy.Region.SELECT,
-            )
-            dst_fwrap_regrid.fill_nc_variable(self._spec.output_filename)
+            self._logger.info("regridding field: %s", field_to_regrid)
+            for time_bounds in time_chunks:
+                chunk_bounds = None if len(time_chunks) == 1 else time_bounds
+                src_fwrap_regrid = self._create_source_field_wrapper_(
+                    field_to_regrid, src_gwrap, time_bounds=chunk_bounds
+                )
+                # Output fields take their layout from the source fields so the
+                # output file is only opened to write them.
+                dst_fwrap_regrid = self._create_destination_field_wrapper_(
+                    field_to_regrid,
+                    src_fwrap_regrid,
+                    dst_gwrap_output,
+                    fill_values[field_to_regrid],
+                )
+                chunk_length = time_bounds[1] - time_bounds[0]
+                if not regridders:
+                    regridders[chunk_length] = self._create_fields_regridder_(
+                        src_fwrap_regrid, dst_fwrap_regrid, options
+                    )
+                elif chunk_length not in regridders:
+                    regridders[chunk_length] = self._create_regridder_from_file_(
+                        src_fwrap_regrid,
+                        dst_fwrap_regrid,
+                        self._fields_weight_filename_(),
+                    )
+                with INSTRUMENT.span("regrid"):
+                    regridders[chunk_length](
+                        src_fwrap_regrid.value,
+                        dst_fwrap_regrid.value,
+                        zero_region=esmpy.Region.SELECT,
+                    )
+                dst_fwrap_regrid.fill_nc_variable(output_path)
+                dst_fwrap_regrid.value.destroy()
+                # Shared source fields are destroyed by the operation owning them.
+                if chunk_bounds is not None or self._source_fields is None:
+                    src_fwrap_regrid.value.destroy()
+        for regridder in regridders.values():
+            regridder.destroy()
+
+        if (
+            self._spec.output_encoding is not None
+            and self._spec.output_encoding.is_consolidated
+        ):
+            consolidate_zarr_store(output_path, self._spec.output_filename)
 
     @staticmethod
     def _create_field_wrapper_(
-        field_name: str, path: Path, gwrap: GridWrapper
+        field_name: str,
+        path: Path,
+        gwrap: GridWrapper,
+        precision: Precision,
+        time_bounds: Tuple[int, int] | None = None,
     ) -> FieldWrapper:
         nc2field = NcToField(
             path=path,
             name=field_name,
             dim_time=(RRFS_DUST_DATA_ENV.dim_time,),
+            time_bounds=time_bounds,
             gwrap=gwrap,
+            precision=precision,
         )
         fwrap = nc2field.create_field_wrapper()
         return fwrap
 
-    def _create_destination_grid_wrapper_(self):
-        dst_grid_def = NcToGrid(
+    @staticmethod
+    def _create_destination_field_wrapper_(
+        field_name: str, src_fwrap: FieldWrapper, gwrap: GridWrapper, fill_value: Any
+    ) -> FieldWrapper:
+        return create_field_wrapper_like(src_fwrap, gwrap, field_name, fill_value)
+
+    def _create_source_field_wrapper_(
+        self,
+        field_name: str,
+        gwrap: GridWrapper,
+        time_bounds: Tuple[int, int] | None = None,
+    ) -> FieldWrapper:
+        def create() -> FieldWrapper:
+            return self._create_field_wrapper_(
+                field_name,
+                self._spec.src_path,
+                gwrap,
+                self._spec.precision,
+                time_bounds=time_bounds,
+            )
+
+        if time_bounds is not None:
+            # Time chunks are not shared so a single chunk is held at a time.
+            return create()
+        return self._get_source_field_wrapper_(field_name, create)
+
+    def _create_destination_grid_wrapper_(self) -> GridWrapper:
+        return self._create_destination_grid_definition_().create_grid_wrapper()
+
+    def _create_destination_grid_definition_(self) -> NcToGrid:
+        return NcToGrid(
             path=self._spec.dst_path,
             spec=GridSpec(
                 x_center="grid_lont",
@@ -120,11 +206,12 @@ class RrfsDustData(AbstractRegridOperation):
                 y_dim=("grid_yt",),
             ),
         )
-        dst_gwrap = dst_grid_def.create_grid_wrapper()
-        return dst_gwrap
 
     def _create_source_grid_wrapper_(self) -> GridWrapper:
-        src_grid_def = NcToGrid(
+        return self._create_source_grid_definition_().create_grid_wrapper()
+
+    def _create_source_grid_definition_(self) -> NcToGrid:
+        return NcToGrid(
             path=self._spec.src_path,
             spec=GridSpec(
                 x_center="geolon",
@@ -133,5 +220,17 @@ class RrfsDustData(AbstractRegridOperation):
                 y_dim=("lat",),
             ),
         )
-        src_gwrap = src_grid_def.create_grid_wrapper()
-        return src_gwrap
+
+    def regrid_options(self) -> RegridOptions:
+        import esmpy
+
+        return RegridOptions(
+            regrid_method=esmpy.RegridMethod.BILINEAR,
+            unmapped_action=esmpy.UnmappedAction.ERROR,
+        )
+
+    def grid_definitions(self) -> Tuple[NcToGrid, ...]:
+        return (
+            self._create_source_grid_definition_(),
+            self._create_destination_grid_definition_(),
+        )
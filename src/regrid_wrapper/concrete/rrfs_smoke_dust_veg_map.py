@@ -1,8 +1,8 @@
-from copy import copy
 from pathlib import Path
+from typing import Tuple
 
-import esmpy
 
+from regrid_wrapper.context.instrument import INSTRUMENT
 from regrid_wrapper.esmpy.field_wrapper import (
     GridWrapper,
     NcToGrid,
@@ -10,15 +10,28 @@ from regrid_wrapper.esmpy.field_wrapper import (
     FieldWrapper,
     NcToField,
     resize_nc,
+    create_field_wrapper_like,
+    get_decomposition_chunk_sizes,
+    get_precision_dtypes,
+    get_fill_value,
+)
+from regrid_wrapper.esmpy.weight_store import RegridOptions
+from regrid_wrapper.esmpy.zarr_store import consolidate_zarr_store
+from regrid_wrapper.model.spec import (
+    Precision,
+    RegridFieldsSpec,
+    get_output_write_path,
 )
-from regrid_wrapper.model.spec import GenerateWeightFileAndRegridFields
 from regrid_wrapper.strategy.operation import AbstractRegridOperation
 
 
 class RrfsSmokeDustVegetationMap(AbstractRegridOperation):
 
     def _create_source_grid_wrapper_(self) -> GridWrapper:
-        src_grid_def = NcToGrid(
+        return self._create_source_grid_definition_().create_grid_wrapper()
+
+    def _create_source_grid_definition_(self) -> NcToGrid:
+        return NcToGrid(
             path=self._spec.src_path,
             spec=GridSpec(
                 x_center="geolon",
@@ -27,11 +40,26 @@ class RrfsSmokeDustVegetationMap(AbstractRegridOperation):
                 y_dim=("geolat", "lat"),
             ),
         )
-        src_gwrap = src_grid_def.create_grid_wrapper()
-        return src_gwrap
 
-    def _create_destination_grid_wrapper_(self):
-        dst_grid_def = NcToGrid(
+    def regrid_options(self) -> RegridOptions:
+        import esmpy
+
+        return RegridOptions(
+            regrid_method=esmpy.RegridMethod.BILINEAR,
+            unmapped_action=self._spec.esmpy_unmapped_action,
+        )
+
+    def grid_definitions(self) -> Tuple[NcToGrid, ...]:
+        return (
+            self._create_source_grid_definition_(),
+            self._create_destination_grid_definition_(),
+        )
+
+    def _create_destination_grid_wrapper_(self) -> GridWrapper:
+        return self._create_destination_grid_definition_().create_grid_wrapper()
+
+    def _create_destination_grid_definition_(self) -> NcToGrid:
+        return NcToGrid(
             path=self._spec.dst_path,
             spec=GridSpec(
                 x_center="grid_lont",
@@ -40,31 +68,35 @@ class RrfsSmokeDustVegetationMap(AbstractRegridOperation):
                 y_dim=("grid_yt",),
             ),
         )
-        dst_gwrap = dst_grid_def.create_grid_wrapper()
-        return dst_gwrap
 
     @staticmethod
     def _create_field_wrapper_(
-        field_name: str, path: Path, gwrap: GridWrapper
+        field_name: str, path: Path, gwrap: GridWrapper, precision: Precision
     ) -> FieldWrapper:
         nc2field = NcToField(
             path=path,
             name=field_name,
             gwrap=gwrap,
+            precision=precision,
         )
         fwrap = nc2field.create_field_wrapper()
         return fwrap
 
     def run(self) -> None:
-        assert isinstance(self._spec, GenerateWeightFileAndRegridFields)
+        import esmpy
+
+        assert isinstance(self._spec, RegridFieldsSpec)
 
         field_to_regrid = "emiss_factor"
 
         src_gwrap = self._create_source_grid_wrapper_()
         dst_gwrap = self._create_destination_grid_wrapper_()
 
-        src_fwrap = self._create_field_wrapper_(
-            field_to_regrid, self._spec.src_path, src_gwrap
+        src_fwrap = self._get_source_field_wrapper_(
+            field_to_regrid,
+            lambda: self._create_field_wrapper_(
+                field_to_regrid, self._spec.src_path, src_gwrap, self._spec.precision
+            ),
         )
 
         new_sizes = {}
@@ -74,39 +106,56 @@ class RrfsSmokeDustVegetationMap(AbstractRegridOperation):
         ]:
             for dimname in axis[0]:
                 new_sizes[dimname] = dst_gwrap.dims.get(axis[1]).size
+
+        # The destination grid is shared through the grid registry so renaming
+        # happens on a deep copy of its dimensions.
+        dst_gwrap_output = dst_gwrap.model_copy(
+            update={
+                "spec": src_gwrap.spec,
+                "dims": dst_gwrap.dims.model_copy(deep=True),
+            }
+        )
+        for src_dim, dst_dim in zip(src_gwrap.dims.value, dst_gwrap_output.dims.value):
+            dst_dim.name = src_dim.name
+
         self._logger.info(f"resizing netcdf. new_sizes={new_sizes}")
         if self._spec.output_filename.exists():
             raise ValueError("output file must not exist")
+        output_path = get_output_write_path(
+            self._spec.output_filename, self._spec.output_encoding
+        )
         resize_nc(
             self._spec.src_path,
-            self._spec.output_filename,
+            output_path,
             new_sizes,
+            encoding=self._spec.output_encoding,
+            chunk_sizes=get_decomposition_chunk_sizes(dst_gwrap_output.dims),
+            dtypes=get_precision_dtypes([field_to_regrid], self._spec.precision),
         )
-
-        dst_gwrap_output = copy(dst_gwrap)
-        dst_gwrap_output.spec = src_gwrap.spec
-        for src_dim, dst_dim in zip(src_gwrap.dims.value, dst_gwrap_output.dims.value):
-            dst_dim.name = src_dim.name
-        dst_gwrap_output.fill_nc_variables(self._spec.output_filename)
-
-        dst_fwrap = self._create_field_wrapper_(
-            field_to_regrid, self._spec.output_filename, dst_gwrap_output
-        )
-
-        self._logger.info("starting weight file generation")
-        regrid_method = esmpy.RegridMethod.BILINEAR
-        regridder = esmpy.Regrid(
-            src_fwrap.value,
-            dst_fwrap.value,
-            regrid_method=regrid_method,
-            filename=str(self._spec.output_weight_filename),
-            unmapped_action=self._spec.esmpy_unmapped_action,
+        dst_gwrap_output.fill_nc_variables(output_path)
+
+        # The output file is only opened to write the regridded field.
+        dst_fwrap = create_field_wrapper_like(
+            src_fwrap,
+            dst_gwrap_output,
+            field_to_regrid,
+            get_fill_value(self._spec.src_path, field_to_regrid),
         )
 
-        self._logger.info(f"regridding field: {field_to_regrid}")
-        regridder(
-            src_fwrap.value,
-            dst_fwrap.value,
-            zero_region=esmpy.Region.SELECT,
-        )
-        dst_fwrap.fill_nc_variable(self._spec.output_filename)
+        options = self.regrid_options()
+        regridder = self._create_fields_regridder_(src_fwrap, dst_fwrap, options)
+
+        self._logger.info("regridding field: %s", field_to_regrid)
+        with INSTRUMENT.span("regrid"):
+            regridder(
+                src_fwrap.value,
+                dst_fwrap.value,
+                zero_region=esmpy.Region.SELECT,
+            )
+        dst_fwrap.fill_nc_variable(output_path)
+
+        if (
+            self._spec.output_encoding is not None
+            and self._spec.output_encoding.is_consolidated
+        ):
+            consolidate_zarr_store(output_path, self._spec.output_filename)
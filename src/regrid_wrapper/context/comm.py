@@ -1,27 +1,64 @@
-from typing import Any, List
+import os
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, List
 
-from mpi4py import MPI
+if TYPE_CHECKING:
+    from mpi4py import MPI
+
+# Launcher variables holding the process rank, in order of preference.
+_RANK_ENV_VARS = ("PMI_RANK", "OMPI_COMM_WORLD_RANK", "PMIX_RANK", "SLURM_PROCID")
 
 
 class Comm:
-    MPI = MPI
+    # Importing ``mpi4py.MPI`` initializes MPI. It is deferred until the
+    # communicator is first used so tools that never communicate skip it.
 
     def __init__(self) -> None:
-        self._comm = MPI.COMM_WORLD
+        self._comm: "MPI.Comm | None" = None
+
+    @property
+    def MPI(self) -> ModuleType:
+        from mpi4py import MPI
+
+        return MPI
+
+    @property
+    def value(self) -> "MPI.Comm":
+        if self._comm is None:
+            self._comm = self.MPI.COMM_WORLD
+        return self._comm
+
+    @property
+    def is_initialized(self) -> bool:
+        return self._comm is not None
 
     @property
     def rank(self) -> int:
-        return self._comm.Get_rank()
+        return self.value.Get_rank()
+
+    @property
+    def launch_rank(self) -> int:
+        # The rank without initializing MPI. Processes started outside of a
+        # launcher are rank 0.
+        if self.is_initialized:
+            return self.rank
+        for key in _RANK_ENV_VARS:
+            if key in os.environ:
+                return int(os.environ[key])
+        return 0
 
     @property
     def size(self) -> int:
-        return self._comm.Get_size()
+        return self.value.Get_size()
 
     def barrier(self) -> None:
-        self._comm.barrier()
+        self.value.barrier()
 
     def bcast(self, value: dict, root: int = 0) -> dict:
-        return self._comm.bcast(value, root=root)
+        return self.value.bcast(value, root=root)
+
+    def gather(self, value: Any, root: int = 0) -> List[Any] | None:
+        return self.value.gather(value, root=root)
 
 
 COMM = Comm()
@@ -10,3 +10,12 @@ def _validate_path_(value: str | Path) -> Path:
 
 
 PathType = Annotated[Path, BeforeValidator(_validate_path_)]
+
+
+ZARR_SUFFIX = ".zarr"
+# Reference filesystem (kerchunk) description of chunks in other files.
+ZARR_REFERENCE_SUFFIX = ".json"
+
+
+def is_zarr_source(path: Path) -> bool:
+    return path.suffix in (ZARR_SUFFIX, ZARR_REFERENCE_SUFFIX)
@@ -1,30 +1,79 @@
 import logging
-import os
+from enum import StrEnum, unique
+from typing import Any
 
 from dotenv import load_dotenv
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
-from mpi4py import MPI
 
 from regrid_wrapper.context.common import PathType
 
 
-load_dotenv()
+@unique
+class LogConsole(StrEnum):
+    ALL = "all"
+    # Only rank 0 writes to the console.
+    ROOT = "root"
+    # Every ``LOG_CONSOLE_SAMPLE``-th rank writes to the console.
+    SAMPLE = "sample"
 
 
 class Environment(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="REGRID_WRAPPER_")
 
-    LOG_DIR: PathType
+    # Per-rank log files are only written when a log directory is set.
+    LOG_DIR: PathType | None = None
     LOG_PREFIX: str = "Regrid-Wrapper"
     LOG_LEVEL: int = logging.DEBUG
+    LOG_CONSOLE: LogConsole = LogConsole.ALL
+    LOG_CONSOLE_SAMPLE: int = Field(default=64, gt=0)
+    # Consecutive ranks sharing a log file. Shared files are appended to so
+    # there are fewer files for the filesystem metadata server to create. They
+    # are truncated by the group's first rank in ``open_shared_log_files``.
+    LOG_FILE_GROUP_SIZE: int = Field(default=1, gt=0)
+    # Records are written by a background thread so logging calls do not block
+    # on I/O.
+    LOG_QUEUE: bool = False
+    # Variables are read and written as plain arrays with netCDF4's automatic
+    # masking and scaling turned off. Packed variables are unpacked explicitly.
+    RAW_IO: bool = True
 
     def create_log_file_path(self) -> Path:
-        comm = MPI.COMM_WORLD
-        return (
-            Path(self.LOG_DIR)
-            / f"{self.LOG_PREFIX}-{str(comm.Get_rank()).zfill(4)}.log"
-        )
+        from regrid_wrapper.context.comm import COMM
 
+        assert self.LOG_DIR is not None
+        if self.LOG_FILE_GROUP_SIZE == 1:
+            suffix = str(COMM.launch_rank).zfill(4)
+        else:
+            group = COMM.launch_rank // self.LOG_FILE_GROUP_SIZE
+            suffix = f"group-{str(group).zfill(4)}"
+        return Path(self.LOG_DIR) / f"{self.LOG_PREFIX}-{suffix}.log"
 
-ENV = Environment()  # type: ignore[call-arg]
+    def is_console_rank(self, rank: int) -> bool:
+        match self.LOG_CONSOLE:
+            case LogConsole.ALL:
+                return True
+            case LogConsole.ROOT:
+                return rank == 0
+            case LogConsole.SAMPLE:
+                return rank % self.LOG_CONSOLE_SAMPLE == 0
+
+
+_ENV: Environment | None = None
+
+
+def get_env() -> Environment:
+    # The environment is read on first use so importing the package has no side
+    # effects.
+    global _ENV
+    if _ENV is None:
+        load_dotenv()
+        _ENV = Environment()
+    return _ENV
+
+
+def __getattr__(name: str) -> Any:
+    if name == "ENV":
+        return get_env()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,190 @@
+import os
+import resource
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import numpy as np
+from pydantic import BaseModel
+
+from regrid_wrapper.context.comm import COMM
+
+SPAN_SEPARATOR = "/"
+
+
+def get_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def get_hwm_bytes() -> int:
+    # ``ru_maxrss`` is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class SpanStats(BaseModel):
+    # Durations are seconds summed over every occurrence of the span on a rank.
+    # ``imbalance`` is max / mean: 1.0 when every rank spends the same time.
+    count: int
+    min: float
+    max: float
+    mean: float
+    imbalance: float
+    # Memory is in bytes and is the maximum over ranks. ``hwm_growth`` is how
+    # much the rank's high-water mark rose while the span was open.
+    rss_max: int
+    hwm_max: int
+    hwm_growth_max: int
+
+
+class CounterStats(BaseModel):
+    total: int
+    min: int
+    max: int
+    mean: float
+
+
+class RunReport(BaseModel):
+    nproc: int
+    spans: Dict[str, SpanStats]
+    counters: Dict[str, CounterStats]
+    hwm_by_rank: List[int]
+    # Sum of the per-rank high-water marks on each host for sizing nodes.
+    hwm_by_host: Dict[str, int]
+
+    def save(self, path: Path) -> None:
+        path.write_text(self.model_dump_json(indent=2))
+
+
+class _SpanRecord(BaseModel):
+    count: int = 0
+    duration: float = 0.0
+    rss: int = 0
+    hwm: int = 0
+    hwm_growth: int = 0
+
+
+class Instrument:
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._spans: Dict[str, _SpanRecord] = {}
+        self._counters: Dict[str, int] = {}
+
+    def path(self) -> str:
+        return SPAN_SEPARATOR.join(self._get_stack_())
+
+    @contextmanager
+    def span(self, name: str, parent: str | None = None) -> Iterator[None]:
+        # Worker threads start with an empty stack so they pass the submitting
+        # thread's ``path()`` as ``parent``.
+        stack = self._get_stack_()
+        if parent is not None and len(stack) == 0 and parent != "":
+            stack.append(parent)
+            pushed_parent = True
+        else:
+            pushed_parent = False
+        stack.append(name)
+        key = SPAN_SEPARATOR.join(stack)
+        hwm_start = get_hwm_bytes()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            hwm = get_hwm_bytes()
+            rss = get_rss_bytes()
+            stack.pop()
+            if pushed_parent:
+                stack.pop()
+            with self._lock:
+                record = self._spans.setdefault(key, _SpanRecord())
+                record.count += 1
+                record.duration += elapsed
+                record.rss = max(record.rss, rss)
+                record.hwm = max(record.hwm, hwm)
+                record.hwm_growth = max(record.hwm_growth, hwm - hwm_start)
+
+    def add_bytes(self, name: str, nbytes: int) -> None:
+        key = SPAN_SEPARATOR.join(self._get_stack_() + [name])
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + nbytes
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    def reduce(self) -> RunReport | None:
+        # Collective over all ranks. Spans missing on a rank count as zero. Only
+        # rank 0 receives the report.
+        with self._lock:
+            local = (
+                socket.gethostname(),
+                get_hwm_bytes(),
+                {k: v.model_copy() for k, v in self._spans.items()},
+                dict(self._counters),
+            )
+        gathered = COMM.gather(local, root=0)
+        if gathered is None:
+            return None
+        hwm_by_host: Dict[str, int] = {}
+        for host, hwm, _, _ in gathered:
+            hwm_by_host[host] = hwm_by_host.get(host, 0) + hwm
+        return RunReport(
+            nproc=len(gathered),
+            spans=self._reduce_spans_([ii[2] for ii in gathered]),
+            counters=self._reduce_counters_([ii[3] for ii in gathered]),
+            hwm_by_rank=[ii[1] for ii in gathered],
+            hwm_by_host=hwm_by_host,
+        )
+
+    @staticmethod
+    def _reduce_spans_(
+        gathered: List[Dict[str, _SpanRecord]],
+    ) -> Dict[str, SpanStats]:
+        ret = {}
+        for name in sorted(set(name for ii in gathered for name in ii)):
+            records = [ii.get(name, _SpanRecord()) for ii in gathered]
+            durations = np.array([ii.duration for ii in records])
+            mean = float(durations.mean())
+            ret[name] = SpanStats(
+                count=max(ii.count for ii in records),
+                min=float(durations.min()),
+                max=float(durations.max()),
+                mean=mean,
+                imbalance=float(durations.max()) / mean if mean > 0 else 1.0,
+                rss_max=max(ii.rss for ii in records),
+                hwm_max=max(ii.hwm for ii in records),
+                hwm_growth_max=max(ii.hwm_growth for ii in records),
+            )
+        return ret
+
+    @staticmethod
+    def _reduce_counters_(gathered: List[Dict[str, int]]) -> Dict[str, CounterStats]:
+        ret = {}
+        for name in sorted(set(name for ii in gathered for name in ii)):
+            values = np.array([ii.get(name, 0) for ii in gathered])
+            ret[name] = CounterStats(
+                total=int(values.sum()),
+                min=int(values.min()),
+                max=int(values.max()),
+                mean=float(values.mean()),
+            )
+        return ret
+
+    def _get_stack_(self) -> List[str]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+
+INSTRUMENT = Instrument()
@@ -1,44 +1,129 @@
 import logging
-import logging.config
+import logging.handlers
+import queue
+import sys
+from typing import List
 
-from regrid_wrapper.context.env import ENV
 from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.env import get_env
+
+PROJECT_NAME = "regrid-wrapper"
+
+
+class DeferredHandler(logging.Handler):
+    # Creates the console and log file handlers when the first record arrives.
+    # Reading the environment, initializing MPI for the rank and opening log
+    # files are not done at import.
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._handlers: List[logging.Handler] | None = None
+        self._listener: logging.handlers.QueueListener | None = None
+        # Holds the records for a shared log file until the file is opened.
+        self._shared: logging.handlers.MemoryHandler | None = None
+
+    def configure(self) -> None:
+        self.close_handlers()
+        env = get_env()
+        rank = COMM.launch_rank
+        formatter = logging.Formatter(
+            f"[%(name)s][%(levelname)s][%(asctime)s][%(pathname)s:%(lineno)d][%(process)d][%(thread)d][{rank}]: %(message)s"
+        )
+        handlers: List[logging.Handler] = []
+        if env.is_console_rank(rank):
+            handlers.append(logging.StreamHandler(sys.stdout))
+        if env.LOG_DIR is not None and env.LOG_FILE_GROUP_SIZE == 1:
+            handlers.append(logging.FileHandler(env.create_log_file_path(), mode="w"))
+        elif env.LOG_DIR is not None:
+            # Ranks sharing a file append to it once its group's first rank
+            # truncated it. See ``open_shared_log_files``.
+            self._shared = logging.handlers.MemoryHandler(
+                capacity=sys.maxsize, flushLevel=logging.CRITICAL + 1
+            )
+            handlers.append(self._shared)
+        for handler in handlers:
+            handler.setFormatter(formatter)
+            handler.setLevel(env.LOG_LEVEL)
+        if env.LOG_QUEUE and len(handlers) > 0:
+            records: queue.SimpleQueue = queue.SimpleQueue()
+            self._listener = logging.handlers.QueueListener(
+                records, *handlers, respect_handler_level=True
+            )
+            self._listener.start()
+            queue_handler = logging.handlers.QueueHandler(records)
+            queue_handler.setLevel(env.LOG_LEVEL)
+            handlers = [queue_handler]
+        self._handlers = handlers
+        logging.getLogger(PROJECT_NAME).setLevel(env.LOG_LEVEL)
+
+    def open_shared_file(self) -> None:
+        # Held records are written and later ones pass straight through.
+        if self._handlers is None:
+            init_logging()
+        if self._shared is None or self._shared.target is not None:
+            return
+        env = get_env()
+        handler = logging.FileHandler(env.create_log_file_path(), mode="a")
+        handler.setFormatter(self._shared.formatter)
+        handler.setLevel(env.LOG_LEVEL)
+        self._shared.setTarget(handler)
+        self._shared.flushLevel = logging.NOTSET
+        self._shared.flush()
+
+    def close_handlers(self) -> None:
+        # Stopping the listener writes any queued records. Records held for a
+        # shared file that was never opened are then appended to it.
+        handlers = list(self._handlers or [])
+        if self._listener is not None:
+            self._listener.stop()
+            handlers += self._listener.handlers
+            self._listener = None
+        if self._shared is not None:
+            self.open_shared_file()
+            assert self._shared.target is not None
+            self._shared.target.close()
+            self._shared = None
+        for handler in handlers:
+            handler.close()
+        self._handlers = None
+
+    def close(self) -> None:
+        self.close_handlers()
+        super().close()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._handlers is None:
+            init_logging()
+        assert self._handlers is not None
+        for handler in self._handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+_HANDLER = DeferredHandler()
 
 
 def init_logging() -> logging.Logger:
-    project_name = "regrid-wrapper"
-    logging_config: dict = {
-        "version": 1,
-        "disable_existing_loggers": True,
-        "formatters": {
-            "plain": {
-                "format": f"[%(name)s][%(levelname)s][%(asctime)s][%(pathname)s:%(lineno)d][%(process)d][%(thread)d][{COMM.rank}]: %(message)s"
-            },
-        },
-        "handlers": {
-            "default": {
-                "formatter": "plain",
-                "class": "logging.StreamHandler",
-                "stream": "ext://sys.stdout",
-                "filters": [],
-            },
-            "file": {
-                "formatter": "plain",
-                "class": "logging.FileHandler",
-                "filename": ENV.create_log_file_path(),
-                "mode": "w",
-            },
-        },
-        "loggers": {
-            project_name: {
-                "handlers": ["default", "file"],
-                "level": ENV.LOG_LEVEL,
-            },
-        },
-    }
-    logging.config.dictConfig(logging_config)
-    return logging.getLogger(project_name)
-
-
-LOGGER = init_logging()
-LOGGER.info(ENV)
+    # Configures logging from the current environment. Called implicitly for the
+    # first record.
+    _HANDLER.configure()
+    logger = logging.getLogger(PROJECT_NAME)
+    logger.info(get_env())
+    return logger
+
+
+def open_shared_log_files() -> None:
+    # Collective. The first rank of each group truncates the group's log file
+    # before any rank of the group appends to it.
+    env = get_env()
+    if env.LOG_DIR is None or env.LOG_FILE_GROUP_SIZE == 1:
+        return
+    if COMM.rank % env.LOG_FILE_GROUP_SIZE == 0:
+        env.create_log_file_path().write_text("")
+    COMM.barrier()
+    _HANDLER.open_shared_file()
+
+
+LOGGER = logging.getLogger(PROJECT_NAME)
+LOGGER.setLevel(logging.DEBUG)
+LOGGER.addHandler(_HANDLER)
@@ -0,0 +1,170 @@
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+import netCDF4 as nc
+import numpy as np
+from pydantic import BaseModel
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.common import PathType, is_zarr_source
+
+
+def read_nc_attrs(src: nc.Dataset | nc.Variable) -> Dict[str, Any]:
+    # Array values are stored as lists so headers can be serialized.
+    ret = {}
+    for attr in src.ncattrs():
+        value = src.getncattr(attr)
+        if isinstance(value, (np.ndarray, np.generic)):
+            value = value.tolist()
+        ret[attr] = value
+    return ret
+
+
+class VariableMetadata(BaseModel):
+    dimensions: Tuple[str, ...]
+    shape: Tuple[int, ...]
+    dtype: str
+    attrs: Dict[str, Any] = {}
+
+    @property
+    def fill_value(self) -> Any:
+        # Value read back from elements that were never written.
+        if "_FillValue" in self.attrs:
+            return self.attrs["_FillValue"]
+        return nc.default_fillvals[np.dtype(self.dtype).str[1:]]
+
+
+class NcMetadata(BaseModel):
+    # Header of a netCDF file. ``size`` and ``mtime_ns`` identify the version of
+    # the file it was read from.
+    path: PathType
+    size: int
+    mtime_ns: int
+    dimensions: Dict[str, int]
+    variables: Dict[str, VariableMetadata]
+    attrs: Dict[str, Any] = {}
+
+    @classmethod
+    def from_path(cls, path: Path) -> "NcMetadata":
+        stat = path.stat()
+        if is_zarr_source(path):
+            return cls._from_zarr_source_(path, stat)
+        with nc.Dataset(path, "r") as ds:
+            return cls(
+                path=path,
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                dimensions={k: v.size for k, v in ds.dimensions.items()},
+                variables={
+                    k: VariableMetadata(
+                        dimensions=v.dimensions,
+                        shape=v.shape,
+                        dtype=str(v.dtype),
+                        attrs=read_nc_attrs(v),
+                    )
+                    for k, v in ds.variables.items()
+                },
+                attrs=read_nc_attrs(ds),
+            )
+
+    @classmethod
+    def _from_zarr_source_(cls, path: Path, stat: os.stat_result) -> "NcMetadata":
+        from regrid_wrapper.esmpy.zarr_store import open_zarr_source
+
+        ds = open_zarr_source(path)
+        return cls(
+            path=path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            dimensions={k: v.size for k, v in ds.dimensions.items()},
+            variables={
+                k: VariableMetadata(
+                    dimensions=v.dimensions,
+                    shape=v.shape,
+                    dtype=str(v.dtype),
+                    attrs=v.attrs,
+                )
+                for k, v in ds.variables.items()
+            },
+            attrs=ds.attrs,
+        )
+
+    def is_current(self) -> bool:
+        stat = self.path.stat()
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+
+class MetadataCache:
+    # Headers are read once per file version. ``get`` reads on the calling rank
+    # while ``get_shared`` is collective and reads on rank 0 only. Digests of a
+    # file's data, e.g. grid fingerprints, are also kept per file version.
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[Path, NcMetadata] = {}
+        self._shared: Dict[Path, NcMetadata] = {}
+        self._digests: Dict[Tuple[Path, str], Tuple[int, int, str]] = {}
+
+    def get(self, path: Path) -> NcMetadata:
+        key = path.resolve()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry.is_current():
+            return entry
+        entry = NcMetadata.from_path(path)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def get_shared(self, path: Path) -> NcMetadata:
+        # Rank 0 decides whether the header last shared is still current so only
+        # a changed header is broadcast. Its errors are broadcast and raised on
+        # every rank.
+        key = path.resolve()
+        with self._lock:
+            shared = self._shared.get(key)
+        data = {}
+        if COMM.rank == 0:
+            try:
+                if shared is not None and shared.is_current():
+                    data = {"current": True}
+                else:
+                    data = {"entry": self.get(path).model_dump()}
+            except Exception as e:
+                data = {"error": e}
+        data = COMM.bcast(data, root=0)
+        if "error" in data:
+            raise data["error"]
+        if "current" in data:
+            assert shared is not None
+            return shared
+        entry = NcMetadata.model_validate(data["entry"])
+        with self._lock:
+            self._entries[key] = entry
+            self._shared[key] = entry
+        return entry
+
+    def get_digest(self, path: Path, key: str, compute: Callable[[], str]) -> str:
+        # ``key`` names what is digested, e.g. the variables read by ``compute``.
+        stat = path.stat()
+        version = (stat.st_size, stat.st_mtime_ns)
+        cache_key = (path.resolve(), key)
+        with self._lock:
+            entry = self._digests.get(cache_key)
+        if entry is not None and entry[:2] == version:
+            return entry[2]
+        digest = compute()
+        with self._lock:
+            self._digests[cache_key] = version + (digest,)
+        return digest
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._shared.clear()
+            self._digests.clear()
+
+
+METADATA_CACHE = MetadataCache()
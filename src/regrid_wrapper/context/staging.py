@@ -0,0 +1,94 @@
+import fcntl
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from enum import StrEnum, unique
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import netCDF4 as nc
+
+from regrid_wrapper.context.logging import LOGGER
+
+_LOGGER = LOGGER.getChild(__name__)
+
+# Linux ioctl sharing the source's blocks with the destination copy-on-write.
+FICLONE = 0x40049409
+STAGING_MAX_WORKERS = 8
+
+
+@unique
+class StagingMethod(StrEnum):
+    REFLINK = "reflink"
+    HARDLINK = "hardlink"
+    COPY = "copy"
+    # Decoded and re-encoded as netCDF4.
+    CONVERT = "convert"
+
+
+def reflink(src: Path, dst: Path) -> None:
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    except OSError:
+        dst.unlink(missing_ok=True)
+        raise
+
+
+def is_netcdf4(path: Path) -> bool:
+    with nc.Dataset(path, "r") as ds:
+        return ds.data_model.startswith("NETCDF4")
+
+
+def convert_to_netcdf4(src: Path, dst: Path) -> None:
+    import xarray as xr
+
+    with xr.open_dataset(src) as ds:
+        ds.to_netcdf(dst)
+
+
+def stage_file(src: Path, dst: Path) -> StagingMethod:
+    # Files already in the netCDF4 format are staged without decoding using the
+    # cheapest method available. A hard link shares the source's inode so staged
+    # files must only be read.
+    if not is_netcdf4(src):
+        convert_to_netcdf4(src, dst)
+        return StagingMethod.CONVERT
+    try:
+        reflink(src, dst)
+        return StagingMethod.REFLINK
+    except OSError:
+        pass
+    try:
+        os.link(src, dst)
+        return StagingMethod.HARDLINK
+    except OSError:
+        pass
+    shutil.copyfile(src, dst)
+    return StagingMethod.COPY
+
+
+def _stage_group_(src: Path, dsts: Sequence[Path]) -> Dict[Path, StagingMethod]:
+    # Only the first destination is staged from the source. The others are
+    # staged from it, which stays on the destination filesystem.
+    ret = {dsts[0]: stage_file(src, dsts[0])}
+    for dst in dsts[1:]:
+        ret[dst] = stage_file(dsts[0], dst)
+    for dst, method in ret.items():
+        _LOGGER.info("staged %s: %s -> %s", method, src, dst)
+    return ret
+
+
+def stage_files(
+    requests: Sequence[Tuple[Path, Path]], max_workers: int = STAGING_MAX_WORKERS
+) -> Dict[Path, StagingMethod]:
+    # ``requests`` are ``(src, dst)`` pairs. Sources are staged concurrently.
+    groups: Dict[Path, List[Path]] = {}
+    for src, dst in requests:
+        groups.setdefault(src.resolve(), []).append(dst)
+    ret: Dict[Path, StagingMethod] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_stage_group_, k, v) for k, v in groups.items()]
+        for future in futures:
+            ret.update(future.result())
+    return ret
@@ -1,19 +1,65 @@
 import abc
-from contextlib import contextmanager
+import hashlib
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import Tuple, Literal, Dict, Sequence, Any
+from typing import TYPE_CHECKING, Iterator, List, Tuple, Literal, Dict, Sequence, Any
 
 import numpy as np
-from pydantic import BaseModel, ConfigDict, field_validator, model_validator
-import esmpy
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    field_validator,
+    model_validator,
+)
 import netCDF4 as nc
 
-from mpi4py import MPI
-
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.env import get_env
+from regrid_wrapper.context.instrument import INSTRUMENT
 from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.context.metadata import METADATA_CACHE
+from regrid_wrapper.context.common import is_zarr_source
+from regrid_wrapper.esmpy.zarr_store import (
+    ZarrDataset,
+    ZarrVariable,
+    create_zarr_store,
+    is_zarr_path,
+    open_zarr_source,
+    open_zarr_variable,
+)
+from regrid_wrapper.model.spec import OutputEncodingSpec, Precision
+
+if TYPE_CHECKING:
+    import esmpy
 
 _LOGGER = LOGGER.getChild(__name__)
 
+DATASET_POOL_MAX_HANDLES = 8
+
+
+def _open_dataset_(
+    path: Path,
+    mode: Literal["r", "w", "a"],
+    clobber: bool,
+    parallel: bool,
+) -> nc.Dataset:
+    _LOGGER.debug("opening %s", path)
+    if parallel:
+        return nc.Dataset(
+            path,
+            mode=mode,
+            clobber=clobber,
+            parallel=parallel,
+            # The package communicator. It is always MPI_COMM_WORLD since
+            # concurrent operation groups run as separate MPI jobs.
+            comm=COMM.value,
+            info=COMM.MPI.Info(),
+        )
+    return nc.Dataset(path, mode=mode, clobber=clobber)
+
 
 @contextmanager
 def open_nc(
@@ -22,21 +68,95 @@ def open_nc(
     clobber: bool = False,
     parallel: bool = True,
 ) -> nc.Dataset:
-    _LOGGER.debug(f"opening {path}")
-    ds = nc.Dataset(
-        path,
-        mode=mode,
-        clobber=clobber,
-        parallel=parallel,
-        comm=MPI.COMM_WORLD,
-        info=MPI.Info(),
-    )
+    ds = _open_dataset_(path, mode, clobber, parallel)
     try:
         yield ds
     finally:
         ds.close()
 
 
+PoolKey = Tuple[Path, bool]
+
+
+class DatasetPool:
+    # Keeps datasets open between reads and writes during a session instead of an
+    # open/close cycle for every field. Parallel opens and closes are collective
+    # so every rank must acquire the same paths in the same order. Outside a
+    # session ``acquire`` opens and closes the dataset like ``open_nc``.
+
+    def __init__(self, max_handles: int = DATASET_POOL_MAX_HANDLES) -> None:
+        self._max_handles = max_handles
+        self._handles: OrderedDict[PoolKey, Tuple[str, nc.Dataset]] = OrderedDict()
+        self._depth = 0
+
+    @property
+    def is_active(self) -> bool:
+        return self._depth > 0
+
+    @contextmanager
+    def session(self) -> Iterator["DatasetPool"]:
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self.close_all()
+
+    @contextmanager
+    def acquire(
+        self,
+        path: Path,
+        mode: Literal["r", "a"] = "r",
+        parallel: bool = True,
+    ) -> Iterator[nc.Dataset]:
+        if not self.is_active:
+            with open_nc(path, mode=mode, parallel=parallel) as ds:
+                yield ds
+            return
+        key = (path.resolve(), parallel)
+        handle = self._handles.get(key)
+        # A dataset opened for appending also serves reads.
+        if handle is not None and mode == "a" and handle[0] == "r":
+            self.close(path, parallel=parallel)
+            handle = None
+        if handle is None:
+            handle = (mode, _open_dataset_(path, mode, False, parallel))
+            self._handles[key] = handle
+            while len(self._handles) > self._max_handles:
+                _, (_, evicted) = self._handles.popitem(last=False)
+                evicted.close()
+        self._handles.move_to_end(key)
+        yield handle[1]
+
+    def close(self, path: Path, parallel: bool = True) -> None:
+        handle = self._handles.pop((path.resolve(), parallel), None)
+        if handle is not None:
+            handle[1].close()
+
+    def close_all(self) -> None:
+        while len(self._handles) > 0:
+            _, (_, ds) = self._handles.popitem(last=False)
+            ds.close()
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+
+DATASET_POOL = DatasetPool()
+
+
+@contextmanager
+def open_source(path: Path) -> Iterator[nc.Dataset | ZarrDataset]:
+    # Collective. Zarr stores and reference files are read by every rank
+    # independently without MPI-IO.
+    if is_zarr_source(path):
+        yield open_zarr_source(path)
+    else:
+        with DATASET_POOL.acquire(path, "r") as ds:
+            yield ds
+
+
 def copy_nc_attrs(src: nc.Dataset | nc.Variable, dst: nc.Dataset | nc.Variable) -> None:
     for attr in src.ncattrs():
         if attr.startswith("_"):
@@ -44,24 +164,45 @@ def copy_nc_attrs(src: nc.Dataset | nc.Variable, dst: nc.Dataset | nc.Variable)
         setattr(dst, attr, getattr(src, attr))
 
 
+@INSTRUMENT.span("resize_nc")
 def resize_nc(
     src_path: Path,
     dst_path: Path,
     new_sizes: Dict[str, int],
     copy_values_for: Sequence[str] | None = None,
+    encoding: OutputEncodingSpec | None = None,
+    chunk_sizes: Dict[str, int] | None = None,
+    dtypes: Dict[str, np.dtype] | None = None,
 ) -> None:
-    with open_nc(src_path, mode="r") as src:
+    # ``dtypes`` overrides the data type of the named variables.
+    if is_zarr_path(dst_path):
+        dimensions = METADATA_CACHE.get_shared(src_path).dimensions
+        sizes = {ii: get_aliased_key(new_sizes, ii) for ii in dimensions}
+        create_zarr_store(
+            src_path, dst_path, sizes, copy_values_for, encoding, chunk_sizes, dtypes
+        )
+        return
+    DATASET_POOL.close(dst_path)
+    with DATASET_POOL.acquire(src_path, mode="r") as src:
         with open_nc(dst_path, mode="w") as dst:
             copy_nc_attrs(src, dst)
             for dim in src.dimensions:
                 size = get_aliased_key(new_sizes, dim)
                 dst.createDimension(dim, size=size)
             for varname, var in src.variables.items():
+                dtype = (dtypes or {}).get(varname, var.dtype)
                 fill_value = (
-                    getattr(var, "_FillValue") if hasattr(var, "_FillValue") else None
+                    np.dtype(dtype).type(getattr(var, "_FillValue"))
+                    if hasattr(var, "_FillValue")
+                    else None
                 )
+                kwargs = {}
+                if encoding is not None:
+                    kwargs = encoding.create_variable_kwargs(
+                        var.dimensions, chunk_sizes or {}
+                    )
                 new_var = dst.createVariable(
-                    varname, var.dtype, var.dimensions, fill_value=fill_value
+                    varname, dtype, var.dimensions, fill_value=fill_value, **kwargs
                 )
                 copy_nc_attrs(var, new_var)
                 if copy_values_for and varname in copy_values_for:
@@ -88,6 +229,13 @@ def get_nc_dimension(ds: nc.Dataset, names: NameListType) -> nc.Dimension:
     return get_aliased_key(ds.dimensions, names)
 
 
+def _default_staggerloc_() -> int:
+    # esmpy is imported on first use so planning operations does not pull it in.
+    import esmpy
+
+    return esmpy.StaggerLoc.CENTER
+
+
 class Dimension(BaseModel):
     name: NameListType
     size: int
@@ -120,23 +268,170 @@ def create_dimension_map(dims: DimensionCollection) -> Dict[str, int]:
     return ret
 
 
+def get_variable_attrs(var: nc.Variable | ZarrVariable) -> Dict[str, Any]:
+    # Zarr variables keep their attributes in ``attrs``.
+    if isinstance(var, ZarrVariable):
+        return var.attrs
+    return {ii: var.getncattr(ii) for ii in var.ncattrs()}
+
+
+def is_packed(var: nc.Variable | ZarrVariable) -> bool:
+    attrs = get_variable_attrs(var)
+    return any(ii in attrs for ii in ("scale_factor", "add_offset"))
+
+
+@contextmanager
+def raw_variable(var: nc.Variable | ZarrVariable, raw: bool) -> Iterator[None]:
+    # netCDF4 builds a mask by comparing every element against the fill values
+    # and returns a masked array. Zarr variables are always read raw.
+    is_raw = raw and isinstance(var, nc.Variable)
+    if is_raw:
+        var.set_auto_maskandscale(False)
+    try:
+        yield
+    finally:
+        if is_raw:
+            var.set_auto_maskandscale(True)
+
+
+def unpack_variable_data(
+    var: nc.Variable | ZarrVariable, data: np.ndarray
+) -> np.ndarray:
+    # Same values as netCDF4's automatic scaling. Elements netCDF4 would mask
+    # keep the value they are stored with.
+    var_attrs = get_variable_attrs(var)
+    scale_factor = var_attrs.get("scale_factor")
+    add_offset = var_attrs.get("add_offset")
+    fill_values = [
+        var_attrs.get("_FillValue", nc.default_fillvals.get(data.dtype.str[1:]))
+    ]
+    fill_values += np.atleast_1d(var_attrs.get("missing_value", [])).tolist()
+    is_fill = np.isin(data, [ii for ii in fill_values if ii is not None])
+    attrs = [ii for ii in (scale_factor, add_offset) if ii is not None]
+    ret = data.astype(np.result_type(*attrs))
+    if scale_factor is not None:
+        ret *= scale_factor
+    if add_offset is not None:
+        ret += add_offset
+    if is_fill.any():
+        ret[is_fill] = data[is_fill]
+    return ret
+
+
 def load_variable_data(
-    var: nc.Variable, target_dims: DimensionCollection
+    var: nc.Variable | ZarrVariable,
+    target_dims: DimensionCollection,
+    raw: bool | None = None,
 ) -> np.ndarray:
+    # ``raw`` defaults to the ``RAW_IO`` setting.
+    if raw is None:
+        raw = get_env().RAW_IO
     slices = [
         slice(target_dims.get(ii).lower, target_dims.get(ii).upper)
         for ii in var.dimensions
     ]
-    raw_data = var[*slices]
+    with raw_variable(var, raw):
+        raw_data = var[*slices]
+    # Zarr variables are read raw either way.
+    if (raw or isinstance(var, ZarrVariable)) and is_packed(var):
+        raw_data = unpack_variable_data(var, raw_data)
+    INSTRUMENT.add_bytes("load_variable_data_bytes", raw_data.nbytes)
     dim_map = {dim: ii for ii, dim in enumerate(var.dimensions)}
     axes = [get_aliased_key(dim_map, ii.name) for ii in target_dims.value]
     transposed_data = raw_data.transpose(axes)
     return transposed_data
 
 
+Bounds = Tuple[int, int]
+
+
+def get_decomposition_chunk_sizes(dims: DimensionCollection) -> Dict[str, int]:
+    # Chunks spanning the largest block held by any rank so each rank writes to
+    # as few chunks as possible.
+    ret = {}
+    for dim in dims.value:
+        size = COMM.value.allreduce(dim.upper - dim.lower, op=COMM.MPI.MAX)
+        for name in dim.name:
+            ret[name] = max(size, 1)
+    return ret
+
+
+def is_filtered(var: nc.Variable) -> bool:
+    filters = var.filters() or {}
+    return any(v for k, v in filters.items() if k != "complevel")
+
+
+def _get_chunk_bounds_(lower: int, upper: int, size: int, chunk: int) -> Bounds:
+    # Elements of the chunks starting in ``[lower, upper)``.
+    start = min(-(-lower // chunk) * chunk, size)
+    if start >= upper:
+        return start, start
+    return start, min(-(-upper // chunk) * chunk, size)
+
+
+def _intersect_bounds_(
+    lhs: Sequence[Bounds], rhs: Sequence[Bounds]
+) -> List[Bounds] | None:
+    ret = [(max(ii[0], jj[0]), min(ii[1], jj[1])) for ii, jj in zip(lhs, rhs)]
+    if any(lower >= upper for lower, upper in ret):
+        return None
+    return ret
+
+
+def set_zarr_variable_data(
+    path: Path, name: str, target_dims: DimensionCollection, target_data: np.ndarray
+) -> np.ndarray:
+    # Collective. Every chunk is written by the rank whose block holds its first
+    # element so no two ranks write to the same chunk. Chunks do not need to
+    # line up with the blocks: the parts of a block falling in chunks written
+    # by another rank are sent to that rank first.
+    var = open_zarr_variable(path, name)
+    dim_map = create_dimension_map(target_dims)
+    data = target_data.transpose(
+        [get_aliased_key(dim_map, ii) for ii in var.dimensions]
+    )
+    block = [
+        (target_dims.get(ii).lower, target_dims.get(ii).upper) for ii in var.dimensions
+    ]
+    owned = [
+        _get_chunk_bounds_(lower, upper, size, chunk)
+        for (lower, upper), size, chunk in zip(block, var.shape, var.chunks)
+    ]
+    sends = []
+    for dst_owned in COMM.value.allgather(owned):
+        bounds = _intersect_bounds_(block, dst_owned)
+        if bounds is None:
+            sends.append(None)
+            continue
+        src = tuple(
+            slice(lo - ii[0], hi - ii[0]) for (lo, hi), ii in zip(bounds, block)
+        )
+        sends.append((bounds, data[src]))
+    ret = np.empty([upper - lower for lower, upper in owned], dtype=data.dtype)
+    for item in COMM.value.alltoall(sends):
+        if item is None:
+            continue
+        bounds, piece = item
+        dst = tuple(
+            slice(lo - ii[0], hi - ii[0]) for (lo, hi), ii in zip(bounds, owned)
+        )
+        ret[dst] = piece
+    if ret.size > 0:
+        var[tuple(slice(lower, upper) for lower, upper in owned)] = ret
+    INSTRUMENT.add_bytes("set_variable_data_bytes", ret.nbytes)
+    return data
+
+
 def set_variable_data(
-    var: nc.Variable, target_dims: DimensionCollection, target_data: np.ndarray
+    var: nc.Variable,
+    target_dims: DimensionCollection,
+    target_data: np.ndarray,
+    collective: bool = False,
+    raw: bool | None = None,
 ) -> np.ndarray:
+    # Packed variables are always written through netCDF4's automatic scaling.
+    if raw is None:
+        raw = get_env().RAW_IO
     dim_map = create_dimension_map(target_dims)
     axes = [get_aliased_key(dim_map, ii) for ii in var.dimensions]
     transposed_data = target_data.transpose(axes)
@@ -144,10 +439,16 @@ def set_variable_data(
         slice(target_dims.get(ii).lower, target_dims.get(ii).upper)
         for ii in var.dimensions
     ]
-    _LOGGER.debug(f"var.shape: {var.shape}")
-    _LOGGER.debug(f"transposed_data.shape: {transposed_data.shape}")
-    _LOGGER.debug(f"slices: {slices}")
-    var[*slices] = transposed_data
+    _LOGGER.debug("var.shape: %s", var.shape)
+    _LOGGER.debug("transposed_data.shape: %s", transposed_data.shape)
+    _LOGGER.debug("slices: %s", slices)
+    if collective:
+        # Parallel HDF5 only writes filtered variables collectively so every
+        # rank must take part in the write.
+        var.set_collective(True)
+    with raw_variable(var, raw and not is_packed(var)):
+        var[*slices] = transposed_data
+    INSTRUMENT.add_bytes("set_variable_data_bytes", transposed_data.nbytes)
     return transposed_data
 
 
@@ -197,15 +498,21 @@ class GridSpec(BaseModel):
             raise ValueError
         return self.y_corner
 
-    def get_x_data(self, grid: esmpy.Grid, staggerloc: esmpy.StaggerLoc) -> np.ndarray:
+    def get_x_data(
+        self, grid: "esmpy.Grid", staggerloc: "esmpy.StaggerLoc"
+    ) -> np.ndarray:
         return grid.get_coords(self.x_index, staggerloc=staggerloc)
 
-    def get_y_data(self, grid: esmpy.Grid, staggerloc: esmpy.StaggerLoc) -> np.ndarray:
+    def get_y_data(
+        self, grid: "esmpy.Grid", staggerloc: "esmpy.StaggerLoc"
+    ) -> np.ndarray:
         return grid.get_coords(self.y_index, staggerloc=staggerloc)
 
     def create_grid_dims(
-        self, ds: nc.Dataset, grid: esmpy.Grid, staggerloc: esmpy.StaggerLoc
+        self, ds: nc.Dataset, grid: "esmpy.Grid", staggerloc: "esmpy.StaggerLoc"
     ) -> DimensionCollection:
+        import esmpy
+
         if staggerloc == esmpy.StaggerLoc.CENTER:
             x_dim, y_dim = self.x_dim, self.y_dim
         elif staggerloc == esmpy.StaggerLoc.CORNER:
@@ -236,31 +543,47 @@ class GridSpec(BaseModel):
 
 
 class GridWrapper(AbstractWrapper):
-    value: esmpy.Grid
+    # An ``esmpy.Grid``. esmpy is imported on first use.
+    value: Any
     spec: GridSpec
     corner_dims: DimensionCollection | None = None
+    source: "NcToGrid | None" = None
 
+    @INSTRUMENT.span("fill_nc_variables")
     def fill_nc_variables(self, path: Path):
+        import esmpy
+
         if self.corner_dims is not None:
             raise NotImplementedError
-        with open_nc(path, "a") as ds:
-            staggerloc = esmpy.StaggerLoc.CENTER
-            x_center_data = self.spec.get_x_data(self.value, staggerloc)
-            set_variable_data(
-                ds.variables[self.spec.x_center], self.dims, x_center_data
-            )
-            y_center_data = self.spec.get_y_data(self.value, staggerloc)
-            set_variable_data(
-                ds.variables[self.spec.y_center], self.dims, y_center_data
-            )
+        staggerloc = esmpy.StaggerLoc.CENTER
+        coords = [
+            (self.spec.x_center, self.spec.get_x_data(self.value, staggerloc)),
+            (self.spec.y_center, self.spec.get_y_data(self.value, staggerloc)),
+        ]
+        if is_zarr_path(path):
+            for name, data in coords:
+                set_zarr_variable_data(path, name, self.dims, data)
+            return
+        with DATASET_POOL.acquire(path, "a") as ds:
+            for name, data in coords:
+                var = ds.variables[name]
+                set_variable_data(var, self.dims, data, collective=is_filtered(var))
 
 
 class NcToGrid(BaseModel):
     path: Path
     spec: GridSpec
+    _fingerprint: str | None = PrivateAttr(default=None)
 
     def create_grid_wrapper(self) -> GridWrapper:
-        with open_nc(self.path, "r") as ds:
+        return GRID_REGISTRY.get(self)
+
+    @INSTRUMENT.span("load_grid")
+    def create_uncached_grid_wrapper(self) -> GridWrapper:
+        # A new grid outside of the grid registry. The caller destroys it.
+        import esmpy
+
+        with open_source(self.path) as ds:
             grid_shape = np.array(
                 [
                     get_nc_dimension(ds, self.spec.x_dim).size,
@@ -289,13 +612,50 @@ class NcToGrid(BaseModel):
                 corner_dims = None
 
             gwrap = GridWrapper(
-                value=grid, dims=dims, spec=self.spec, corner_dims=corner_dims
+                value=grid,
+                dims=dims,
+                spec=self.spec,
+                corner_dims=corner_dims,
+                source=self,
             )
             return gwrap
 
+    def fingerprint(self) -> str:
+        # Only coordinate values contribute so identical grids in different files
+        # share a fingerprint.
+        if self._fingerprint is not None:
+            return self._fingerprint
+        # Definitions are recreated for every operation so the digest is kept
+        # in the metadata cache and each file version is read once per process.
+        digest = None
+        if COMM.rank == 0:
+            digest = METADATA_CACHE.get_digest(
+                self.path, self.spec.model_dump_json(), self._compute_fingerprint_
+            )
+        self._fingerprint = COMM.bcast({"fingerprint": digest}, root=0)["fingerprint"]
+        return self._fingerprint
+
+    def _compute_fingerprint_(self) -> str:
+        names = [self.spec.x_center, self.spec.y_center]
+        if self.spec.has_corners:
+            names += [self.spec.get_x_corner(), self.spec.get_y_corner()]
+        sha = hashlib.sha256()
+        if is_zarr_source(self.path):
+            ds_context = nullcontext(open_zarr_source(self.path))
+        else:
+            ds_context = open_nc(self.path, "r", parallel=False)
+        with ds_context as ds:
+            for name in names:
+                data = np.ma.getdata(ds.variables[name][:])
+                sha.update(str(data.shape).encode())
+                sha.update(np.ascontiguousarray(data, dtype=np.float64).tobytes())
+        return sha.hexdigest()
+
     def _add_corner_coords_(
-        self, ds: nc.Dataset, grid: esmpy.Grid
+        self, ds: nc.Dataset, grid: "esmpy.Grid"
     ) -> DimensionCollection:
+        import esmpy
+
         staggerloc = esmpy.StaggerLoc.CORNER
         grid.add_coords(staggerloc)
         dims = self.spec.create_grid_dims(ds, grid, staggerloc)
@@ -310,15 +670,85 @@ class NcToGrid(BaseModel):
         return dims
 
 
+GridWrapper.model_rebuild()
+
+GridKey = Tuple[str, str, Tuple[int, ...], int]
+
+
+class GridRegistry:
+    # Grids are shared by every operation reading the same coordinates. A grid is
+    # destroyed when its last reservation is released.
+
+    def __init__(self) -> None:
+        self._gwraps: Dict[GridKey, GridWrapper] = {}
+        self._consumers: Dict[GridKey, int] = {}
+
+    @staticmethod
+    def create_key(nc2grid: NcToGrid) -> GridKey:
+        import esmpy
+
+        staggerlocs = [esmpy.StaggerLoc.CENTER]
+        if nc2grid.spec.has_corners:
+            staggerlocs.append(esmpy.StaggerLoc.CORNER)
+        return (
+            str(nc2grid.path.resolve()),
+            nc2grid.spec.model_dump_json(),
+            tuple(staggerlocs),
+            COMM.value.py2f(),
+        )
+
+    def reserve(self, nc2grids: Sequence[NcToGrid]) -> None:
+        for key in {self.create_key(ii) for ii in nc2grids}:
+            self._consumers[key] = self._consumers.get(key, 0) + 1
+
+    def release(self, nc2grids: Sequence[NcToGrid]) -> None:
+        for key in {self.create_key(ii) for ii in nc2grids}:
+            if key not in self._consumers:
+                continue
+            self._consumers[key] -= 1
+            if self._consumers[key] > 0:
+                continue
+            del self._consumers[key]
+            gwrap = self._gwraps.pop(key, None)
+            if gwrap is not None:
+                _LOGGER.info(f"destroying grid: {key[0]}")
+                gwrap.value.destroy()
+
+    def get(self, nc2grid: NcToGrid) -> GridWrapper:
+        key = self.create_key(nc2grid)
+        if key not in self._consumers:
+            # Without a reservation the grid belongs to the requesting operation.
+            self._consumers[key] = 1
+        if key not in self._gwraps:
+            _LOGGER.info(f"creating grid: {key[0]}")
+            self._gwraps[key] = nc2grid.create_uncached_grid_wrapper()
+        else:
+            _LOGGER.info(f"reusing grid: {key[0]}")
+        return self._gwraps[key]
+
+    def __len__(self) -> int:
+        return len(self._gwraps)
+
+
+GRID_REGISTRY = GridRegistry()
+
+
 class FieldWrapper(AbstractWrapper):
-    value: esmpy.Field
+    # An ``esmpy.Field``.
+    value: Any
     gwrap: GridWrapper
 
+    @INSTRUMENT.span("fill_nc_variable")
     def fill_nc_variable(self, path: Path):
-        _LOGGER.debug(r"filling variable: {self.value.name}")
-        with open_nc(path, "a") as ds:
+        _LOGGER.debug("filling variable: %s", self.value.name)
+        if is_zarr_path(path):
+            set_zarr_variable_data(path, self.value.name, self.dims, self.value.data)
+            return
+        with DATASET_POOL.acquire(path, "a") as ds:
             var = ds.variables[self.value.name]
-            set_variable_data(var, self.dims, self.value.data)
+            set_variable_data(
+                var, self.dims, self.value.data, collective=is_filtered(var)
+            )
 
 
 class NcToField(BaseModel):
@@ -326,20 +756,28 @@ class NcToField(BaseModel):
     name: str
     gwrap: GridWrapper
     dim_time: NameListType | None = None
-    staggerloc: int = esmpy.StaggerLoc.CENTER
+    # Half-open range of time indices to load. Defaults to the whole dimension.
+    time_bounds: Tuple[int, int] | None = None
+    staggerloc: int = Field(default_factory=_default_staggerloc_)
+    precision: Precision = Precision.FLOAT64
 
+    @INSTRUMENT.span("load_field")
     def create_field_wrapper(self) -> FieldWrapper:
-        with open_nc(self.path, "r") as ds:
+        import esmpy
+
+        with open_source(self.path) as ds:
             if self.dim_time is None:
                 ndbounds = None
                 target_dims = self.gwrap.dims
             else:
-                ndbounds = (get_nc_dimension(ds, self.dim_time).size,)
+                size = get_nc_dimension(ds, self.dim_time).size
+                lower, upper = self.time_bounds or (0, size)
+                ndbounds = (upper - lower,)
                 time_dim = Dimension(
                     name=self.dim_time,
-                    size=ndbounds[0],
-                    lower=0,
-                    upper=ndbounds[0],
+                    size=size,
+                    lower=lower,
+                    upper=upper,
                     staggerloc=self.staggerloc,
                     coordinate_type="time",
                 )
@@ -349,6 +787,7 @@ class NcToField(BaseModel):
             field = esmpy.Field(
                 self.gwrap.value,
                 name=self.name,
+                typekind=get_typekind(self.precision),
                 ndbounds=ndbounds,
                 staggerloc=self.staggerloc,
             )
@@ -357,6 +796,56 @@ class NcToField(BaseModel):
             return fwrap
 
 
+def iter_time_chunks(size: int, chunk_size: int | None) -> List[Tuple[int, int]]:
+    # Half-open bounds covering ``size`` time steps. ``None`` is a single chunk.
+    if chunk_size is None or size == 0:
+        return [(0, size)]
+    return [(ii, min(ii + chunk_size, size)) for ii in range(0, size, chunk_size)]
+
+
+def get_typekind(precision: Precision | np.dtype) -> int:
+    import esmpy
+
+    if np.dtype(precision) == np.float32:
+        return esmpy.TypeKind.R4
+    return esmpy.TypeKind.R8
+
+
+def get_precision_dtypes(
+    names: Sequence[str], precision: Precision
+) -> Dict[str, np.dtype]:
+    # Output data types of regridded variables. Double precision keeps the data
+    # types of the source variables.
+    if precision == Precision.FLOAT64:
+        return {}
+    return {ii: np.dtype(precision) for ii in names}
+
+
+def create_field_wrapper_like(
+    like: FieldWrapper, gwrap: GridWrapper, name: str, fill_value: Any
+) -> FieldWrapper:
+    # A field with the non-spatial dimensions of ``like`` on ``gwrap``. Nothing is
+    # read so the data starts at ``fill_value`` like a variable never written to.
+    import esmpy
+
+    extra_dims = [ii for ii in like.dims.value if ii.coordinate_type == "time"]
+    ndbounds = tuple(ii.upper - ii.lower for ii in extra_dims) or None
+    field = esmpy.Field(
+        gwrap.value,
+        name=name,
+        typekind=get_typekind(like.value.data.dtype),
+        ndbounds=ndbounds,
+        staggerloc=like.value.staggerloc,
+    )
+    field.data[:] = fill_value
+    target_dims = DimensionCollection(value=list(gwrap.dims.value) + extra_dims)
+    return FieldWrapper(value=field, dims=target_dims, gwrap=gwrap)
+
+
+def get_fill_value(path: Path, name: str) -> Any:
+    return METADATA_CACHE.get_shared(path).variables[name].fill_value
+
+
 class FieldWrapperCollection(BaseModel):
     value: Tuple[FieldWrapper, ...]
 
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING, List
+
+from pydantic import BaseModel, ConfigDict
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.instrument import INSTRUMENT
+from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.esmpy.field_wrapper import NcToGrid
+from regrid_wrapper.model.spec import WeightCacheSpec
+
+if TYPE_CHECKING:
+    import esmpy
+
+_LOGGER = LOGGER.getChild(__name__)
+
+
+class RegridOptions(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    regrid_method: int
+    unmapped_action: int
+    ignore_degenerate: bool = False
+
+    @INSTRUMENT.span("generate_weights")
+    def create_regrid(
+        self, src_field: "esmpy.Field", dst_field: "esmpy.Field", filename: Path
+    ) -> "esmpy.Regrid":
+        import esmpy
+
+        return esmpy.Regrid(
+            src_field,
+            dst_field,
+            regrid_method=self.regrid_method,
+            filename=str(filename),
+            unmapped_action=self.unmapped_action,
+            ignore_degenerate=self.ignore_degenerate,
+        )
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def copy_file(src: Path, dst: Path) -> None:
+    # A copy never shares an inode with its source. copy_file_range lets
+    # filesystems that support it clone the extents instead of copying data.
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    raise OSError("source file truncated while copying")
+                remaining -= copied
+    except (AttributeError, OSError):
+        shutil.copyfile(src, dst)
+
+
+class WeightStore(BaseModel):
+    spec: WeightCacheSpec
+
+    @staticmethod
+    def create_key(src: NcToGrid, dst: NcToGrid, options: RegridOptions) -> str:
+        sha = hashlib.sha256()
+        sha.update(src.fingerprint().encode())
+        sha.update(dst.fingerprint().encode())
+        sha.update(options.model_dump_json().encode())
+        return sha.hexdigest()
+
+    def entry_path(self, key: str) -> Path:
+        return self.spec.directory / f"{key}.nc"
+
+    def access_path(self, key: str) -> Path:
+        # Last use of an entry. Entries are copied to run outputs so their own
+        # modification time is left alone.
+        return self.spec.directory / f"{key}.access"
+
+    def _last_access_(self, path: Path) -> float:
+        access = self.access_path(path.stem)
+        if access.exists():
+            return access.stat().st_mtime
+        return path.stat().st_mtime
+
+    def fetch(self, key: str, dst: Path) -> bool:
+        is_hit = False
+        if COMM.rank == 0:
+            entry = self.entry_path(key)
+            if entry.exists():
+                self.access_path(key).touch()
+                copy_file(entry, dst)
+                is_hit = True
+        return COMM.bcast({"is_hit": is_hit}, root=0)["is_hit"]
+
+    def put(self, key: str, src: Path) -> None:
+        COMM.barrier()
+        if COMM.rank == 0:
+            self.spec.directory.mkdir(parents=True, exist_ok=True)
+            entry = self.entry_path(key)
+            tmp = self.spec.directory / f".{key}.{os.getpid()}.tmp"
+            copy_file(src, tmp)
+            os.replace(tmp, entry)
+            self.access_path(key).touch()
+            _LOGGER.info(f"stored weight file: {entry}")
+            self.evict(keep=key)
+        COMM.barrier()
+
+    def evict(self, keep: str | None = None) -> List[Path]:
+        entries = [
+            (ii.stat(), self._last_access_(ii), ii)
+            for ii in self.spec.directory.glob("*.nc")
+            if ii.stem != keep
+        ]
+        total = sum(ii[0].st_size for ii in entries)
+        if keep is not None and self.entry_path(keep).exists():
+            total += self.entry_path(keep).stat().st_size
+        evicted = []
+        for stat, _, path in sorted(entries, key=lambda x: x[1]):
+            if total <= self.spec.max_bytes:
+                break
+            _LOGGER.info(f"evicting weight file: {path}")
+            path.unlink(missing_ok=True)
+            self.access_path(path.stem).unlink(missing_ok=True)
+            total -= stat.st_size
+            evicted.append(path)
+        return evicted
@@ -0,0 +1,220 @@
+import itertools
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Sequence, Tuple
+
+import netCDF4 as nc
+import numpy as np
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.common import ZARR_REFERENCE_SUFFIX, ZARR_SUFFIX
+from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.context.metadata import read_nc_attrs
+from regrid_wrapper.model.spec import OutputEncodingSpec
+
+if TYPE_CHECKING:
+    import zarr
+
+_LOGGER = LOGGER.getChild(__name__)
+
+ZARR_READ_MAX_WORKERS = 8
+# Dimension names of zarr v2 arrays, e.g. from kerchunk references.
+ZARR_DIMENSIONS_ATTR = "_ARRAY_DIMENSIONS"
+
+
+def is_zarr_path(path: Path) -> bool:
+    return path.suffix == ZARR_SUFFIX
+
+
+class ZarrVariable:
+    # The parts of ``nc.Variable`` used when reading and writing data. Reads
+    # fetch the selected chunks concurrently.
+
+    def __init__(
+        self, array: "zarr.Array", max_workers: int = ZARR_READ_MAX_WORKERS
+    ) -> None:
+        self._array = array
+        self._max_workers = max_workers
+
+    @property
+    def dimensions(self) -> Tuple[str, ...]:
+        names = getattr(self._array.metadata, "dimension_names", None)
+        if names is None:
+            names = self._array.attrs[ZARR_DIMENSIONS_ATTR]
+        return tuple(names)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._array.dtype
+
+    @property
+    def attrs(self) -> Dict[str, Any]:
+        ret = {k: v for k, v in self._array.attrs.items() if k != ZARR_DIMENSIONS_ATTR}
+        if "_FillValue" not in ret and self._array.fill_value is not None:
+            ret["_FillValue"] = np.asarray(self._array.fill_value).tolist()
+        return ret
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self._array.shape
+
+    @property
+    def chunks(self) -> Tuple[int, ...]:
+        return self._array.chunks
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        # Only contiguous selections are supported.
+        if not isinstance(key, tuple):
+            key = (key,)
+        key = key + (slice(None),) * (len(self.shape) - len(key))
+        bounds = [ii.indices(size)[:2] for ii, size in zip(key, self.shape)]
+        ret = np.empty([max(stop - start, 0) for start, stop in bounds], self.dtype)
+        regions = itertools.product(
+            *[
+                _iter_chunk_ranges_(start, stop, chunk)
+                for (start, stop), chunk in zip(bounds, self.chunks)
+            ]
+        )
+
+        def read(region: Tuple[Tuple[int, int], ...]) -> None:
+            src = tuple(slice(lo, hi) for lo, hi in region)
+            dst = tuple(
+                slice(lo - start, hi - start)
+                for (lo, hi), (start, _) in zip(region, bounds)
+            )
+            ret[dst] = self._array[src]
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            _ = list(pool.map(read, regions))
+        return ret
+
+    def __setitem__(self, key: Any, value: np.ndarray) -> None:
+        self._array[key] = value
+
+
+def _iter_chunk_ranges_(start: int, stop: int, chunk: int) -> List[Tuple[int, int]]:
+    ret = []
+    lower = start
+    while lower < stop:
+        upper = min((lower // chunk + 1) * chunk, stop)
+        ret.append((lower, upper))
+        lower = upper
+    return ret
+
+
+class ZarrDimension(NamedTuple):
+    name: str
+    size: int
+
+
+class ZarrDataset:
+    # The parts of ``nc.Dataset`` used when loading grids and fields. A
+    # reference file opens the netCDF chunks it points to without MPI-IO.
+
+    def __init__(self, group: "zarr.Group") -> None:
+        self.attrs = dict(group.attrs)
+        self.variables = {k: ZarrVariable(v) for k, v in group.arrays()}
+        self.dimensions: Dict[str, ZarrDimension] = {}
+        for var in self.variables.values():
+            for name, size in zip(var.dimensions, var.shape):
+                self.dimensions[name] = ZarrDimension(name=name, size=size)
+
+
+def open_zarr_source(path: Path) -> ZarrDataset:
+    import zarr
+
+    if path.suffix == ZARR_REFERENCE_SUFFIX:
+        group = zarr.open_group(
+            "reference://", mode="r", storage_options={"fo": str(path)}
+        )
+    else:
+        group = zarr.open_group(str(path), mode="r")
+    return ZarrDataset(group)
+
+
+def open_zarr_variable(path: Path, name: str) -> ZarrVariable:
+    # zarr is an optional dependency only needed for zarr outputs.
+    import zarr
+
+    return ZarrVariable(zarr.open_group(str(path), mode="r+")[name])
+
+
+def create_zarr_chunks(
+    dimensions: Sequence[str], shape: Sequence[int], chunk_sizes: Dict[str, int]
+) -> Tuple[int, ...]:
+    # Chunks of gridded variables match the decomposition so no two ranks write
+    # to the same chunk. Other variables are a single chunk.
+    if not any(ii in chunk_sizes for ii in dimensions):
+        return tuple(max(ii, 1) for ii in shape)
+    return tuple(chunk_sizes.get(ii, 1) for ii in dimensions)
+
+
+def create_zarr_compressors(encoding: OutputEncodingSpec | None) -> Any:
+    # Deflate and shuffle map to Blosc's zlib codec and byte shuffle.
+    if encoding is None or not encoding.zlib:
+        return None
+    from zarr.codecs import BloscCodec
+
+    return BloscCodec(
+        cname="zlib",
+        clevel=encoding.complevel,
+        shuffle="shuffle" if encoding.shuffle else "noshuffle",
+    )
+
+
+def create_zarr_store(
+    src_path: Path,
+    dst_path: Path,
+    sizes: Dict[str, int],
+    copy_values_for: Sequence[str] | None = None,
+    encoding: OutputEncodingSpec | None = None,
+    chunk_sizes: Dict[str, int] | None = None,
+    dtypes: Dict[str, np.dtype] | None = None,
+) -> None:
+    # The store's metadata is written once by rank 0. Data chunks are written
+    # independently by every rank afterwards.
+    if COMM.rank == 0:
+        import zarr
+
+        if dst_path.exists():
+            shutil.rmtree(dst_path)
+        with nc.Dataset(src_path, "r") as src:
+            group = zarr.open_group(str(dst_path), mode="w")
+            group.attrs.update(_filter_attrs_(read_nc_attrs(src)))
+            for varname, var in src.variables.items():
+                shape = tuple(sizes[ii] for ii in var.dimensions)
+                dtype = np.dtype((dtypes or {}).get(varname, var.dtype))
+                fill_value = getattr(var, "_FillValue", None)
+                array = group.create_array(
+                    varname,
+                    shape=shape,
+                    chunks=create_zarr_chunks(var.dimensions, shape, chunk_sizes or {}),
+                    dtype=dtype,
+                    fill_value=None if fill_value is None else dtype.type(fill_value),
+                    compressors=create_zarr_compressors(encoding),
+                    dimension_names=var.dimensions,
+                    attributes=_filter_attrs_(read_nc_attrs(var)),
+                )
+                if copy_values_for and varname in copy_values_for:
+                    array[:] = var[:]
+    COMM.barrier()
+
+
+def consolidate_zarr_store(store_path: Path, dst_path: Path) -> None:
+    # Collective. Rank 0 converts the store after every rank finished writing.
+    COMM.barrier()
+    if COMM.rank == 0:
+        import xarray as xr
+
+        _LOGGER.info("consolidating %s -> %s", store_path, dst_path)
+        with xr.open_zarr(
+            str(store_path), consolidated=False, mask_and_scale=False
+        ) as ds:
+            ds.to_netcdf(dst_path)
+        shutil.rmtree(store_path)
+    COMM.barrier()
+
+
+def _filter_attrs_(attrs: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in attrs.items() if not k.startswith("_")}
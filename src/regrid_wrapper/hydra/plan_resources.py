@@ -0,0 +1,87 @@
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+import hydra
+from omegaconf import DictConfig
+
+from regrid_wrapper.concrete.core import iter_operations
+from regrid_wrapper.context.instrument import RunReport
+from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.hydra.task_prep import create_main_job, load_resource_model
+from regrid_wrapper.model.config import (
+    ComponentKey,
+    ResourceLimits,
+    SmokeDustRegridConfig,
+)
+from regrid_wrapper.strategy.operation import AbstractRegridOperation
+from regrid_wrapper.strategy.resources import (
+    ResourceModel,
+    ResourcePlan,
+    calibrate_resource_model,
+)
+
+
+def create_scratch_config(
+    cfg: SmokeDustRegridConfig, directory: Path
+) -> SmokeDustRegridConfig:
+    # Operations are created against a scratch tree of links to the source grids
+    # so their specs validate without staging any data.
+    scratch = cfg.model_copy(update={"root_output_directory": directory})
+    rave_grid = Path(cfg.source_definition.components[ComponentKey.RAVE_GRID].grid)
+    for grid_key in cfg.target_grids:
+        rrfs_grid = Path(cfg.source_definition.rrfs_grids[grid_key].grid)
+        scratch.output_directory(grid_key).mkdir(parents=True)
+        scratch.model_grid_path(grid_key).symlink_to(rrfs_grid.resolve())
+        scratch.rave_grid_path(grid_key).symlink_to(rave_grid.resolve())
+    return scratch
+
+
+def _iter_scratch_operations_(
+    cfg: SmokeDustRegridConfig, directory: Path
+) -> List[AbstractRegridOperation]:
+    return list(iter_operations(create_scratch_config(cfg, directory)))
+
+
+def do_plan_resources(cfg: SmokeDustRegridConfig) -> Tuple[ResourcePlan, str]:
+    # Dry run: nothing is written under the root output directory.
+    if cfg.resources is None:
+        cfg = cfg.model_copy(update={"resources": ResourceLimits()})
+    with tempfile.TemporaryDirectory() as directory:
+        ops = _iter_scratch_operations_(cfg, Path(directory))
+        template, plan = create_main_job(cfg, ops=ops, save_plan=False)
+    assert plan is not None
+    return plan, template
+
+
+def do_calibrate_resource_model(
+    cfg: SmokeDustRegridConfig, report_path: Path
+) -> ResourceModel:
+    # ``report_path`` is the run report of a finished run of the same operations.
+    limits = cfg.resources or ResourceLimits()
+    report = RunReport.model_validate_json(report_path.read_text())
+    with tempfile.TemporaryDirectory() as directory:
+        ops = _iter_scratch_operations_(cfg, Path(directory))
+        return calibrate_resource_model(ops, report, base=load_resource_model(limits))
+
+
+@hydra.main(version_base=None, config_path="conf", config_name="smoke-dust-config")
+def do_plan_resources_cli(cfg: DictConfig) -> None:
+    # Pass ``+calibrate_from=<run-report.json>`` to fit the resource model to a
+    # previous run first. The model is written to ``resources.model_path``.
+    logger = LOGGER.getChild("plan_resources")
+    sd_cfg = SmokeDustRegridConfig.model_validate(cfg)
+    calibrate_from = cfg.get("calibrate_from")
+    if calibrate_from is not None:
+        if sd_cfg.resources is None or sd_cfg.resources.model_path is None:
+            raise ValueError("calibration requires resources.model_path")
+        model = do_calibrate_resource_model(sd_cfg, Path(calibrate_from))
+        logger.info(f"calibrated resource model: {model}")
+        model.save(sd_cfg.resources.model_path)
+    plan, template = do_plan_resources(sd_cfg)
+    print(plan.format())
+    print(template)
+
+
+if __name__ == "__main__":
+    do_plan_resources_cli()
@@ -2,17 +2,48 @@ import hydra
 from omegaconf import DictConfig
 
 from regrid_wrapper.concrete.core import iter_operations
-from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.instrument import INSTRUMENT
+from regrid_wrapper.context.logging import LOGGER, open_shared_log_files
+from regrid_wrapper.esmpy.field_wrapper import GRID_REGISTRY
 from regrid_wrapper.model.config import SmokeDustRegridConfig
 from regrid_wrapper.strategy.core import RegridProcessor
+from regrid_wrapper.strategy.manifest import Manifest
+from regrid_wrapper.strategy.scheduler import OperationPlan
 
 
 def do_run_operations(cfg: SmokeDustRegridConfig) -> None:
     logger = LOGGER.getChild("run_operations")
     logger.info(cfg)
-    for op in iter_operations(cfg):
+    # Specs are checked on rank 0 only once MPI is initialized.
+    _ = COMM.value
+    open_shared_log_files()
+    names = None
+    if cfg.operation_group is not None:
+        plan = OperationPlan.load(cfg.operation_plan_path)
+        names = plan.groups[cfg.operation_group].names
+        logger.info(f"running operation group {cfg.operation_group}: {names}")
+    ops = list(iter_operations(cfg, names=names))
+    # Reserving every grid up front keeps shared grids alive between operations.
+    for op in ops:
+        GRID_REGISTRY.reserve(op.grid_definitions())
+    manifest = Manifest(
+        directory=cfg.manifest_directory, checksum=cfg.manifest_checksum
+    )
+    for op in ops:
+        if cfg.resume:
+            if manifest.is_complete(op):
+                logger.info(f"skipping complete operation: {op.spec.name}")
+                GRID_REGISTRY.release(op.grid_definitions())
+                continue
+            manifest.prepare(op)
         processor = RegridProcessor(op)
         processor.execute()
+        manifest.record(op)
+    report = INSTRUMENT.reduce()
+    if report is not None:
+        report.save(cfg.run_report_path)
+        logger.info(f"wrote run report: {cfg.run_report_path}")
     logger.info("success")
 
 
@@ -1,9 +1,24 @@
+from typing import Sequence, Tuple
+
 import hydra
 from omegaconf import DictConfig
 
+from regrid_wrapper.concrete.core import iter_operations
 from regrid_wrapper.context.logging import LOGGER
-from regrid_wrapper.model.config import SmokeDustRegridConfig, ComponentKey
-import xarray as xr
+from regrid_wrapper.context.staging import stage_files
+from regrid_wrapper.model.config import (
+    SmokeDustRegridConfig,
+    ComponentKey,
+    Launcher,
+    ResourceLimits,
+)
+from regrid_wrapper.strategy.operation import AbstractRegridOperation
+from regrid_wrapper.strategy.resources import (
+    ResourceModel,
+    ResourcePlan,
+    plan_resources,
+)
+from regrid_wrapper.strategy.scheduler import plan_operation_groups
 
 
 MAIN_JOB_TEMPLATE = """#!/usr/bin/env bash
@@ -31,9 +46,89 @@ export PYTHONPATH=${{DIR}}/src:${{PYTHONPATH}}
 export REGRID_WRAPPER_LOG_DIR={log_directory}
 
 cd ${{REGRID_WRAPPER_LOG_DIR}}
-mpirun -np {ntasks} python ${{DIR}}/src/regrid_wrapper/hydra/run_operations.py
+{run_commands}
 """
 
+# The same launcher starts ungrouped and grouped runs. ``mpirun`` is the
+# default. Only job steps started with ``srun --exact`` are given their own
+# cores so select it when groups run concurrently.
+LAUNCH_COMMANDS = {
+    Launcher.SRUN: "srun --exact --ntasks={ntasks}",
+    Launcher.MPIRUN: "mpirun -np {ntasks}",
+}
+
+RUN_COMMAND = "{launch} python ${{DIR}}/src/regrid_wrapper/hydra/run_operations.py"
+
+# Each group is its own MPI job: esmpy always initializes ESMF on
+# MPI_COMM_WORLD so independent operations cannot share one world.
+GROUP_RUN_COMMAND = """REGRID_WRAPPER_LOG_PREFIX=Regrid-Wrapper-group-{group_index} {launch} python ${{DIR}}/src/regrid_wrapper/hydra/run_operations.py operation_group={group_index} &
+pids+=($!)"""
+
+
+def create_run_commands(
+    cfg: SmokeDustRegridConfig,
+    ntasks: int,
+    ops: Sequence[AbstractRegridOperation] | None = None,
+    save_plan: bool = True,
+) -> str:
+    launch_command = LAUNCH_COMMANDS[cfg.launcher]
+    if not cfg.concurrent_operations:
+        return RUN_COMMAND.format(launch=launch_command.format(ntasks=ntasks))
+    if ops is None:
+        ops = list(iter_operations(cfg))
+    plan = plan_operation_groups(ops, ntasks)
+    if save_plan:
+        plan.save(cfg.operation_plan_path)
+    lines = ["pids=()"]
+    for group_index, group in enumerate(plan.groups):
+        lines.append(
+            GROUP_RUN_COMMAND.format(
+                group_index=group_index,
+                launch=launch_command.format(ntasks=group.ntasks),
+            )
+        )
+    lines.append('for pid in "${pids[@]}"; do wait "${pid}"; done')
+    return "\n".join(lines)
+
+
+def load_resource_model(limits: ResourceLimits) -> ResourceModel:
+    if limits.model_path is None:
+        return ResourceModel()
+    return ResourceModel.load(limits.model_path)
+
+
+def create_main_job(
+    cfg: SmokeDustRegridConfig,
+    ops: Sequence[AbstractRegridOperation] | None = None,
+    save_plan: bool = True,
+) -> Tuple[str, ResourcePlan | None]:
+    # Without resource limits the job is sized from the last target grid.
+    rrfs_grid = cfg.source_definition.rrfs_grids[cfg.target_grids[-1]]
+    nodes = rrfs_grid.nodes
+    tasks_per_node = rrfs_grid.tasks_per_node
+    wall_time = rrfs_grid.wall_time
+    resource_plan = None
+    if cfg.resources is not None:
+        if ops is None:
+            ops = list(iter_operations(cfg))
+        resource_plan = plan_resources(
+            ops, cfg.resources, load_resource_model(cfg.resources)
+        )
+        nodes = resource_plan.nodes
+        tasks_per_node = resource_plan.tasks_per_node
+        wall_time = resource_plan.wall_time
+    ntasks = nodes * tasks_per_node
+    template = MAIN_JOB_TEMPLATE.format(
+        job_name=cfg.root_output_directory.name,
+        nodes=nodes,
+        ntasks=ntasks,
+        log_directory=cfg.log_directory,
+        wall_time=wall_time,
+        tasks_per_node=tasks_per_node,
+        run_commands=create_run_commands(cfg, ntasks, ops=ops, save_plan=save_plan),
+    )
+    return template, resource_plan
+
 
 def do_task_prep(cfg: SmokeDustRegridConfig) -> None:
     logger = LOGGER.getChild("do_task_prep")
@@ -41,30 +136,23 @@ def do_task_prep(cfg: SmokeDustRegridConfig) -> None:
     logger.info("creating run directories")
     cfg.root_output_directory.mkdir(exist_ok=False, parents=True)
     cfg.log_directory.mkdir(exist_ok=False)
-    rrfs_grid = None
+    staging = []
     for grid_key in cfg.target_grids:
         cfg.output_directory(grid_key).mkdir(exist_ok=False, parents=True)
-        logger.info("copying rrfs grid")
         rrfs_grid = cfg.source_definition.rrfs_grids[grid_key]
-        with xr.open_dataset(rrfs_grid.grid) as src:
-            src.to_netcdf(cfg.model_grid_path(grid_key))
-        logger.info("copying rave grid")
-        with xr.open_dataset(
-            cfg.source_definition.components[ComponentKey.RAVE_GRID].grid
-        ) as src:
-            src.to_netcdf(cfg.rave_grid_path(grid_key))
+        staging.append((rrfs_grid.grid, cfg.model_grid_path(grid_key)))
+        staging.append(
+            (
+                cfg.source_definition.components[ComponentKey.RAVE_GRID].grid,
+                cfg.rave_grid_path(grid_key),
+            )
+        )
+    logger.info("staging rrfs and rave grids")
+    stage_files(staging)
     logger.info("creating main job script")
-    assert rrfs_grid is not None
+    template, _ = create_main_job(cfg)
+    logger.info(template)
     with open(cfg.main_job_path, "w") as f:
-        template = MAIN_JOB_TEMPLATE.format(
-            job_name=cfg.root_output_directory.name,
-            nodes=rrfs_grid.nodes,
-            ntasks=rrfs_grid.nodes * rrfs_grid.tasks_per_node,
-            log_directory=cfg.log_directory,
-            wall_time=rrfs_grid.wall_time,
-            tasks_per_node=rrfs_grid.tasks_per_node,
-        )
-        logger.info(template)
         f.write(template)
 
 
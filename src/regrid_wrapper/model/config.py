@@ -1,9 +1,11 @@
+from datetime import datetime
 from enum import StrEnum, unique
 from typing import Tuple, Dict
 
 from pydantic import BaseModel, Field
 
 from regrid_wrapper.context.common import PathType
+from regrid_wrapper.model.spec import OutputEncodingSpec, Precision, WeightCacheSpec
 
 
 @unique
@@ -22,6 +24,11 @@ class ComponentKey(AbstractEnum):
     DUST = "DUST"
 
 
+class Launcher(AbstractEnum):
+    SRUN = "srun"
+    MPIRUN = "mpirun"
+
+
 InputPathType = PathType
 
 
@@ -32,10 +39,32 @@ class RrfsGrid(BaseModel):
     wall_time: str = "04:00:00"
 
 
+class ResourceLimits(BaseModel):
+    # When set on the config the job is sized by the resource planner instead of
+    # the grid's ``nodes``, ``tasks_per_node`` and ``wall_time``.
+    tasks_per_node: int = Field(default=24, gt=0)
+    memory_per_node_bytes: int = Field(default=96 * 1024**3, gt=0)
+    max_nodes: int = Field(default=16, gt=0)
+    # Runtime the planner aims for when choosing the node count.
+    target_seconds: float = Field(default=3600.0, gt=0)
+    # Multiplier on the estimated runtime for the requested wall time.
+    safety_factor: float = Field(default=2.0, ge=1)
+    # Resource model calibrated from a previous run's report.
+    model_path: PathType | None = None
+
+
 class Component(BaseModel):
     grid: InputPathType
 
 
+class RaveEmissions(BaseModel):
+    src_glob: str
+    fields: Tuple[str, ...] = Field(min_length=1)
+    start: datetime | None = None
+    end: datetime | None = None
+    max_in_flight: int = 2
+
+
 class SourceDefinition(BaseModel):
     components: Dict[ComponentKey, Component] = Field(min_length=3)
     rrfs_grids: Dict[RrfsGridKey, RrfsGrid] = Field(min_length=3)
@@ -46,20 +75,65 @@ class SmokeDustRegridConfig(BaseModel):
     target_components: Tuple[ComponentKey, ...] = Field(min_length=1)
     root_output_directory: PathType
     source_definition: SourceDefinition
+    weight_cache: WeightCacheSpec | None = None
+    previous_root_output_directory: PathType | None = None
+    rave_emissions: RaveEmissions | None = None
+    concurrent_operations: bool = False
+    fuse_operations: bool = False
+    group_multi_target_operations: bool = False
+    launcher: Launcher = Launcher.MPIRUN
+    operation_group: int | None = None
+    resume: bool = False
+    manifest_checksum: bool = False
+    resources: ResourceLimits | None = None
+    output_encoding: OutputEncodingSpec | None = None
+    precision: Precision = Precision.FLOAT64
+    time_chunk_size: int | None = Field(default=None, ge=1)
 
     def output_directory(self, target_grid: RrfsGridKey) -> PathType:
         return self.root_output_directory / f"fix_smoke/{target_grid.value}"
 
+    def previous_weight_path(
+        self, target_grid: RrfsGridKey, filename: str
+    ) -> PathType | None:
+        if self.previous_root_output_directory is None:
+            return None
+        path = (
+            self.previous_root_output_directory
+            / f"fix_smoke/{target_grid.value}"
+            / filename
+        )
+        if not path.exists():
+            return None
+        return path
+
     @property
     def log_directory(self) -> PathType:
         return self.root_output_directory / "logs"
 
+    @property
+    def run_report_path(self) -> PathType:
+        if self.operation_group is None:
+            return self.log_directory / "run-report.json"
+        return self.log_directory / f"run-report-group-{self.operation_group}.json"
+
     @property
     def main_job_path(self) -> PathType:
         return self.root_output_directory / "main-job.sh"
 
+    @property
+    def operation_plan_path(self) -> PathType:
+        return self.root_output_directory / "operation-plan.json"
+
+    @property
+    def manifest_directory(self) -> PathType:
+        return self.root_output_directory / "manifest"
+
     def model_grid_path(self, target_grid: RrfsGridKey) -> PathType:
         return self.output_directory(target_grid) / "ds_out_base.nc"
 
     def rave_grid_path(self, target_grid: RrfsGridKey) -> PathType:
         return self.output_directory(target_grid) / "grid_in.nc"
+
+    def rave_emissions_output_directory(self, target_grid: RrfsGridKey) -> PathType:
+        return self.output_directory(target_grid) / "emissions"
@@ -1,86 +1,319 @@
 import abc
 import os
+from enum import StrEnum, unique
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Sequence, Tuple
 
-import esmpy
-from pydantic import BaseModel, model_validator, field_validator
+from pydantic import BaseModel, Field, SerializeAsAny, model_validator
 
-from regrid_wrapper.context.common import PathType
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.common import ZARR_SUFFIX, PathType, is_zarr_source
 from regrid_wrapper.context.logging import LOGGER
-import xarray as xr
+from regrid_wrapper.context.metadata import METADATA_CACHE
+
+
+def _default_unmapped_action_() -> int:
+    # esmpy is imported on first use so loading the specs does not pull it in.
+    import esmpy
+
+    return esmpy.UnmappedAction.ERROR
+
+
+def _check_on_root_(check: Callable[[], None]) -> None:
+    # Checks touching the filesystem run on rank 0 only. Their error is broadcast
+    # and raised on every rank. Without MPI initialized, e.g. during task
+    # preparation, the check runs in this process so MPI is not initialized.
+    if not COMM.is_initialized:
+        check()
+        return
+    error = None
+    if COMM.rank == 0:
+        try:
+            check()
+        except Exception as e:
+            error = e
+    error = COMM.bcast({"error": error}, root=0)["error"]
+    if error is not None:
+        raise error
+
+
+@unique
+class OutputFormat(StrEnum):
+    NETCDF = "netcdf"
+    # Each rank writes the chunks of its block without collective metadata
+    # operations.
+    ZARR = "zarr"
+
+
+@unique
+class Precision(StrEnum):
+    # Precision of regridded fields. Coordinates and weights are always double
+    # precision. Single precision halves field memory and output size and keeps
+    # about seven significant digits: values are rounded to a relative error of
+    # 6e-8 and interpolated values are within 1e-6 relative to the field
+    # maximum of a double precision regrid.
+    FLOAT64 = "float64"
+    FLOAT32 = "float32"
+
+
+class OutputEncodingSpec(BaseModel):
+    format: OutputFormat = OutputFormat.NETCDF
+    # The store is the output unless consolidated. Consolidating converts it to
+    # the netCDF output file on rank 0 alone once all fields are written, which
+    # reads and writes every variable again and is the slow path.
+    consolidate: bool = False
+    # Deflate is only available to parallel writes when they are collective.
+    zlib: bool = False
+    complevel: int = Field(default=4, ge=1, le=9)
+    shuffle: bool = True
+    # Gridded variables are chunked by the largest block of the grid held by a
+    # rank and one element along every other dimension.
+    chunked: bool = True
+
+    def create_variable_kwargs(
+        self, dimensions: Sequence[str], chunk_sizes: Dict[str, int]
+    ) -> Dict[str, Any]:
+        ret: Dict[str, Any] = {"zlib": self.zlib}
+        if self.zlib:
+            ret.update(complevel=self.complevel, shuffle=self.shuffle)
+        if self.chunked and any(ii in chunk_sizes for ii in dimensions):
+            ret["chunksizes"] = [chunk_sizes.get(ii, 1) for ii in dimensions]
+        return ret
+
+    @property
+    def is_consolidated(self) -> bool:
+        return self.format == OutputFormat.ZARR and self.consolidate
+
+
+def get_output_write_path(
+    output_filename: Path, encoding: OutputEncodingSpec | None
+) -> Path:
+    # Zarr stores are written next to the output file.
+    if encoding is not None and encoding.format == OutputFormat.ZARR:
+        return output_filename.with_suffix(ZARR_SUFFIX)
+    return output_filename
+
+
+def get_output_path(output_filename: Path, encoding: OutputEncodingSpec | None) -> Path:
+    if encoding is not None and encoding.is_consolidated:
+        return output_filename
+    return get_output_write_path(output_filename, encoding)
+
+
+class WeightCacheSpec(BaseModel):
+    directory: PathType
+    max_bytes: int = Field(default=200 * 1024**3, gt=0)
 
 
 class AbstractRegridSpec(BaseModel, abc.ABC):
     name: str
     nproc: int = 1
     esmpy_debug: bool = False
-    esmpy_unmapped_action: int = esmpy.UnmappedAction.ERROR
-
+    esmpy_unmapped_action: int = Field(default_factory=_default_unmapped_action_)
+    weight_cache: WeightCacheSpec | None = None
+    # Existing outputs are allowed since a resumed run replaces them.
+    resume: bool = False
 
-class GenerateWeightFileSpec(AbstractRegridSpec):
-    src_path: PathType
-    dst_path: PathType
-    output_weight_filename: PathType
+    @abc.abstractmethod
+    def input_paths(self) -> Tuple[Path, ...]: ...
 
-    def is_complete(self) -> bool:
-        return self.output_weight_filename.exists()
-
-    @model_validator(mode="after")
-    def _validate_model_(self) -> "GenerateWeightFileSpec":
-        errors = []
-        errors += self._validate_input_file_path_(self.src_path)
-        errors += self._validate_input_file_path_(self.dst_path)
-        errors += self._validate_output_file_(self.output_weight_filename)
-        if errors:
-            LOGGER.error(errors)
-            raise IOError(errors)
-        return self
+    @abc.abstractmethod
+    def output_paths(self) -> Tuple[Path, ...]: ...
 
     @staticmethod
     def _validate_input_file_path_(path: Path) -> List[str]:
         errors = []
         if not path.exists():
             errors.append(f"path does not exist: {path}")
-        if not path.is_file():
+        if not path.is_file() and not (is_zarr_source(path) and path.is_dir()):
             errors.append(f"path is not a file: {path}")
         if not os.access(path, os.R_OK):
             errors.append(f"path is not readable: {path}")
         return errors
 
     @staticmethod
-    def _validate_output_file_(path: Path) -> List[str]:
+    def _validate_output_file_(path: Path, allow_exists: bool = False) -> List[str]:
         errors = []
         parent = path.parent
         if not parent.exists():
             errors.append(f"parent directory does not exist: {path.parent}")
         if not os.access(parent, os.W_OK):
             errors.append(f"parent directory is not writable: {path.parent}")
-        if path.exists():
+        if path.exists() and not allow_exists:
             errors.append(f"file already exists: {path}")
         return errors
 
+    @staticmethod
+    def _validate_fields_exist_(path: Path, fields: Tuple[str, ...]) -> None:
+        variables = METADATA_CACHE.get(path).variables
+        missing = [field for field in fields if field not in variables]
+        if missing:
+            raise ValueError(f"missing fields: {missing}")
+
+
+class GenerateWeightFileSpec(AbstractRegridSpec):
+    src_path: PathType
+    dst_path: PathType
+    output_weight_filename: PathType
+
+    def input_paths(self) -> Tuple[Path, ...]:
+        return self.src_path, self.dst_path
+
+    def output_paths(self) -> Tuple[Path, ...]:
+        return (self.output_weight_filename,)
+
+    def is_complete(self) -> bool:
+        return self.output_weight_filename.exists()
+
+    @model_validator(mode="after")
+    def _validate_model_(self) -> "GenerateWeightFileSpec":
+        _check_on_root_(self._check_model_)
+        return self
+
+    def _check_model_(self) -> None:
+        errors = []
+        errors += self._validate_input_file_path_(self.src_path)
+        errors += self._validate_input_file_path_(self.dst_path)
+        errors += self._validate_output_file_(
+            self.output_weight_filename, allow_exists=self.resume
+        )
+        if errors:
+            LOGGER.error(errors)
+            raise IOError(errors)
+
 
 class GenerateWeightFileAndRegridFields(GenerateWeightFileSpec):
     output_filename: PathType
     fields: Tuple[str, ...]
+    output_encoding: OutputEncodingSpec | None = None
+    precision: Precision = Precision.FLOAT64
+    # Number of time steps read, regridded and written at once. Caps field
+    # memory for long time dimensions. Defaults to all of them.
+    time_chunk_size: int | None = Field(default=None, ge=1)
+    # Weights generated by an earlier operation with the same grids and method.
+    # They are linked to the output weight file instead of being regenerated.
+    shared_weight_filename: PathType | None = None
+
+    def input_paths(self) -> Tuple[Path, ...]:
+        if self.shared_weight_filename is None:
+            return super().input_paths()
+        return super().input_paths() + (self.shared_weight_filename,)
+
+    def output_paths(self) -> Tuple[Path, ...]:
+        return self.output_weight_filename, get_output_path(
+            self.output_filename, self.output_encoding
+        )
 
     @model_validator(mode="after")
     def _validate_fields_(self) -> "GenerateWeightFileAndRegridFields":
-        missing = []
-        with xr.open_dataset(self.src_path) as ds:
-            for field in self.fields:
-                if field not in ds:
-                    missing.append(field)
-        if missing:
-            raise ValueError(f"missing fields: {missing}")
+        _check_on_root_(self._check_fields_)
+        return self
+
+    def _check_fields_(self) -> None:
+        errors = self._validate_output_file_(
+            self.output_filename, allow_exists=self.resume
+        )
+        if errors:
+            LOGGER.error(errors)
+            raise IOError(errors)
+        self._validate_fields_exist_(self.src_path, self.fields)
+
+
+class RegridFieldsFromWeightFile(AbstractRegridSpec):
+    src_path: PathType
+    dst_path: PathType
+    weight_filename: PathType
+    output_filename: PathType
+    fields: Tuple[str, ...]
+    output_encoding: OutputEncodingSpec | None = None
+    precision: Precision = Precision.FLOAT64
+    # Number of time steps read, regridded and written at once. Caps field
+    # memory for long time dimensions. Defaults to all of them.
+    time_chunk_size: int | None = Field(default=None, ge=1)
+
+    def input_paths(self) -> Tuple[Path, ...]:
+        return self.src_path, self.dst_path, self.weight_filename
+
+    def output_paths(self) -> Tuple[Path, ...]:
+        return (get_output_path(self.output_filename, self.output_encoding),)
+
+    def is_complete(self) -> bool:
+        return all(ii.exists() for ii in self.output_paths())
+
+    @model_validator(mode="after")
+    def _validate_model_(self) -> "RegridFieldsFromWeightFile":
+        _check_on_root_(self._check_model_)
         return self
 
-    @field_validator("output_filename")
-    @classmethod
-    def _validate_output_filename_(cls, path: PathType) -> PathType:
-        errors = cls._validate_output_file_(path)
+    def _check_model_(self) -> None:
+        errors = []
+        errors += self._validate_input_file_path_(self.src_path)
+        errors += self._validate_input_file_path_(self.dst_path)
+        errors += self._validate_input_file_path_(self.weight_filename)
+        errors += self._validate_output_file_(
+            self.output_filename, allow_exists=self.resume
+        )
         if errors:
             LOGGER.error(errors)
             raise IOError(errors)
-        return path
+        self._validate_fields_exist_(self.src_path, self.fields)
+
+
+RegridFieldsSpec = GenerateWeightFileAndRegridFields | RegridFieldsFromWeightFile
+
+
+class RegridRaveEmissionsSpec(AbstractRegridSpec):
+    src_paths: Tuple[PathType, ...] = Field(min_length=1)
+    dst_path: PathType
+    weight_filename: PathType
+    output_directory: PathType
+    fields: Tuple[str, ...] = Field(min_length=1)
+    max_in_flight: int = Field(default=2, gt=0)
+    nthreads: int | None = None
+    output_encoding: OutputEncodingSpec | None = None
+
+    def output_path(self, src_path: Path) -> Path:
+        return self.output_directory / src_path.name
+
+    def input_paths(self) -> Tuple[Path, ...]:
+        return self.src_paths + (self.dst_path, self.weight_filename)
+
+    def output_paths(self) -> Tuple[Path, ...]:
+        return tuple(self.output_path(ii) for ii in self.src_paths)
+
+    def is_complete(self) -> bool:
+        return all(self.output_path(ii).exists() for ii in self.src_paths)
+
+    @model_validator(mode="after")
+    def _validate_model_(self) -> "RegridRaveEmissionsSpec":
+        _check_on_root_(self._check_model_)
+        return self
+
+    def _check_model_(self) -> None:
+        # The weight file may be produced by an earlier operation in the same run
+        # so it is checked when the operation runs.
+        errors = []
+        for src_path in self.src_paths:
+            errors += self._validate_input_file_path_(src_path)
+            if self.output_directory.exists():
+                errors += self._validate_output_file_(
+                    self.output_path(src_path), allow_exists=self.resume
+                )
+        if not self.output_directory.exists():
+            errors += self._validate_output_file_(self.output_directory)
+        errors += self._validate_input_file_path_(self.dst_path)
+        if errors:
+            LOGGER.error(errors)
+            raise IOError(errors)
+
+
+class MultiTargetRegridSpec(AbstractRegridSpec):
+    members: Tuple[SerializeAsAny[AbstractRegridSpec], ...] = Field(min_length=1)
+
+    def input_paths(self) -> Tuple[Path, ...]:
+        return tuple(
+            dict.fromkeys(path for ii in self.members for path in ii.input_paths())
+        )
+
+    def output_paths(self) -> Tuple[Path, ...]:
+        return tuple(path for ii in self.members for path in ii.output_paths())
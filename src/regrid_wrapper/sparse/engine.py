@@ -0,0 +1,181 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Tuple, Sequence, List
+
+import netCDF4 as nc
+import numpy as np
+import scipy.sparse as sp
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
+
+from regrid_wrapper.context.logging import LOGGER
+
+_LOGGER = LOGGER.getChild(__name__)
+
+
+class SparseWeights(BaseModel):
+    # Shapes are in file order (e.g. ``(lat, lon)``). Flattening them in C order
+    # gives the one-based ESMF sequence indices used by ``row`` and ``col``.
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    matrix: sp.csr_matrix
+    src_shape: Tuple[int, ...]
+    dst_shape: Tuple[int, ...]
+    # Threads per process. Every MPI rank runs its own threads so the default
+    # leaves one core to each rank sharing a node.
+    nthreads: int = Field(default=1, gt=0)
+    _blocks: List[Tuple[slice, sp.csr_matrix]] | None = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def _validate_model_(self) -> "SparseWeights":
+        expected = (int(np.prod(self.dst_shape)), int(np.prod(self.src_shape)))
+        if self.matrix.shape != expected:
+            raise ValueError(
+                f"matrix shape {self.matrix.shape} does not match grid shapes {expected}"
+            )
+        return self
+
+    @classmethod
+    def from_file(
+        cls,
+        path: Path,
+        src_shape: Sequence[int],
+        dst_shape: Sequence[int],
+        nthreads: int | None = None,
+    ) -> "SparseWeights":
+        _LOGGER.info(f"loading sparse weights: {path}")
+        with nc.Dataset(path, "r") as ds:
+            row = ds.variables["row"][:].filled() - 1
+            col = ds.variables["col"][:].filled() - 1
+            factors = ds.variables["S"][:].filled()
+        shape = (int(np.prod(dst_shape)), int(np.prod(src_shape)))
+        matrix = sp.csr_matrix((factors, (row, col)), shape=shape)
+        matrix.sum_duplicates()
+        kwargs = {} if nthreads is None else {"nthreads": nthreads}
+        return cls(
+            matrix=matrix,
+            src_shape=tuple(src_shape),
+            dst_shape=tuple(dst_shape),
+            **kwargs,
+        )
+
+    @property
+    def dst_mapped(self) -> np.ndarray:
+        return (np.diff(self.matrix.indptr) > 0).reshape(self.dst_shape)
+
+    def apply(self, stack: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        # ``stack`` has shape ``(..., *src_shape)``. Destination elements without
+        # weights keep their value in ``out`` when it is provided, matching
+        # ``esmpy.Region.SELECT``; otherwise they are zero. Masked source
+        # elements (e.g. fill values) are left out and their destinations are
+        # renormalized by the weights of the remaining sources. Destinations
+        # without a remaining source are masked.
+        ndim = len(self.src_shape)
+        if tuple(stack.shape[-ndim:]) != self.src_shape:
+            raise ValueError(
+                f"stack shape {stack.shape} does not end with {self.src_shape}"
+            )
+        leading = stack.shape[:-ndim]
+        # Rows of ``src`` are the stacked fields.
+        src = np.ma.getdata(stack).reshape(-1, self.matrix.shape[1])
+        mask = np.ma.getmask(stack)
+        if mask is np.ma.nomask or not mask.any():
+            src_mask = None
+        else:
+            src_mask = mask.reshape(src.shape)
+        # One product covers every field so each row block of the matrix is
+        # streamed once. The kernel takes the fields as contiguous columns which
+        # costs one transposed copy of the stack. Masked elements are zeroed in
+        # that copy.
+        src_t = np.ascontiguousarray(src.T)
+        if src_mask is not None:
+            src_t[src_mask.T] = 0
+        dst_t = np.empty(
+            (self.matrix.shape[0], src.shape[0]),
+            dtype=np.result_type(self.matrix.dtype, src.dtype),
+        )
+        with ThreadPoolExecutor(max_workers=self.nthreads) as pool:
+            list(
+                pool.map(
+                    lambda x: self._apply_block_(*x, src_t, dst_t),
+                    self._get_blocks_(),
+                )
+            )
+        dst = np.ascontiguousarray(dst_t.T)
+        ret = dst.reshape(leading + self.dst_shape)
+        if src_mask is not None:
+            dst_mask = self._renormalize_(src_mask, dst)
+            ret = np.ma.masked_array(ret, mask=dst_mask.reshape(ret.shape))
+        if out is None:
+            return ret
+        mapped = self.dst_mapped
+        out[..., mapped] = ret[..., mapped]
+        return out
+
+    def _renormalize_(self, src_mask: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        # Only fields with masked sources take part in the extra product.
+        dst_mask = np.zeros(dst.shape, dtype=bool)
+        fields = np.flatnonzero(src_mask.any(axis=1))
+        valid = np.ascontiguousarray((~src_mask[fields]).T, dtype=dst.dtype)
+        valid_sums = np.ascontiguousarray((self.matrix @ valid).T)
+        has_valid = valid_sums != 0
+        row_sums = np.broadcast_to(
+            np.asarray(self.matrix.sum(axis=1)).ravel(), valid_sums.shape
+        )
+        scale = np.ones_like(valid_sums)
+        scale[has_valid] = row_sums[has_valid] / valid_sums[has_valid]
+        dst[fields] *= scale
+        dst_mask[fields] = self.dst_mapped.ravel() & ~has_valid
+        return dst_mask
+
+    def _get_blocks_(self) -> List[Tuple[slice, sp.csr_matrix]]:
+        if self._blocks is None:
+            nrows = self.matrix.shape[0]
+            bounds = np.linspace(0, nrows, min(self.nthreads, nrows) + 1, dtype=int)
+            self._blocks = [
+                (slice(lower, upper), self.matrix[lower:upper])
+                for lower, upper in zip(bounds[:-1], bounds[1:])
+            ]
+        return self._blocks
+
+    @staticmethod
+    def _apply_block_(
+        rows: slice, block: sp.csr_matrix, src_t: np.ndarray, dst_t: np.ndarray
+    ) -> None:
+        # scipy releases the GIL inside the sparse kernels so row blocks run on
+        # separate cores. ``src_t`` is contiguous so nothing is copied for the
+        # product.
+        dst_t[rows] = block @ src_t
+
+
+def load_field_stack(
+    path: Path, names: Sequence[str], grid_ndim: int = 2
+) -> np.ndarray:
+    # Leading (e.g. time) dimensions of every variable are folded into the first
+    # axis of the returned stack. Fill values are masked.
+    with nc.Dataset(path, "r") as ds:
+        arrs = [np.ma.asarray(ds.variables[name][:]) for name in names]
+    return np.ma.concatenate(
+        [arr.reshape((-1,) + arr.shape[-grid_ndim:]) for arr in arrs]
+    )
+
+
+def write_field_stack(
+    path: Path, names: Sequence[str], stack: np.ndarray, grid_ndim: int = 2
+) -> None:
+    with nc.Dataset(path, "a") as ds:
+        start = 0
+        for name in names:
+            var = ds.variables[name]
+            count = int(np.prod(var.shape[: var.ndim - grid_ndim]))
+            var[:] = stack[start : start + count].reshape(var.shape)
+            start += count
+
+
+def regrid_nc_fields(
+    weights: SparseWeights, src_path: Path, dst_path: Path, names: Sequence[str]
+) -> None:
+    _LOGGER.info(f"regridding fields with sparse weights: {names}")
+    grid_ndim = len(weights.src_shape)
+    src_stack = load_field_stack(src_path, names, grid_ndim=grid_ndim)
+    dst_stack = load_field_stack(dst_path, names, grid_ndim=grid_ndim)
+    weights.apply(src_stack, out=dst_stack)
+    write_field_stack(dst_path, names, dst_stack, grid_ndim=grid_ndim)
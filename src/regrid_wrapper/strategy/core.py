@@ -1,4 +1,6 @@
+from regrid_wrapper.context.instrument import INSTRUMENT
 from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.esmpy.field_wrapper import DATASET_POOL, GRID_REGISTRY
 from regrid_wrapper.strategy.operation import AbstractRegridOperation
 
 
@@ -10,7 +12,14 @@ class RegridProcessor:
 
     def execute(self) -> None:
         self._logger.info("start: execute")
-        self._operation.initialize()
-        self._operation.run()
-        self._operation.finalize()
+        # Datasets stay open for the whole operation and are closed, flushing
+        # any writes, before the operation is recorded as complete.
+        with INSTRUMENT.span(self._operation.spec.name), DATASET_POOL.session():
+            with INSTRUMENT.span("initialize"):
+                self._operation.initialize()
+            with INSTRUMENT.span("run"):
+                self._operation.run()
+            with INSTRUMENT.span("finalize"):
+                self._operation.finalize()
+        GRID_REGISTRY.release(self._operation.grid_definitions())
         self._logger.info("end: execute")
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Tuple, Sequence
+
+from pydantic import BaseModel
+
+from regrid_wrapper.context.common import PathType
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.strategy.operation import AbstractRegridOperation
+
+_LOGGER = LOGGER.getChild(__name__)
+
+
+def sha256_file(path: Path, chunk_size: int = 16 * 1024**2) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def sha256_directory(path: Path) -> str:
+    # Zarr stores are directories. Relative file paths are hashed with contents.
+    sha = hashlib.sha256()
+    for child in sorted(ii for ii in path.rglob("*") if ii.is_file()):
+        sha.update(str(child.relative_to(path)).encode())
+        sha.update(sha256_file(child).encode())
+    return sha.hexdigest()
+
+
+def _sha256_path_(path: Path) -> str:
+    return sha256_directory(path) if path.is_dir() else sha256_file(path)
+
+
+def _stat_path_(path: Path) -> Tuple[int, int]:
+    # Size and modification time. A directory's own entry does not change when
+    # the files in it do so it takes the total size and latest modification.
+    stat = path.stat()
+    if not path.is_dir():
+        return stat.st_size, stat.st_mtime_ns
+    size, mtime_ns = 0, stat.st_mtime_ns
+    for child in path.rglob("*"):
+        child_stat = child.stat()
+        mtime_ns = max(mtime_ns, child_stat.st_mtime_ns)
+        if child.is_file():
+            size += child_stat.st_size
+    return size, mtime_ns
+
+
+class FileRecord(BaseModel):
+    path: PathType
+    size: int
+    mtime_ns: int
+    sha256: str | None = None
+
+    @classmethod
+    def from_path(cls, path: Path, checksum: bool = False) -> "FileRecord":
+        size, mtime_ns = _stat_path_(path)
+        return cls(
+            path=path,
+            size=size,
+            mtime_ns=mtime_ns,
+            sha256=_sha256_path_(path) if checksum else None,
+        )
+
+
+class ManifestEntry(BaseModel):
+    # Files are fingerprinted by size and modification time. Outputs may also
+    # carry a checksum so files modified in place are detected.
+    name: str
+    inputs: Tuple[FileRecord, ...]
+    outputs: Tuple[FileRecord, ...]
+
+    @classmethod
+    def from_operation(
+        cls, op: AbstractRegridOperation, checksum: bool = False
+    ) -> "ManifestEntry":
+        return cls(
+            name=op.spec.name,
+            inputs=tuple(FileRecord.from_path(ii) for ii in op.spec.input_paths()),
+            outputs=tuple(
+                FileRecord.from_path(ii, checksum=checksum)
+                for ii in op.spec.output_paths()
+            ),
+        )
+
+    def is_valid(self, op: AbstractRegridOperation) -> bool:
+        if [ii.path for ii in self.inputs] != list(op.spec.input_paths()):
+            return False
+        if [ii.path for ii in self.outputs] != list(op.spec.output_paths()):
+            return False
+        for record in self.inputs:
+            if not record.path.exists():
+                return False
+            if record != FileRecord.from_path(record.path):
+                return False
+        for record in self.outputs:
+            if not record.path.exists():
+                return False
+            size, mtime_ns = _stat_path_(record.path)
+            if size != record.size:
+                return False
+            if record.sha256 is None:
+                if mtime_ns != record.mtime_ns:
+                    return False
+            elif record.sha256 != _sha256_path_(record.path):
+                return False
+        return True
+
+
+class Manifest(BaseModel):
+    # One file per operation so concurrent operation groups never write the same
+    # file. Checksumming multi-gigabyte outputs is slow so it is opt-in.
+    directory: PathType
+    checksum: bool = False
+
+    def entry_path(self, name: str) -> Path:
+        return self.directory / f"{name}.json"
+
+    def load(self, name: str) -> ManifestEntry | None:
+        path = self.entry_path(name)
+        if not path.exists():
+            return None
+        return ManifestEntry.model_validate(json.loads(path.read_text()))
+
+    def save(self, entry: ManifestEntry) -> None:
+        self.directory.mkdir(exist_ok=True, parents=True)
+        path = self.entry_path(entry.name)
+        tmp = path.with_suffix(f".tmp-{os.getpid()}")
+        tmp.write_text(entry.model_dump_json(indent=2))
+        os.replace(tmp, path)
+
+    def remove(self, name: str) -> None:
+        self.entry_path(name).unlink(missing_ok=True)
+
+    def is_complete(self, op: AbstractRegridOperation) -> bool:
+        # Files are checked on rank 0 only.
+        is_complete = False
+        if COMM.rank == 0:
+            entry = self.load(op.spec.name)
+            is_complete = entry is not None and entry.is_valid(op)
+        return COMM.bcast({"is_complete": is_complete}, root=0)["is_complete"]
+
+    def prepare(self, op: AbstractRegridOperation) -> None:
+        # Outputs left by an interrupted or stale run are removed so the operation
+        # starts from scratch.
+        if COMM.rank == 0:
+            self.remove(op.spec.name)
+            remove_outputs(op.spec.output_paths())
+        COMM.barrier()
+
+    def record(self, op: AbstractRegridOperation) -> None:
+        if COMM.rank == 0:
+            self.save(ManifestEntry.from_operation(op, checksum=self.checksum))
+        COMM.barrier()
+
+
+def remove_outputs(paths: Sequence[Path]) -> None:
+    for path in paths:
+        if path.exists():
+            _LOGGER.info(f"removing incomplete output: {path}")
+            if path.is_dir():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
@@ -0,0 +1,51 @@
+from typing import Dict, Sequence, Tuple
+
+from regrid_wrapper.context.instrument import INSTRUMENT
+from regrid_wrapper.esmpy.field_wrapper import FieldWrapper, NcToGrid
+from regrid_wrapper.model.spec import MultiTargetRegridSpec
+from regrid_wrapper.strategy.operation import AbstractRegridOperation
+
+
+class MultiTargetRegridOperation(AbstractRegridOperation):
+    # Runs operations reading the same source file one target at a time. The
+    # source grid stays in the grid registry and the source fields are loaded by
+    # the first member only.
+
+    def __init__(self, members: Sequence[AbstractRegridOperation]) -> None:
+        spec = MultiTargetRegridSpec(
+            name="+".join(ii.spec.name for ii in members),
+            members=tuple(ii.spec for ii in members),
+            esmpy_debug=any(ii.spec.esmpy_debug for ii in members),
+        )
+        super().__init__(spec)
+        self._members = tuple(members)
+        self._source_fields: Dict[str, FieldWrapper] = {}
+        for member in self._members:
+            member.share_source_fields(self._source_fields)
+
+    @property
+    def members(self) -> Tuple[AbstractRegridOperation, ...]:
+        return self._members
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(name for ii in self._members for name in ii.names)
+
+    def grid_definitions(self) -> Tuple[NcToGrid, ...]:
+        return tuple(
+            grid_def for ii in self._members for grid_def in ii.grid_definitions()
+        )
+
+    def run(self) -> None:
+        for member in self._members:
+            self._logger.info(f"running target: {member.spec.name}")
+            with INSTRUMENT.span(member.spec.name):
+                member.initialize()
+                member.run()
+                member.finalize()
+
+    def finalize(self) -> None:
+        for fwrap in self._source_fields.values():
+            fwrap.value.destroy()
+        self._source_fields.clear()
+        super().finalize()
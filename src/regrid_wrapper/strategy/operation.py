@@ -1,9 +1,25 @@
 import abc
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Tuple
 
-import esmpy
 
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.instrument import INSTRUMENT
 from regrid_wrapper.context.logging import LOGGER
-from regrid_wrapper.model.spec import AbstractRegridSpec
+from regrid_wrapper.esmpy.field_wrapper import FieldWrapper, NcToGrid
+from regrid_wrapper.esmpy.weight_store import (
+    RegridOptions,
+    WeightStore,
+    link_or_copy,
+)
+from regrid_wrapper.model.spec import (
+    AbstractRegridSpec,
+    GenerateWeightFileAndRegridFields,
+    RegridFieldsFromWeightFile,
+)
+
+if TYPE_CHECKING:
+    import esmpy
 
 
 class AbstractRegridOperation(abc.ABC):
@@ -11,14 +27,123 @@ class AbstractRegridOperation(abc.ABC):
     def __init__(self, spec: AbstractRegridSpec) -> None:
         self._spec = spec
         self._logger = LOGGER.getChild("operation").getChild(spec.name)
-        self._esmf_manager: None | esmpy.Manager = None
+        self._esmf_manager: "None | esmpy.Manager" = None
+        self._source_fields: Dict[str, FieldWrapper] | None = None
+
+    @property
+    def spec(self) -> AbstractRegridSpec:
+        return self._spec
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return (self._spec.name,)
+
+    def share_source_fields(self, source_fields: Dict[str, FieldWrapper]) -> None:
+        # Operations sharing a source grid keep their loaded source fields here.
+        self._source_fields = source_fields
 
     def initialize(self) -> None:
+        import esmpy
+
         self._logger.info(f"initializing regrid operation: {self._spec.name}")
         self._esmf_manager = esmpy.Manager(debug=self._spec.esmpy_debug)
 
+    def grid_definitions(self) -> Tuple[NcToGrid, ...]:
+        # Grids the operation requests from the grid registry.
+        return tuple()
+
     @abc.abstractmethod
     def run(self) -> None: ...
 
     def finalize(self) -> None:
         self._logger.info(f"finalizing regrid operation: {self._spec.name}")
+
+    def _get_source_field_wrapper_(
+        self, field_name: str, create: Callable[[], FieldWrapper]
+    ) -> FieldWrapper:
+        if self._source_fields is None:
+            return create()
+        if field_name not in self._source_fields:
+            self._source_fields[field_name] = create()
+        else:
+            self._logger.info("reusing source field: %s", field_name)
+        return self._source_fields[field_name]
+
+    def _create_regridder_(
+        self,
+        src_fwrap: FieldWrapper,
+        dst_fwrap: FieldWrapper,
+        options: RegridOptions,
+        weight_filename: Path,
+    ) -> "esmpy.Regrid":
+        if self._spec.weight_cache is None:
+            self._logger.info("starting weight file generation")
+            return options.create_regrid(
+                src_fwrap.value, dst_fwrap.value, weight_filename
+            )
+
+        assert src_fwrap.gwrap.source is not None
+        assert dst_fwrap.gwrap.source is not None
+        store = WeightStore(spec=self._spec.weight_cache)
+        key = store.create_key(src_fwrap.gwrap.source, dst_fwrap.gwrap.source, options)
+        if store.fetch(key, weight_filename):
+            self._logger.info(f"weight cache hit: {key}")
+            return self._create_regridder_from_file_(
+                src_fwrap, dst_fwrap, weight_filename
+            )
+
+        self._logger.info(f"weight cache miss: {key}")
+        self._logger.info("starting weight file generation")
+        regridder = options.create_regrid(
+            src_fwrap.value, dst_fwrap.value, weight_filename
+        )
+        store.put(key, weight_filename)
+        return regridder
+
+    @INSTRUMENT.span("read_weights")
+    def _create_regridder_from_file_(
+        self, src_fwrap: FieldWrapper, dst_fwrap: FieldWrapper, weight_filename: Path
+    ) -> "esmpy.Regrid":
+        import esmpy
+
+        self._logger.info(f"creating regridder from weight file: {weight_filename}")
+        return esmpy.RegridFromFile(
+            src_fwrap.value, dst_fwrap.value, filename=str(weight_filename)
+        )
+
+    def _create_fields_regridder_(
+        self, src_fwrap: FieldWrapper, dst_fwrap: FieldWrapper, options: RegridOptions
+    ) -> "esmpy.Regrid":
+        match self._spec:
+            case RegridFieldsFromWeightFile():
+                return self._create_regridder_from_file_(
+                    src_fwrap, dst_fwrap, self._spec.weight_filename
+                )
+            case GenerateWeightFileAndRegridFields(
+                shared_weight_filename=Path() as shared_weight_filename
+            ):
+                self._logger.info(f"linking shared weights: {shared_weight_filename}")
+                if COMM.rank == 0:
+                    link_or_copy(
+                        shared_weight_filename, self._spec.output_weight_filename
+                    )
+                COMM.barrier()
+                return self._create_regridder_from_file_(
+                    src_fwrap, dst_fwrap, self._spec.output_weight_filename
+                )
+            case GenerateWeightFileAndRegridFields():
+                return self._create_regridder_(
+                    src_fwrap, dst_fwrap, options, self._spec.output_weight_filename
+                )
+            case _:
+                raise NotImplementedError(type(self._spec))
+
+    def _fields_weight_filename_(self) -> Path:
+        # Weight file holding the weights of the fields regridder once created.
+        match self._spec:
+            case RegridFieldsFromWeightFile():
+                return self._spec.weight_filename
+            case GenerateWeightFileAndRegridFields():
+                return self._spec.output_weight_filename
+            case _:
+                raise NotImplementedError(type(self._spec))
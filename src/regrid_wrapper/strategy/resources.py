@@ -0,0 +1,152 @@
+import json
+import math
+import statistics
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+from pydantic import BaseModel, Field
+
+from regrid_wrapper.context.instrument import RunReport
+from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.model.config import ResourceLimits
+from regrid_wrapper.strategy.operation import AbstractRegridOperation
+from regrid_wrapper.strategy.scheduler import estimate_operation_cost
+
+_LOGGER = LOGGER.getChild(__name__)
+
+# Shortest wall time requested from the scheduler.
+MIN_WALL_SECONDS = 10 * 60
+
+
+class ResourceModel(BaseModel):
+    # Operations are sized by the element count of their largest input variables
+    # which is read from the file headers. Work and memory beyond the fixed
+    # overheads are divided evenly between ranks.
+    rank_overhead_bytes: int = Field(default=1024**3, ge=0)
+    bytes_per_element: float = Field(default=64.0, ge=0)
+    operation_overhead_seconds: float = Field(default=10.0, ge=0)
+    seconds_per_element: float = Field(default=2e-6, ge=0)
+
+    def save(self, path: Path) -> None:
+        path.write_text(self.model_dump_json(indent=2))
+
+    @classmethod
+    def load(cls, path: Path) -> "ResourceModel":
+        return cls.model_validate(json.loads(path.read_text()))
+
+
+class OperationEstimate(BaseModel):
+    name: str
+    elements: int
+    # Totals over all ranks excluding the per-rank and per-operation overheads.
+    memory_bytes: int
+    seconds: float
+
+
+class ResourcePlan(BaseModel):
+    nodes: int
+    tasks_per_node: int
+    wall_time: str
+    estimated_seconds: float
+    memory_per_rank_bytes: int
+    operations: Tuple[OperationEstimate, ...]
+
+    @property
+    def ntasks(self) -> int:
+        return self.nodes * self.tasks_per_node
+
+    def format(self) -> str:
+        lines = [f"{'operation':<48}{'elements':>14}{'memory (GiB)':>14}{'cpu-s':>12}"]
+        for ii in self.operations:
+            lines.append(
+                f"{ii.name:<48}{ii.elements:>14}"
+                f"{ii.memory_bytes / 1024**3:>14.2f}{ii.seconds:>12.1f}"
+            )
+        lines.append(
+            f"nodes={self.nodes} tasks_per_node={self.tasks_per_node} "
+            f"wall_time={self.wall_time} estimated_seconds={self.estimated_seconds:.1f} "
+            f"memory_per_rank_gib={self.memory_per_rank_bytes / 1024**3:.2f}"
+        )
+        return "\n".join(lines)
+
+
+def format_wall_time(seconds: float) -> str:
+    # Rounded up to whole minutes.
+    minutes = math.ceil(max(seconds, MIN_WALL_SECONDS) / 60)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}:00"
+
+
+def estimate_operation(
+    op: AbstractRegridOperation, model: ResourceModel
+) -> OperationEstimate:
+    elements = estimate_operation_cost(op)
+    return OperationEstimate(
+        name=op.spec.name,
+        elements=elements,
+        memory_bytes=int(model.bytes_per_element * elements),
+        seconds=model.seconds_per_element * elements,
+    )
+
+
+def plan_resources(
+    ops: Sequence[AbstractRegridOperation],
+    limits: ResourceLimits,
+    model: ResourceModel,
+) -> ResourcePlan:
+    # The smallest node count where the largest operation fits in memory and the
+    # operations, run one after another, finish within the target time.
+    estimates = [estimate_operation(op, model) for op in ops]
+    max_memory = max([ii.memory_bytes for ii in estimates], default=0)
+    rank_memory_limit = limits.memory_per_node_bytes // limits.tasks_per_node
+    for nodes in range(1, limits.max_nodes + 1):
+        ntasks = nodes * limits.tasks_per_node
+        memory_per_rank = model.rank_overhead_bytes + math.ceil(max_memory / ntasks)
+        seconds = sum(
+            model.operation_overhead_seconds + ii.seconds / ntasks for ii in estimates
+        )
+        if memory_per_rank <= rank_memory_limit and seconds <= limits.target_seconds:
+            break
+    else:
+        _LOGGER.warning(
+            f"no node count up to {limits.max_nodes} meets the memory and time limits"
+        )
+    plan = ResourcePlan(
+        nodes=nodes,
+        tasks_per_node=limits.tasks_per_node,
+        wall_time=format_wall_time(seconds * limits.safety_factor),
+        estimated_seconds=seconds,
+        memory_per_rank_bytes=memory_per_rank,
+        operations=tuple(estimates),
+    )
+    _LOGGER.info(f"resource plan: {plan}")
+    return plan
+
+
+def calibrate_resource_model(
+    ops: Sequence[AbstractRegridOperation],
+    report: RunReport,
+    base: ResourceModel = ResourceModel(),
+) -> ResourceModel:
+    # Fits the per-element coefficients to the operation spans of a run report.
+    # Memory uses each operation's rank high-water mark, which includes earlier
+    # operations and so errs on the large side.
+    seconds: List[float] = []
+    memory: List[float] = []
+    for op in ops:
+        stats = report.spans.get(op.spec.name)
+        if stats is None:
+            continue
+        elements = estimate_operation_cost(op)
+        work = max(stats.max - base.operation_overhead_seconds, 0.0)
+        seconds.append(work * report.nproc / elements)
+        extra = max(stats.hwm_max - base.rank_overhead_bytes, 0)
+        memory.append(extra * report.nproc / elements)
+    if len(seconds) == 0:
+        _LOGGER.warning("run report has no spans for the operations")
+        return base
+    return base.model_copy(
+        update={
+            "seconds_per_element": statistics.median(seconds),
+            "bytes_per_element": statistics.median(memory),
+        }
+    )
@@ -0,0 +1,112 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.context.metadata import METADATA_CACHE
+from regrid_wrapper.strategy.operation import AbstractRegridOperation
+
+_LOGGER = LOGGER.getChild(__name__)
+
+
+class OperationGroup(BaseModel):
+    ntasks: int = Field(gt=0)
+    names: Tuple[str, ...]
+    cost: int
+
+
+class OperationPlan(BaseModel):
+    groups: Tuple[OperationGroup, ...]
+
+    @property
+    def ntasks(self) -> int:
+        return sum(ii.ntasks for ii in self.groups)
+
+    def save(self, path: Path) -> None:
+        path.write_text(self.model_dump_json(indent=2))
+
+    @classmethod
+    def load(cls, path: Path) -> "OperationPlan":
+        return cls.model_validate(json.loads(path.read_text()))
+
+
+def get_max_variable_size(path: Path) -> int:
+    variables = METADATA_CACHE.get(path).variables.values()
+    return max([int(np.prod(var.shape)) for var in variables], default=0)
+
+
+def estimate_operation_cost(op: AbstractRegridOperation) -> int:
+    # The element count of the largest variable in each input is a header-only
+    # proxy for the operation's work.
+    cost = 0
+    for path in op.spec.input_paths():
+        if path.exists():
+            cost += get_max_variable_size(path)
+    return max(cost, 1)
+
+
+def _find_chains_(ops: Sequence[AbstractRegridOperation]) -> List[List[int]]:
+    # Operations that read another operation's outputs must run after it on the
+    # same group.
+    owner = list(range(len(ops)))
+
+    def find(idx: int) -> int:
+        while owner[idx] != idx:
+            owner[idx] = owner[owner[idx]]
+            idx = owner[idx]
+        return idx
+
+    producers: Dict[Path, int] = {}
+    for idx, op in enumerate(ops):
+        for path in op.spec.output_paths():
+            producers[path] = idx
+    for idx, op in enumerate(ops):
+        for path in op.spec.input_paths():
+            if path in producers:
+                owner[find(idx)] = find(producers[path])
+
+    chains: Dict[int, List[int]] = {}
+    for idx in range(len(ops)):
+        chains.setdefault(find(idx), []).append(idx)
+    return list(chains.values())
+
+
+def _distribute_tasks_(costs: Sequence[int], ntasks: int) -> List[int]:
+    # Every group gets one task and the remainder is split in proportion to cost
+    # using the largest remainder method.
+    spare = ntasks - len(costs)
+    shares = np.array(costs, dtype=float) / sum(costs) * spare
+    ret = np.floor(shares).astype(int)
+    for idx in np.argsort(ret - shares)[: spare - int(ret.sum())]:
+        ret[idx] += 1
+    return [int(ii) + 1 for ii in ret]
+
+
+def plan_operation_groups(
+    ops: Sequence[AbstractRegridOperation], ntasks: int
+) -> OperationPlan:
+    chains = _find_chains_(ops)
+    chain_costs = [sum(estimate_operation_cost(ops[ii]) for ii in jj) for jj in chains]
+    ngroups = min(len(chains), ntasks)
+
+    # Longest-processing-time first: assign the most expensive chain to the least
+    # loaded group.
+    members: List[List[int]] = [[] for _ in range(ngroups)]
+    loads = [0] * ngroups
+    for chain_idx in np.argsort(chain_costs)[::-1]:
+        group_idx = int(np.argmin(loads))
+        members[group_idx] += chains[chain_idx]
+        loads[group_idx] += chain_costs[chain_idx]
+
+    groups = []
+    for group_ntasks, group_members, load in zip(
+        _distribute_tasks_(loads, ntasks), members, loads
+    ):
+        names = tuple(name for ii in sorted(group_members) for name in ops[ii].names)
+        groups.append(OperationGroup(ntasks=group_ntasks, names=names, cost=load))
+    plan = OperationPlan(groups=tuple(groups))
+    _LOGGER.info(f"operation plan: {plan}")
+    return plan
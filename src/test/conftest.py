@@ -6,6 +6,7 @@ from typing import Any, Iterator, Sequence, List, Dict
 
 import numpy as np
 import pytest
+import scipy.sparse as sp
 import xarray as xr
 from pydantic import BaseModel
 
@@ -193,5 +194,13 @@ def create_dust_data_file(path: Path) -> xr.Dataset:
     return ds
 
 
+def create_weight_file(path: Path, matrix: sp.coo_matrix) -> None:
+    with nc.Dataset(path, "w") as ds:
+        ds.createDimension("n_s", matrix.nnz)
+        ds.createVariable("row", np.int32, ("n_s",))[:] = matrix.row + 1
+        ds.createVariable("col", np.int32, ("n_s",))[:] = matrix.col + 1
+        ds.createVariable("S", np.float64, ("n_s",))[:] = matrix.data
+
+
 def assert_zero_sum_diff(actual: np.ndarray, expected: np.ndarray) -> None:
     assert (actual - expected).sum() == 0
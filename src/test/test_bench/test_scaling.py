@@ -0,0 +1,90 @@
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from regrid_wrapper.bench.run_scaling import do_run_scaling
+from regrid_wrapper.bench.scaling import (
+    ScalingConfig,
+    ScalingMode,
+    compute_scaling,
+    create_benchmark_command,
+)
+from regrid_wrapper.bench.suite import BenchmarkReport, BenchmarkResult
+from regrid_wrapper.context.instrument import SpanStats
+
+
+def create_report(nproc: int, spans: Dict[str, float]) -> BenchmarkReport:
+    return BenchmarkReport(
+        nproc=nproc,
+        src_shape=(10, 10),
+        dst_shape=(5, 5),
+        results={"dust": BenchmarkResult(times=(1.0,))},
+        spans={
+            k: SpanStats(
+                count=2,
+                min=v,
+                max=v,
+                mean=v,
+                imbalance=1.0,
+                rss_max=0,
+                hwm_max=0,
+                hwm_growth_max=0,
+            )
+            for k, v in spans.items()
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    "mode,expected_speedup,expected_efficiency",
+    [(ScalingMode.STRONG, 2.0, 0.5), (ScalingMode.WEAK, 8.0, 2.0)],
+)
+def test_compute_scaling(
+    mode: ScalingMode, expected_speedup: float, expected_efficiency: float
+) -> None:
+    reports = [
+        create_report(4, {"dust": 4.0, "dust/dust/run": 2.0, "load_grid": 1.0}),
+        create_report(1, {"dust": 8.0, "dust/dust/run": 4.0, "load_grid": 1.0}),
+    ]
+    actual = compute_scaling(mode, "dust", reports)
+    assert [ii.nproc for ii in actual.points] == [1, 4]
+    assert set(actual.points[0].phases) == {"dust", "dust/dust/run"}
+    assert actual.points[0].phases["dust"].time == pytest.approx(4.0)
+    assert actual.points[0].phases["dust"].efficiency == pytest.approx(1.0)
+    phase = actual.points[1].phases["dust/dust/run"]
+    assert phase.speedup == pytest.approx(expected_speedup)
+    assert phase.efficiency == pytest.approx(expected_efficiency)
+    assert "dust/dust/run" in actual.format()
+
+
+def test_create_benchmark_command_weak(tmp_path: Path) -> None:
+    cfg = ScalingConfig(
+        work_directory=tmp_path,
+        mode=ScalingMode.WEAK,
+        nprocs=(2, 4),
+        src_shape=(100, 30),
+        dst_shape=(10, 5),
+        mpirun_args=("--oversubscribe",),
+    )
+    cmd = create_benchmark_command(cfg, 4)
+    assert cmd[:4] == ["mpirun", "-n", "4", "--oversubscribe"]
+    assert "src_shape=[200,30]" in cmd
+    assert "dst_shape=[20,5]" in cmd
+    assert "cases=[dust]" in cmd
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+def test_run_scaling(tmp_path: Path) -> None:
+    cfg = ScalingConfig(
+        work_directory=tmp_path,
+        nprocs=(1, 2),
+        src_shape=(40, 60),
+        dst_shape=(10, 15),
+        ntime=2,
+        repeat=1,
+    )
+    report = do_run_scaling(cfg)
+    assert [ii.nproc for ii in report.points] == [1, 2]
+    assert (tmp_path / "scaling-strong.json").exists()
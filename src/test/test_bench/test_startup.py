@@ -0,0 +1,48 @@
+import subprocess
+import sys
+
+import pytest
+
+from regrid_wrapper.bench.launch import create_launch_env
+from regrid_wrapper.bench.startup import (
+    IMPORT_TIME_BUDGET,
+    STARTUP_MODULES,
+    measure_import_time,
+)
+
+
+def run_python(code: str) -> None:
+    env = create_launch_env()
+    env.pop("REGRID_WRAPPER_LOG_DIR", None)
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+
+def test_import_is_side_effect_free() -> None:
+    # Neither the environment, MPI nor esmpy is touched when importing the
+    # configuration models. No log directory is required.
+    run_python(
+        "import sys\n"
+        "import regrid_wrapper.model.config\n"
+        "for name in ['mpi4py.MPI', 'esmpy', 'xarray']:\n"
+        "    assert name not in sys.modules, name\n"
+        "from regrid_wrapper.context import env\n"
+        "assert env._ENV is None\n"
+    )
+
+
+def test_import_entry_points_is_lazy() -> None:
+    run_python(
+        "import sys\n"
+        f"import {', '.join(STARTUP_MODULES)}\n"
+        "from regrid_wrapper.context import env\n"
+        "from regrid_wrapper.context.comm import COMM\n"
+        "assert env._ENV is None\n"
+        "assert not COMM.is_initialized\n"
+        "assert 'esmpy' not in sys.modules\n"
+    )
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("module", STARTUP_MODULES)
+def test_import_time(module: str) -> None:
+    assert measure_import_time(module) < IMPORT_TIME_BUDGET
@@ -0,0 +1,117 @@
+from pathlib import Path
+
+import netCDF4 as nc
+import numpy as np
+import pytest
+
+from regrid_wrapper.bench.run_benchmarks import (
+    do_compare_baseline,
+    do_run_benchmarks,
+)
+from regrid_wrapper.bench.suite import (
+    BENCHMARK_CASES,
+    BenchmarkConfig,
+    BenchmarkReport,
+    BenchmarkResult,
+    compare_reports,
+)
+from regrid_wrapper.bench.synthetic import (
+    SyntheticGrid,
+    create_synthetic_rrfs_grid_file,
+    create_source_file,
+)
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.geom.bounding_box import BoundingBox
+
+
+def test_synthetic_grid(tmp_path: Path) -> None:
+    grid = SyntheticGrid(
+        shape=(7, 11),
+        bbox=BoundingBox(min_lon=230.0, max_lon=300.0, min_lat=20.0, max_lat=55.0),
+    )
+    path = tmp_path / "grid.nc"
+    create_synthetic_rrfs_grid_file(path, grid, fields=["foo"])
+    with nc.Dataset(path) as ds:
+        lont = ds.variables["grid_lont"][:]
+        latt = ds.variables["grid_latt"][:]
+        lonc = ds.variables["grid_lon"][:]
+        latc = ds.variables["grid_lat"][:]
+        assert lont.shape == (7, 11)
+        assert lonc.shape == (8, 12)
+        assert ds.variables["foo"][:].min() >= 1.0
+    # Cell centers sit inside the span of their corners.
+    assert np.all(lont > np.minimum(lonc[:-1, :-1], lonc[1:, :-1]))
+    assert np.all(lont < np.maximum(lonc[:-1, 1:], lonc[1:, 1:]))
+    assert np.all(latt > np.minimum(latc[:-1, :-1], latc[:-1, 1:]))
+    assert np.all(latt < np.maximum(latc[1:, :-1], latc[1:, 1:]))
+
+    path = tmp_path / "source.nc"
+    create_source_file(path, grid, fields=["bar"], timed_fields=["baz"], ntime=3)
+    with nc.Dataset(path) as ds:
+        assert ds.variables["baz"].dimensions == ("time", "lat", "lon")
+        assert ds.variables["bar"].shape == (7, 11)
+        baz = ds.variables["baz"][:]
+        assert np.allclose(baz[2], 3 * baz[0])
+
+
+def test_compare_reports() -> None:
+    def create_report(**times: float) -> BenchmarkReport:
+        return BenchmarkReport(
+            nproc=1,
+            src_shape=(10, 10),
+            dst_shape=(5, 5),
+            results={
+                k: BenchmarkResult(times=(v, v * 2, v / 2)) for k, v in times.items()
+            },
+            spans={},
+        )
+
+    baseline = create_report(load_grid=1.0, dust=2.0)
+    current = create_report(load_grid=1.05, dust=3.0, veg_map=1.0)
+    comparisons = {ii.name: ii for ii in compare_reports(current, baseline)}
+    assert set(comparisons) == {"load_grid", "dust"}
+    assert not comparisons["load_grid"].is_regression(0.1)
+    assert comparisons["dust"].is_regression(0.1)
+    assert comparisons["dust"].ratio == pytest.approx(1.5)
+
+
+def test_do_compare_baseline(tmp_path: Path) -> None:
+    def create_report(dust: float) -> BenchmarkReport:
+        return BenchmarkReport(
+            nproc=1,
+            src_shape=(10, 10),
+            dst_shape=(5, 5),
+            results={"dust": BenchmarkResult(times=(dust,))},
+            spans={},
+        )
+
+    cfg = BenchmarkConfig(
+        work_directory=tmp_path, baseline_path=tmp_path / "baseline.json"
+    )
+    assert do_compare_baseline(cfg, create_report(1.0)) == []
+    assert cfg.baseline_path.exists()
+    assert do_compare_baseline(cfg, create_report(1.05)) == []
+    assert do_compare_baseline(cfg, create_report(2.0)) == ["dust"]
+
+
+@pytest.mark.mpi
+@pytest.mark.benchmark
+def test_run_benchmarks(tmp_path_shared: Path) -> None:
+    cfg = BenchmarkConfig(
+        work_directory=tmp_path_shared,
+        src_shape=(40, 60),
+        dst_shape=(10, 15),
+        ntime=2,
+        repeat=2,
+        baseline_path=tmp_path_shared / "baseline.json",
+    )
+    report = do_run_benchmarks(cfg)
+    if COMM.rank == 0:
+        assert report is not None
+        assert set(report.results) == set(BENCHMARK_CASES)
+        assert all(len(ii.times) == 2 for ii in report.results.values())
+        assert report.spans["dust"].count == 2
+        assert do_compare_baseline(cfg, report) == []
+        assert cfg.baseline_path.exists()
+    else:
+        assert report is None
@@ -0,0 +1,152 @@
+from pathlib import Path
+from typing import List
+
+import esmpy
+import pytest
+import xarray as xr
+
+from regrid_wrapper.concrete.core import (
+    fuse_operations,
+    group_multi_target_operations,
+)
+from regrid_wrapper.concrete.rrfs_dust_data import RrfsDustData, RRFS_DUST_DATA_ENV
+from regrid_wrapper.concrete.rrfs_smoke_dust_veg_map import RrfsSmokeDustVegetationMap
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.model.spec import GenerateWeightFileAndRegridFields
+from regrid_wrapper.strategy.core import RegridProcessor
+from regrid_wrapper.strategy.multi_target import MultiTargetRegridOperation
+from regrid_wrapper.strategy.operation import AbstractRegridOperation
+from test.conftest import (
+    create_dust_data_file,
+    create_rrfs_grid_file,
+    create_veg_map_file,
+    assert_zero_sum_diff,
+)
+
+
+def create_dust_operation(
+    src_path: Path, dst_path: Path, output_directory: Path
+) -> RrfsDustData:
+    output_directory.mkdir(exist_ok=True)
+    return RrfsDustData(
+        spec=GenerateWeightFileAndRegridFields(
+            src_path=src_path,
+            dst_path=dst_path,
+            output_weight_filename=output_directory / "weights-dust.nc",
+            output_filename=output_directory / "dust.nc",
+            fields=RRFS_DUST_DATA_ENV.fields,
+            name=f"dust-{output_directory.name}",
+        )
+    )
+
+
+def create_fusible_operations(
+    tmp_path_shared: Path, veg_map_unmapped_action: int = esmpy.UnmappedAction.ERROR
+) -> List[AbstractRegridOperation]:
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    dust_src = tmp_path_shared / "dust_src.nc"
+    veg_map_src = tmp_path_shared / "veg_map_src.nc"
+    if COMM.rank == 0:
+        _ = create_rrfs_grid_file(dst_grid, with_corners=False)
+        _ = create_dust_data_file(dust_src)
+        _ = create_veg_map_file(veg_map_src, ["emiss_factor"])
+    COMM.barrier()
+
+    veg_map = RrfsSmokeDustVegetationMap(
+        spec=GenerateWeightFileAndRegridFields(
+            src_path=veg_map_src,
+            dst_path=dst_grid,
+            output_weight_filename=tmp_path_shared / "weights-veg_map.nc",
+            output_filename=tmp_path_shared / "veg_map.nc",
+            fields=("emiss_factor",),
+            esmpy_unmapped_action=veg_map_unmapped_action,
+            name="veg_map",
+        )
+    )
+    dust = create_dust_operation(dust_src, dst_grid, tmp_path_shared / "dust")
+    return [veg_map, dust]
+
+
+def test_fuse_operations(tmp_path_shared: Path) -> None:
+    ops = create_fusible_operations(tmp_path_shared)
+
+    actual = fuse_operations(ops)
+
+    assert actual[0] is ops[0]
+    assert isinstance(actual[1], RrfsDustData)
+    assert actual[1].spec.shared_weight_filename == ops[0].spec.output_weight_filename
+    assert ops[0].spec.output_weight_filename in actual[1].spec.input_paths()
+
+
+def test_fuse_operations_different_options(tmp_path_shared: Path) -> None:
+    ops = create_fusible_operations(
+        tmp_path_shared, veg_map_unmapped_action=esmpy.UnmappedAction.IGNORE
+    )
+    assert fuse_operations(ops) == ops
+
+
+@pytest.mark.mpi
+def test_fused_operations_run(tmp_path_shared: Path) -> None:
+    ops = fuse_operations(create_fusible_operations(tmp_path_shared))
+    for op in ops:
+        RegridProcessor(operation=op).execute()
+
+    if COMM.rank == 0:
+        veg_map_spec, dust_spec = [op.spec for op in ops]
+        assert dust_spec.output_weight_filename.exists()
+        with xr.open_dataset(veg_map_spec.src_path) as expected:
+            with xr.open_dataset(veg_map_spec.output_filename) as actual:
+                assert_zero_sum_diff(
+                    actual["emiss_factor"].values, expected["emiss_factor"].values
+                )
+        with xr.open_dataset(dust_spec.src_path) as expected:
+            with xr.open_dataset(dust_spec.output_filename) as actual:
+                for field_name in RRFS_DUST_DATA_ENV.fields:
+                    assert_zero_sum_diff(
+                        actual[field_name].values, expected[field_name].values
+                    )
+
+
+def create_multi_target_operations(
+    tmp_path_shared: Path,
+) -> List[AbstractRegridOperation]:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grids = [
+        tmp_path_shared / "dst_grid_25km.nc",
+        tmp_path_shared / "dst_grid_13km.nc",
+    ]
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grids[0], with_corners=False)
+        _ = create_rrfs_grid_file(dst_grids[1], with_corners=False, nlon=36, nlat=13)
+    COMM.barrier()
+    return [
+        create_dust_operation(src_grid, dst_grid, tmp_path_shared / dst_grid.stem)
+        for dst_grid in dst_grids
+    ]
+
+
+def test_group_multi_target_operations(tmp_path_shared: Path) -> None:
+    ops = create_multi_target_operations(tmp_path_shared)
+
+    actual = group_multi_target_operations(ops)
+
+    assert len(actual) == 1
+    assert isinstance(actual[0], MultiTargetRegridOperation)
+    assert actual[0].members == tuple(ops)
+    assert actual[0].names == tuple(op.spec.name for op in ops)
+    assert set(actual[0].spec.output_paths()) == {
+        path for op in ops for path in op.spec.output_paths()
+    }
+
+
+@pytest.mark.mpi
+def test_multi_target_operation_run(tmp_path_shared: Path) -> None:
+    ops = group_multi_target_operations(create_multi_target_operations(tmp_path_shared))
+    RegridProcessor(operation=ops[0]).execute()
+
+    if COMM.rank == 0:
+        for member in ops[0].members:
+            assert member.spec.output_weight_filename.exists()
+            with xr.open_dataset(member.spec.output_filename) as actual:
+                assert actual["uthr"].notnull().all()
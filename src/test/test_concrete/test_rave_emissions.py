@@ -0,0 +1,131 @@
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import netCDF4 as nc
+import numpy as np
+import pytest
+import scipy.sparse as sp
+import xarray as xr
+
+from regrid_wrapper.concrete.rave_emissions import (
+    RaveEmissionsToRrfs,
+    select_rave_paths,
+)
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.model.spec import RegridRaveEmissionsSpec
+from regrid_wrapper.strategy.core import RegridProcessor
+from test.conftest import (
+    create_rrfs_grid_file,
+    assert_zero_sum_diff,
+    create_weight_file,
+)
+
+FIELDS = ["FRP_MEAN", "FRE"]
+
+
+def create_rave_files(dst_dir: Path, hours: int) -> List[Path]:
+    dst_dir.mkdir(exist_ok=True)
+    paths = []
+    for hour in range(hours):
+        stamp = f"20230617{str(hour).zfill(2)}00"
+        paths.append(dst_dir / f"Hourly_Emissions_3km_{stamp}_{stamp}.nc")
+        if COMM.rank == 0:
+            _ = create_rrfs_grid_file(paths[-1], with_corners=False, fields=FIELDS)
+    COMM.barrier()
+    return paths
+
+
+def test_select_rave_paths(tmp_path_shared: Path) -> None:
+    paths = create_rave_files(tmp_path_shared / "rave", 4)
+    pattern = str(tmp_path_shared / "rave" / "Hourly_Emissions_3km_*.nc")
+
+    assert select_rave_paths(pattern) == tuple(paths)
+    actual = select_rave_paths(
+        pattern, start=datetime(2023, 6, 17, 1), end=datetime(2023, 6, 17, 2)
+    )
+    assert actual == tuple(paths[1:3])
+
+
+@pytest.mark.mpi
+def test(tmp_path_shared: Path) -> None:
+    src_paths = create_rave_files(tmp_path_shared / "rave", 5)
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    weights = tmp_path_shared / "weights.nc"
+    output_directory = tmp_path_shared / "emissions"
+    if COMM.rank == 0:
+        ds = create_rrfs_grid_file(dst_grid, with_corners=False)
+        create_weight_file(weights, sp.identity(ds["grid_latt"].size, format="coo"))
+    COMM.barrier()
+
+    spec = RegridRaveEmissionsSpec(
+        src_paths=src_paths,
+        dst_path=dst_grid,
+        weight_filename=weights,
+        output_directory=output_directory,
+        fields=FIELDS,
+        max_in_flight=1,
+        name="rave-emissions",
+    )
+    op = RaveEmissionsToRrfs(spec=spec)
+    RegridProcessor(operation=op).execute()
+
+    assert spec.is_complete()
+    if COMM.rank == 0:
+        for src_path in src_paths:
+            with xr.open_dataset(src_path) as expected:
+                with xr.open_dataset(spec.output_path(src_path)) as actual:
+                    for field in FIELDS:
+                        assert_zero_sum_diff(
+                            actual[field].values, expected[field].values
+                        )
+                    assert np.array_equal(
+                        actual["grid_latt"].values, expected["grid_latt"].values
+                    )
+
+
+@pytest.mark.mpi
+def test_fill_values(tmp_path_shared: Path) -> None:
+    src_paths = create_rave_files(tmp_path_shared / "rave", 2)
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    weights = tmp_path_shared / "weights.nc"
+    fill_value = 9.96e36
+    if COMM.rank == 0:
+        ds = create_rrfs_grid_file(dst_grid, with_corners=False)
+        # Every destination element averages a source element and its successor.
+        size = ds["grid_latt"].size
+        rows = np.repeat(np.arange(size), 2)
+        cols = (rows + np.tile([0, 1], size)) % size
+        matrix = sp.coo_matrix((np.full(2 * size, 0.5), (rows, cols)))
+        create_weight_file(weights, matrix)
+        for src_path in src_paths:
+            with nc.Dataset(src_path, "a") as src:
+                var = src.createVariable(
+                    "FILLED", "f8", ("grid_yt", "grid_xt"), fill_value=fill_value
+                )
+                data = np.ma.masked_array(np.ones(var.shape), mask=False)
+                # A lone fill cell and a pair of fill cells.
+                data[0, 0] = np.ma.masked
+                data[1, 0:2] = np.ma.masked
+                var[:] = data
+    COMM.barrier()
+
+    spec = RegridRaveEmissionsSpec(
+        src_paths=src_paths,
+        dst_path=dst_grid,
+        weight_filename=weights,
+        output_directory=tmp_path_shared / "emissions",
+        fields=FIELDS + ["FILLED"],
+        name="rave-emissions",
+    )
+    RegridProcessor(operation=RaveEmissionsToRrfs(spec=spec)).execute()
+
+    if COMM.rank == 0:
+        for src_path in src_paths:
+            with nc.Dataset(spec.output_path(src_path)) as ds:
+                assert ds.variables["FILLED"]._FillValue == fill_value
+                actual = ds.variables["FILLED"][:]
+            masked = np.ma.getmaskarray(actual)
+            assert masked.sum() == 1
+            assert masked[1, 0]
+            assert np.all(actual.compressed() == 1.0)
@@ -1,4 +1,5 @@
 from pathlib import Path
+import netCDF4 as nc
 import numpy as np
 
 from regrid_wrapper.concrete.rrfs_dust_data import (
@@ -6,7 +7,13 @@ from regrid_wrapper.concrete.rrfs_dust_data import (
     RRFS_DUST_DATA_ENV,
 )
 from regrid_wrapper.context.comm import COMM
-from regrid_wrapper.model.spec import GenerateWeightFileAndRegridFields
+from regrid_wrapper.model.spec import (
+    GenerateWeightFileAndRegridFields,
+    OutputEncodingSpec,
+    OutputFormat,
+    Precision,
+    RegridFieldsFromWeightFile,
+)
 from regrid_wrapper.strategy.core import RegridProcessor
 import pytest
 
@@ -63,3 +70,190 @@ def test(tmp_path_shared: Path) -> None:
                 assert_zero_sum_diff(
                     actual["geolon"].values, expected_coords["grid_lont"].values
                 )
+
+
+@pytest.mark.mpi
+def test_from_weight_file(tmp_path_shared: Path) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    weights = tmp_path_shared / "weights.nc"
+    expected_path = tmp_path_shared / "dust-expected.nc"
+    actual_path = tmp_path_shared / "dust-actual.nc"
+
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grid)
+    COMM.barrier()
+
+    spec = GenerateWeightFileAndRegridFields(
+        src_path=src_grid,
+        dst_path=dst_grid,
+        output_weight_filename=weights,
+        output_filename=expected_path,
+        name="dust-data",
+        fields=RRFS_DUST_DATA_ENV.fields,
+    )
+    RegridProcessor(RrfsDustData(spec=spec)).execute()
+    COMM.barrier()
+
+    spec_from_file = RegridFieldsFromWeightFile(
+        src_path=src_grid,
+        dst_path=dst_grid,
+        weight_filename=weights,
+        output_filename=actual_path,
+        name="dust-data-from-weights",
+        fields=RRFS_DUST_DATA_ENV.fields,
+    )
+    RegridProcessor(RrfsDustData(spec=spec_from_file)).execute()
+    COMM.barrier()
+
+    if COMM.rank == 0:
+        with xr.open_dataset(expected_path) as expected:
+            with xr.open_dataset(actual_path) as actual:
+                for field_name in RRFS_DUST_DATA_ENV.fields:
+                    assert_zero_sum_diff(
+                        actual[field_name].values, expected[field_name].values
+                    )
+
+
+@pytest.mark.mpi
+def test_output_encoding(tmp_path_shared: Path) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    dust_data = tmp_path_shared / "dust.nc"
+
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grid)
+    COMM.barrier()
+
+    spec = GenerateWeightFileAndRegridFields(
+        src_path=src_grid,
+        dst_path=dst_grid,
+        output_weight_filename=tmp_path_shared / "weights.nc",
+        output_filename=dust_data,
+        name="dust-data",
+        fields=RRFS_DUST_DATA_ENV.fields,
+        output_encoding=OutputEncodingSpec(zlib=True, complevel=1),
+    )
+    RegridProcessor(RrfsDustData(spec=spec)).execute()
+    COMM.barrier()
+
+    if COMM.rank == 0:
+        with nc.Dataset(dust_data) as ds:
+            var = ds.variables[RRFS_DUST_DATA_ENV.fields[0]]
+            assert var.filters()["zlib"]
+            assert var.filters()["shuffle"]
+            # ESMF decomposes the first grid dimension, longitude, between ranks.
+            nlon = -(-71 // COMM.size)
+            assert var.chunking() == [1, 26, nlon]
+            assert np.isfinite(var[:]).all()
+
+
+@pytest.mark.mpi
+@pytest.mark.parametrize("consolidate", [True, False])
+def test_zarr_output(tmp_path_shared: Path, consolidate: bool) -> None:
+    _ = pytest.importorskip("zarr")
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    dust_data = tmp_path_shared / "dust.nc"
+
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grid)
+    COMM.barrier()
+
+    spec = GenerateWeightFileAndRegridFields(
+        src_path=src_grid,
+        dst_path=dst_grid,
+        output_weight_filename=tmp_path_shared / "weights.nc",
+        output_filename=dust_data,
+        name="dust-data",
+        fields=RRFS_DUST_DATA_ENV.fields,
+        output_encoding=OutputEncodingSpec(
+            format=OutputFormat.ZARR, consolidate=consolidate
+        ),
+    )
+    RegridProcessor(RrfsDustData(spec=spec)).execute()
+    COMM.barrier()
+
+    store = tmp_path_shared / "dust.zarr"
+    assert spec.output_paths()[1] == (dust_data if consolidate else store)
+    assert dust_data.exists() == consolidate
+    assert store.exists() != consolidate
+    if COMM.rank == 0:
+        with xr.open_dataset(src_grid) as expected:
+            if consolidate:
+                actual = xr.open_dataset(dust_data)
+            else:
+                actual = xr.open_zarr(store, consolidated=False)
+            with actual:
+                for field_name in RRFS_DUST_DATA_ENV.fields:
+                    assert_zero_sum_diff(
+                        actual[field_name].values, expected[field_name].values
+                    )
+
+
+@pytest.mark.mpi
+def test_float32(tmp_path_shared: Path) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grid)
+    COMM.barrier()
+
+    for precision in Precision:
+        spec = GenerateWeightFileAndRegridFields(
+            src_path=src_grid,
+            dst_path=dst_grid,
+            output_weight_filename=tmp_path_shared / f"weights-{precision}.nc",
+            output_filename=tmp_path_shared / f"dust-{precision}.nc",
+            name=f"dust-data-{precision}",
+            fields=RRFS_DUST_DATA_ENV.fields,
+            precision=precision,
+        )
+        RegridProcessor(RrfsDustData(spec=spec)).execute()
+    COMM.barrier()
+
+    if COMM.rank == 0:
+        with nc.Dataset(tmp_path_shared / "dust-float64.nc") as expected:
+            with nc.Dataset(tmp_path_shared / "dust-float32.nc") as actual:
+                assert actual.variables["geolon"].dtype == np.float64
+                for field_name in RRFS_DUST_DATA_ENV.fields:
+                    actual_var = actual.variables[field_name]
+                    assert actual_var.dtype == np.float32
+                    expected_values = expected.variables[field_name][:]
+                    diff = np.abs(actual_var[:] - expected_values).max()
+                    assert diff <= 1e-6 * np.abs(expected_values).max()
+
+
+@pytest.mark.mpi
+def test_time_chunk_size(tmp_path_shared: Path) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grid)
+    COMM.barrier()
+
+    # The last chunk is shorter than the others.
+    for time_chunk_size in [None, 5]:
+        spec = GenerateWeightFileAndRegridFields(
+            src_path=src_grid,
+            dst_path=dst_grid,
+            output_weight_filename=tmp_path_shared / f"weights-{time_chunk_size}.nc",
+            output_filename=tmp_path_shared / f"dust-{time_chunk_size}.nc",
+            name=f"dust-data-{time_chunk_size}",
+            fields=RRFS_DUST_DATA_ENV.fields,
+            time_chunk_size=time_chunk_size,
+        )
+        RegridProcessor(RrfsDustData(spec=spec)).execute()
+    COMM.barrier()
+
+    if COMM.rank == 0:
+        with xr.open_dataset(tmp_path_shared / "dust-None.nc") as expected:
+            with xr.open_dataset(tmp_path_shared / "dust-5.nc") as actual:
+                xr.testing.assert_identical(actual, expected)
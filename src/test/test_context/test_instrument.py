@@ -0,0 +1,64 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.instrument import Instrument, RunReport
+
+
+@pytest.mark.mpi
+def test_reduce(tmp_path_shared: Path) -> None:
+    instrument = Instrument()
+    with instrument.span("op"):
+        for _ in range(2):
+            with instrument.span("phase"):
+                time.sleep(0.01 * (COMM.rank + 1))
+        if COMM.rank == 0:
+            with instrument.span("rank-zero"):
+                instrument.add_bytes("allocated", 100)
+        buffer = np.ones(4 * 1024**2)
+        instrument.add_bytes("allocated", buffer.nbytes)
+
+    report = instrument.reduce()
+
+    if COMM.rank != 0:
+        assert report is None
+        return
+    assert report is not None
+    assert report.nproc == COMM.size
+    assert set(report.spans) == {"op", "op/phase", "op/rank-zero"}
+    phase = report.spans["op/phase"]
+    assert phase.count == 2
+    assert phase.min <= phase.mean <= phase.max
+    assert phase.max >= 0.02 * COMM.size
+    assert phase.imbalance >= 1.0
+    assert phase.rss_max > 0 and phase.hwm_max > 0
+    assert report.counters["op/rank-zero/allocated"].total == 100
+    allocated = report.counters["op/allocated"]
+    assert allocated.total == buffer.nbytes * COMM.size
+    assert allocated.min == allocated.max
+    assert len(report.hwm_by_rank) == COMM.size
+    assert sum(report.hwm_by_host.values()) == sum(report.hwm_by_rank)
+    path = tmp_path_shared / "report.json"
+    report.save(path)
+    assert RunReport.model_validate_json(path.read_text()) == report
+
+
+def test_span_in_thread() -> None:
+    instrument = Instrument()
+    with instrument.span("op"):
+        parent = instrument.path()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+
+            def read() -> None:
+                with instrument.span("read", parent=parent):
+                    pass
+
+            pool.submit(read).result()
+    report = instrument.reduce()
+    if COMM.rank == 0:
+        assert report is not None
+        assert set(report.spans) == {"op", "op/read"}
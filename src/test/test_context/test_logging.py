@@ -3,7 +3,7 @@ from pathlib import Path
 import pytest
 
 from regrid_wrapper.context.comm import COMM
-from regrid_wrapper.context.logging import init_logging
+from regrid_wrapper.context.logging import init_logging, open_shared_log_files
 from test.conftest import custom_env
 
 
@@ -17,3 +17,55 @@ def test(tmp_path_shared: Path) -> None:
         logger.info(log_files)
         assert len(log_files) == COMM.size
     init_logging()
+
+
+@pytest.mark.mpi
+def test_scalable(tmp_path_shared: Path, capsys: pytest.CaptureFixture) -> None:
+    env = {
+        "LOG_DIR": str(tmp_path_shared),
+        "LOG_CONSOLE": "root",
+        "LOG_FILE_GROUP_SIZE": 2,
+        "LOG_QUEUE": True,
+    }
+    with custom_env(**env):
+        logger = init_logging()
+        logger.getChild("test").info("hello %s", "world")
+        # Reconfiguring stops the queue listener which flushes queued records.
+        init_logging()
+        COMM.barrier()
+        log_files = list(tmp_path_shared.glob("*.log"))
+        assert len(log_files) == (COMM.size + 1) // 2
+        group_file = tmp_path_shared / f"Regrid-Wrapper-group-{COMM.rank // 2:04d}.log"
+        assert f"[{COMM.rank}]: hello world" in group_file.read_text()
+    init_logging()
+    assert ("hello world" in capsys.readouterr().out) == (COMM.rank == 0)
+
+
+@pytest.mark.mpi
+@pytest.mark.parametrize("log_queue", [False, True])
+def test_open_shared_log_files(tmp_path_shared: Path, log_queue: bool) -> None:
+    group_file = tmp_path_shared / f"Regrid-Wrapper-group-{COMM.rank // 2:04d}.log"
+    if COMM.rank == 0:
+        for ii in range(0, COMM.size, 2):
+            (tmp_path_shared / f"Regrid-Wrapper-group-{ii // 2:04d}.log").write_text(
+                "stale\n"
+            )
+    COMM.barrier()
+    env = {
+        "LOG_DIR": str(tmp_path_shared),
+        "LOG_FILE_GROUP_SIZE": 2,
+        "LOG_QUEUE": log_queue,
+    }
+    with custom_env(**env):
+        logger = init_logging()
+        # Records are held until the shared file is truncated.
+        logger.info("before %d", COMM.rank)
+        open_shared_log_files()
+        logger.info("after %d", COMM.rank)
+        init_logging()
+        COMM.barrier()
+        actual = group_file.read_text()
+        assert "stale" not in actual
+        assert f"[{COMM.rank}]: before {COMM.rank}" in actual
+        assert f"[{COMM.rank}]: after {COMM.rank}" in actual
+    init_logging()
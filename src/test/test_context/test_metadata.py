@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.metadata import MetadataCache
+from test.conftest import create_rrfs_grid_file
+
+
+@pytest.mark.mpi
+def test_metadata_cache(tmp_path_shared: Path) -> None:
+    path = tmp_path_shared / "grid.nc"
+    if COMM.rank == 0:
+        _ = create_rrfs_grid_file(path, nlon=4, nlat=3)
+    COMM.barrier()
+    cache = MetadataCache()
+
+    actual = cache.get_shared(path)
+
+    assert actual.dimensions["grid_xt"] == 4
+    assert actual.variables["grid_lon"].shape == (4, 5)
+    assert actual.variables["grid_lon"].dimensions == ("grid_y", "grid_x")
+    assert np.isnan(actual.variables["grid_lon"].fill_value)
+    assert cache.get(path) is actual
+    assert cache.get_shared(path) is actual
+
+    COMM.barrier()
+    if COMM.rank == 0:
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    COMM.barrier()
+    assert cache.get(path) is not actual
+    assert cache.get_shared(path) is not actual
+
+
+@pytest.mark.mpi
+def test_metadata_cache_shared_error(tmp_path_shared: Path) -> None:
+    cache = MetadataCache()
+    with pytest.raises(FileNotFoundError):
+        cache.get_shared(tmp_path_shared / "missing.nc")
+
+
+def test_metadata_cache_digest(tmp_path: Path) -> None:
+    path = tmp_path / "grid.nc"
+    _ = create_rrfs_grid_file(path, nlon=4, nlat=3)
+    cache = MetadataCache()
+    calls = []
+
+    def compute() -> str:
+        calls.append(None)
+        return f"digest-{len(calls)}"
+
+    assert cache.get_digest(path, "foo", compute) == "digest-1"
+    assert cache.get_digest(path, "foo", compute) == "digest-1"
+    assert cache.get_digest(path, "bar", compute) == "digest-2"
+
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert cache.get_digest(path, "foo", compute) == "digest-3"
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import netCDF4 as nc
+import numpy as np
+
+from regrid_wrapper.context.staging import (
+    StagingMethod,
+    is_netcdf4,
+    stage_files,
+)
+
+
+def create_nc_file(path: Path, format: str) -> None:
+    with nc.Dataset(path, "w", format=format) as ds:
+        ds.createDimension("x", 3)
+        ds.createVariable("foo", float, ("x",))[:] = np.arange(3)
+
+
+def test_stage_files(tmp_path: Path) -> None:
+    src = tmp_path / "src.nc"
+    create_nc_file(src, "NETCDF4")
+    classic = tmp_path / "classic.nc"
+    create_nc_file(classic, "NETCDF3_CLASSIC")
+    dsts = [tmp_path / f"dst-{ii}" for ii in range(3)]
+    for dst in dsts:
+        dst.mkdir()
+
+    actual = stage_files(
+        [
+            (src, dsts[0] / "src.nc"),
+            (classic, dsts[0] / "classic.nc"),
+            (src, dsts[1] / "src.nc"),
+            (tmp_path / "." / "src.nc", dsts[2] / "src.nc"),
+        ]
+    )
+
+    assert actual[dsts[0] / "classic.nc"] == StagingMethod.CONVERT
+    assert is_netcdf4(dsts[0] / "classic.nc")
+    for dst in dsts:
+        assert actual[dst / "src.nc"] != StagingMethod.CONVERT
+        assert (dst / "src.nc").read_bytes() == src.read_bytes()
+    # Repeated sources are staged from the first staged copy so they can be
+    # linked on the destination filesystem.
+    assert actual[dsts[1] / "src.nc"] in (
+        StagingMethod.REFLINK,
+        StagingMethod.HARDLINK,
+    )
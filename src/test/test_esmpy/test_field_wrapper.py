@@ -2,6 +2,7 @@ from pathlib import Path
 
 import esmpy
 import numpy as np
+import xarray as xr
 
 from regrid_wrapper.concrete.rrfs_dust_data import RRFS_DUST_DATA_ENV
 from regrid_wrapper.esmpy.field_wrapper import (
@@ -13,9 +14,18 @@ from regrid_wrapper.esmpy.field_wrapper import (
     open_nc,
     load_variable_data,
     GridSpec,
+    GridRegistry,
+    DatasetPool,
+    iter_time_chunks,
+    set_variable_data,
+    is_packed,
+    set_zarr_variable_data,
+    Dimension,
+    DimensionCollection,
 )
 from test.conftest import tmp_path_shared, create_dust_data_file, create_rrfs_grid_file
 from regrid_wrapper.common import ncdump
+from regrid_wrapper.esmpy.zarr_store import open_zarr_source, open_zarr_variable
 from regrid_wrapper.context.comm import COMM
 import pytest
 
@@ -96,6 +106,33 @@ class TestGridWrapper:
                 assert (expected - actual).sum() == 0
 
 
+class TestGridRegistry:
+
+    @pytest.mark.mpi
+    def test(self, tmp_path_shared: Path) -> None:
+        path = create_dust_file(tmp_path_shared)
+        spec = GridSpec(
+            x_center="geolon", y_center="geolat", x_dim=("lon",), y_dim=("lat",)
+        )
+        nc2grid = NcToGrid(path=path, spec=spec)
+        registry = GridRegistry()
+        registry.reserve([nc2grid])
+        registry.reserve([nc2grid, NcToGrid(path=path, spec=spec)])
+
+        gwrap = registry.get(nc2grid)
+        assert registry.get(NcToGrid(path=path, spec=spec)) is gwrap
+        assert gwrap.source == nc2grid
+        registry.release([nc2grid])
+        assert len(registry) == 1
+        registry.release([nc2grid])
+        assert len(registry) == 0
+
+        # Unreserved grids are released by their first consumer.
+        _ = registry.get(nc2grid)
+        registry.release([nc2grid])
+        assert len(registry) == 0
+
+
 class TestFieldWrapper:
 
     @pytest.mark.mpi
@@ -138,3 +175,221 @@ def test_resize_nc(tmp_path_shared: Path) -> None:
     with open_nc(dst_path, "r") as ds:
         for dim in ds.dimensions:
             assert ds.dimensions[dim].size == new_sizes[dim]
+
+
+def test_dataset_pool(tmp_path: Path) -> None:
+    paths = [tmp_path / f"grid-{ii}.nc" for ii in range(3)]
+    for path in paths:
+        _ = create_rrfs_grid_file(path, nlon=4, nlat=3)
+    pool = DatasetPool(max_handles=2)
+
+    with pool.acquire(paths[0], parallel=False) as ds:
+        assert ds.isopen()
+    assert not ds.isopen()
+    assert len(pool) == 0
+
+    with pool.session():
+        with pool.acquire(paths[0], parallel=False) as ds:
+            pass
+        with pool.acquire(paths[0], parallel=False) as ds_reused:
+            assert ds_reused is ds
+        with pool.acquire(paths[0], "a", parallel=False) as ds_append:
+            assert not ds.isopen()
+            ds_append.variables["grid_lont"][0, 0] = -1.0
+        with pool.acquire(paths[0], parallel=False) as ds_reused:
+            assert ds_reused is ds_append
+        for path in paths[1:]:
+            with pool.acquire(path, parallel=False):
+                pass
+        assert len(pool) == 2
+        assert not ds_append.isopen()
+    assert len(pool) == 0
+
+    with open_nc(paths[0], parallel=False) as ds:
+        assert ds.variables["grid_lont"][0, 0] == -1.0
+
+
+def test_iter_time_chunks() -> None:
+    assert iter_time_chunks(12, None) == [(0, 12)]
+    assert iter_time_chunks(12, 5) == [(0, 5), (5, 10), (10, 12)]
+    assert iter_time_chunks(12, 12) == [(0, 12)]
+    assert iter_time_chunks(0, 5) == [(0, 0)]
+
+
+@pytest.mark.parametrize("is_packed", [False, True])
+def test_load_variable_data_raw(tmp_path: Path, is_packed: bool) -> None:
+    path = tmp_path / "data.nc"
+    with open_nc(path, "w", parallel=False) as ds:
+        ds.createDimension("time", 3)
+        ds.createDimension("lon", 4)
+        var = ds.createVariable("foo", "i2" if is_packed else "f4", ("time", "lon"))
+        if is_packed:
+            var.scale_factor = np.float32(0.5)
+            var.add_offset = np.float32(10.0)
+        var[:] = np.arange(12).reshape(3, 4) + 10.0
+        var[1, 1] = np.ma.masked
+    dims = DimensionCollection(
+        value=[
+            Dimension(
+                name=("lon",),
+                size=4,
+                lower=1,
+                upper=4,
+                staggerloc=0,
+                coordinate_type="x",
+            ),
+            Dimension(
+                name=("time",),
+                size=3,
+                lower=0,
+                upper=2,
+                staggerloc=0,
+                coordinate_type="time",
+            ),
+        ]
+    )
+
+    with open_nc(path, "a", parallel=False) as ds:
+        var = ds.variables["foo"]
+        actual = load_variable_data(var, dims, raw=True)
+        expected = load_variable_data(var, dims, raw=False)
+        assert not np.ma.isMaskedArray(actual)
+        assert actual.dtype == expected.dtype
+        assert np.array_equal(actual, np.ma.getdata(expected))
+        assert var.mask and var.scale
+
+        set_variable_data(var, dims, np.full((3, 2), 12.5), raw=True)
+        assert np.all(var[:2, 1:] == 12.5)
+        assert var[2, 0] == 18.0
+
+
+@pytest.mark.parametrize("raw", [False, True])
+def test_load_variable_data_zarr_packed(tmp_path: Path, raw: bool) -> None:
+    zarr = pytest.importorskip("zarr")
+    store_path = tmp_path / "source.zarr"
+    group = zarr.open_group(str(store_path), mode="w", zarr_format=2)
+    array = group.create_array(
+        "foo", shape=(3, 4), chunks=(2, 3), dtype="i2", compressors=None
+    )
+    # Zero is the fill value of the array.
+    array[:] = np.arange(1, 13).reshape(3, 4)
+    array.attrs.update(
+        {
+            "_ARRAY_DIMENSIONS": ["time", "lon"],
+            "scale_factor": 0.5,
+            "add_offset": 10.0,
+        }
+    )
+    dims = DimensionCollection(
+        value=[
+            Dimension(
+                name=("lon",),
+                size=4,
+                lower=0,
+                upper=4,
+                staggerloc=0,
+                coordinate_type="x",
+            ),
+            Dimension(
+                name=("time",),
+                size=3,
+                lower=0,
+                upper=3,
+                staggerloc=0,
+                coordinate_type="time",
+            ),
+        ]
+    )
+
+    var = open_zarr_source(store_path).variables["foo"]
+    assert is_packed(var)
+    actual = load_variable_data(var, dims, raw=raw)
+
+    expected = (np.arange(1, 13).reshape(3, 4) * 0.5 + 10.0).T
+    assert actual.dtype == np.float64
+    assert np.array_equal(actual, expected)
+
+
+@pytest.mark.mpi
+def test_set_zarr_variable_data_unaligned(tmp_path_shared: Path) -> None:
+    # Blocks of two and three columns written to chunks of three columns so
+    # chunks span blocks with any number of ranks.
+    zarr = pytest.importorskip("zarr")
+    sizes = [2 + ii % 2 for ii in range(COMM.size)]
+    nx = sum(sizes)
+    lower = sum(sizes[: COMM.rank])
+    upper = lower + sizes[COMM.rank]
+    path = tmp_path_shared / "data.zarr"
+    expected = np.arange(2 * nx, dtype=float).reshape(2, nx)
+    if COMM.rank == 0:
+        group = zarr.open_group(str(path), mode="w")
+        _ = group.create_array(
+            "foo",
+            shape=(2, nx),
+            chunks=(1, 3),
+            dtype=float,
+            dimension_names=("time", "x"),
+        )
+    COMM.barrier()
+    dims = DimensionCollection(
+        value=[
+            Dimension(
+                name=("x",),
+                size=nx,
+                lower=lower,
+                upper=upper,
+                staggerloc=0,
+                coordinate_type="x",
+            ),
+            Dimension(
+                name=("time",),
+                size=2,
+                lower=0,
+                upper=2,
+                staggerloc=0,
+                coordinate_type="time",
+            ),
+        ]
+    )
+
+    set_zarr_variable_data(path, "foo", dims, expected[:, lower:upper].T)
+    COMM.barrier()
+
+    assert np.array_equal(open_zarr_variable(path, "foo")[:], expected)
+
+
+@pytest.mark.mpi
+def test_zarr_source(tmp_path_shared: Path) -> None:
+    _ = pytest.importorskip("zarr")
+    path = create_dust_file(tmp_path_shared)
+    zarr_path = tmp_path_shared / "data.zarr"
+    if COMM.rank == 0:
+        with xr.open_dataset(path) as ds:
+            encoding = {
+                k: {"chunks": tuple(min(ii, 7) for ii in v.shape)}
+                for k, v in ds.data_vars.items()
+            }
+            ds.to_zarr(zarr_path, encoding=encoding)
+    COMM.barrier()
+    spec = GridSpec(
+        x_center="geolon", y_center="geolat", x_dim=("lon",), y_dim=("lat",)
+    )
+
+    fwraps = []
+    for source in [path, zarr_path]:
+        gwrap = NcToGrid(path=source, spec=spec).create_uncached_grid_wrapper()
+        nc2field = NcToField(
+            path=source,
+            name=RRFS_DUST_DATA_ENV.fields[0],
+            gwrap=gwrap,
+            dim_time=("time",),
+        )
+        fwraps.append(nc2field.create_field_wrapper())
+
+    expected, actual = fwraps
+    assert actual.dims == expected.dims
+    assert np.array_equal(actual.value.data, expected.value.data)
+    assert np.array_equal(
+        actual.gwrap.spec.get_x_data(actual.gwrap.value, esmpy.StaggerLoc.CENTER),
+        expected.gwrap.spec.get_x_data(expected.gwrap.value, esmpy.StaggerLoc.CENTER),
+    )
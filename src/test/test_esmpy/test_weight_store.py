@@ -0,0 +1,137 @@
+import os
+from pathlib import Path
+
+import esmpy
+import pytest
+
+from regrid_wrapper.concrete.rave_to_rrfs import RaveToRrfs
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.esmpy.field_wrapper import NcToGrid, GridSpec
+from regrid_wrapper.esmpy.weight_store import RegridOptions, WeightStore
+from regrid_wrapper.model.spec import GenerateWeightFileSpec, WeightCacheSpec
+from regrid_wrapper.strategy.core import RegridProcessor
+from test.conftest import create_rrfs_grid_file
+
+GRID_SPEC = GridSpec(
+    x_center="grid_lont",
+    y_center="grid_latt",
+    x_dim=("grid_xt",),
+    y_dim=("grid_yt",),
+)
+
+OPTIONS = RegridOptions(
+    regrid_method=esmpy.RegridMethod.BILINEAR,
+    unmapped_action=esmpy.UnmappedAction.ERROR,
+)
+
+
+def create_fake_entry(store: WeightStore, key: str, size: int, mtime: int) -> Path:
+    store.spec.directory.mkdir(parents=True, exist_ok=True)
+    path = store.entry_path(key)
+    path.write_bytes(b"0" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.mark.mpi
+def test_fingerprint(tmp_path_shared: Path) -> None:
+    paths = [tmp_path_shared / f"grid-{ii}.nc" for ii in range(3)]
+    if COMM.rank == 0:
+        _ = create_rrfs_grid_file(paths[0])
+        _ = create_rrfs_grid_file(paths[1])
+        _ = create_rrfs_grid_file(paths[2], nlon=35, nlat=10)
+    COMM.barrier()
+
+    fingerprints = [NcToGrid(path=ii, spec=GRID_SPEC).fingerprint() for ii in paths]
+    assert fingerprints[0] == fingerprints[1]
+    assert fingerprints[0] != fingerprints[2]
+
+
+class TestWeightStore:
+
+    def test_fetch_and_put(self, tmp_path: Path) -> None:
+        store = WeightStore(spec=WeightCacheSpec(directory=tmp_path / "cache"))
+        weights = tmp_path / "weights.nc"
+        weights.write_bytes(b"weights")
+        fetched = tmp_path / "fetched.nc"
+
+        assert not store.fetch("foo", fetched)
+        store.put("foo", weights)
+        assert store.fetch("foo", fetched)
+        assert fetched.read_bytes() == b"weights"
+
+    def test_fetch_copies(self, tmp_path: Path) -> None:
+        # Run outputs must not share an inode with the entry, and hits must not
+        # change the entry's modification time.
+        store = WeightStore(spec=WeightCacheSpec(directory=tmp_path / "cache"))
+        weights = tmp_path / "weights.nc"
+        weights.write_bytes(b"weights")
+        store.put("foo", weights)
+        entry = store.entry_path("foo")
+        os.utime(entry, (100, 100))
+        fetched = tmp_path / "fetched.nc"
+
+        assert store.fetch("foo", fetched)
+
+        assert entry.stat().st_mtime == 100
+        assert entry.stat().st_ino not in {
+            fetched.stat().st_ino,
+            weights.stat().st_ino,
+        }
+        assert entry.stat().st_nlink == 1
+
+    def test_evict(self, tmp_path: Path) -> None:
+        store = WeightStore(
+            spec=WeightCacheSpec(directory=tmp_path / "cache", max_bytes=25)
+        )
+        oldest = create_fake_entry(store, "oldest", 10, 100)
+        middle = create_fake_entry(store, "middle", 10, 200)
+        newest = create_fake_entry(store, "newest", 10, 300)
+
+        evicted = store.evict()
+
+        assert evicted == [oldest]
+        assert middle.exists()
+        assert newest.exists()
+
+    def test_evict_keeps_recently_used(self, tmp_path: Path) -> None:
+        store = WeightStore(
+            spec=WeightCacheSpec(directory=tmp_path / "cache", max_bytes=25)
+        )
+        oldest = create_fake_entry(store, "oldest", 10, 100)
+        middle = create_fake_entry(store, "middle", 10, 200)
+        _ = create_fake_entry(store, "newest", 10, 300)
+        assert store.fetch("oldest", tmp_path / "fetched.nc")
+
+        evicted = store.evict()
+
+        assert evicted == [middle]
+        assert oldest.exists()
+
+
+@pytest.mark.mpi
+def test_rave_to_rrfs_cache_hit(tmp_path_shared: Path) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    weight_cache = WeightCacheSpec(directory=tmp_path_shared / "cache")
+    if COMM.rank == 0:
+        _ = create_rrfs_grid_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grid)
+    COMM.barrier()
+
+    for ii in range(2):
+        spec = GenerateWeightFileSpec(
+            src_path=src_grid,
+            dst_path=dst_grid,
+            output_weight_filename=tmp_path_shared / f"weights-{ii}.nc",
+            name=f"tester-{ii}",
+            weight_cache=weight_cache,
+        )
+        processor = RegridProcessor(operation=RaveToRrfs(spec=spec))
+        processor.execute()
+        COMM.barrier()
+
+    assert len(list(weight_cache.directory.glob("*.nc"))) == 1
+    assert (tmp_path_shared / "weights-0.nc").read_bytes() == (
+        tmp_path_shared / "weights-1.nc"
+    ).read_bytes()
@@ -0,0 +1,104 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.metadata import MetadataCache
+from regrid_wrapper.esmpy.zarr_store import (
+    ZarrVariable,
+    consolidate_zarr_store,
+    create_zarr_store,
+    open_zarr_source,
+    open_zarr_variable,
+)
+from regrid_wrapper.model.spec import OutputEncodingSpec
+from test.conftest import create_dust_data_file
+
+
+@pytest.mark.mpi
+def test_create_zarr_store(tmp_path_shared: Path) -> None:
+    _ = pytest.importorskip("zarr")
+    src_path = tmp_path_shared / "dust.nc"
+    store_path = tmp_path_shared / "dust.zarr"
+    dst_path = tmp_path_shared / "dust-consolidated.nc"
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_path)
+    COMM.barrier()
+
+    create_zarr_store(
+        src_path,
+        store_path,
+        {"time": 12, "lat": 4, "lon": 6},
+        copy_values_for=["time"],
+        encoding=OutputEncodingSpec(zlib=True),
+        chunk_sizes={"lat": 4, "lon": 3},
+    )
+
+    var = open_zarr_variable(store_path, "uthr")
+    assert isinstance(var, ZarrVariable)
+    assert var.dimensions == ("time", "lat", "lon")
+    assert var.shape == (12, 4, 6)
+    assert var.chunks == (1, 4, 3)
+    assert open_zarr_variable(store_path, "time").chunks == (12,)
+    COMM.barrier()
+    if COMM.rank == 0:
+        var[:] = np.ones(var.shape)
+    consolidate_zarr_store(store_path, dst_path)
+
+    assert not store_path.exists()
+    if COMM.rank == 0:
+        import xarray as xr
+
+        with xr.open_dataset(dst_path) as ds:
+            assert ds["uthr"].sum() == 12 * 4 * 6
+            assert ds["time"].sum() == np.arange(12).sum()
+            assert "foo" in ds["uthr"].attrs
+
+
+def create_reference_file(store_path: Path, path: Path) -> None:
+    # Kerchunk style references to the files of a zarr v2 store.
+    refs = {}
+    for child in store_path.rglob("*"):
+        if not child.is_file():
+            continue
+        key = str(child.relative_to(store_path))
+        if child.name.startswith(".z"):
+            refs[key] = child.read_text()
+        else:
+            refs[key] = [str(child), 0, child.stat().st_size]
+    path.write_text(json.dumps({"version": 1, "refs": refs}))
+
+
+@pytest.mark.parametrize("is_reference", [False, True])
+def test_open_zarr_source(tmp_path: Path, is_reference: bool) -> None:
+    zarr = pytest.importorskip("zarr")
+    if is_reference:
+        _ = pytest.importorskip("fsspec")
+    store_path = tmp_path / "source.zarr"
+    group = zarr.open_group(str(store_path), mode="w", zarr_format=2)
+    data = np.arange(5 * 7, dtype=float).reshape(5, 7)
+    array = group.create_array(
+        "field", shape=data.shape, chunks=(2, 3), dtype=float, compressors=None
+    )
+    array[:] = data
+    array.attrs.update({"_ARRAY_DIMENSIONS": ["lat", "lon"], "units": "1"})
+    path = store_path
+    if is_reference:
+        path = tmp_path / "source.json"
+        create_reference_file(store_path, path)
+
+    ds = open_zarr_source(path)
+
+    assert ds.dimensions["lat"].size == 5
+    assert ds.dimensions["lon"].size == 7
+    var = ds.variables["field"]
+    assert var.dimensions == ("lat", "lon")
+    assert var.attrs["units"] == "1"
+    assert np.array_equal(var[:], data)
+    assert np.array_equal(var[1:4, 2:7], data[1:4, 2:7])
+    assert var[0:0].shape == (0, 7)
+    metadata = MetadataCache().get(path)
+    assert metadata.variables["field"].shape == (5, 7)
+    assert metadata.variables["field"].fill_value == 0.0
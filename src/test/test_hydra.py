@@ -5,8 +5,10 @@ from pathlib import Path
 import pytest
 
 from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.hydra.plan_resources import do_plan_resources
 from regrid_wrapper.hydra.run_operations import do_run_operations
 from regrid_wrapper.hydra.task_prep import do_task_prep
+from regrid_wrapper.strategy.scheduler import OperationPlan
 from regrid_wrapper.model.config import (
     SmokeDustRegridConfig,
     RrfsGridKey,
@@ -14,6 +16,8 @@ from regrid_wrapper.model.config import (
     ComponentKey,
     SourceDefinition,
     RrfsGrid,
+    Launcher,
+    ResourceLimits,
 )
 from test.conftest import (
     create_veg_map_file,
@@ -69,6 +73,85 @@ def test_do_task_prep(tmp_path_shared: Path) -> None:
     assert len(stuff) == 17
 
 
+def test_do_task_prep_concurrent_operations(tmp_path_shared: Path) -> None:
+    cfg = create_fake_cfg(tmp_path_shared).model_copy(
+        update={"concurrent_operations": True, "launcher": Launcher.SRUN}
+    )
+    do_task_prep(cfg)
+    plan = OperationPlan.load(cfg.operation_plan_path)
+    assert plan.ntasks == 48
+    assert len(plan.groups) == 9
+    job = cfg.main_job_path.read_text()
+    assert job.count("srun --exact") == 9
+    assert "operation_group=8" in job
+
+
+@pytest.mark.parametrize(
+    "fuse_operations, group_multi_target_operations, ngroups",
+    [
+        # Fused vegetation map and dust operations share a group.
+        (True, False, 6),
+        # Vegetation map and dust operations each cover every target grid.
+        (False, True, 5),
+        # Vegetation map and dust operations for every target grid share a group.
+        (True, True, 4),
+    ],
+)
+def test_do_task_prep_grouped_operations(
+    tmp_path_shared: Path,
+    fuse_operations: bool,
+    group_multi_target_operations: bool,
+    ngroups: int,
+) -> None:
+    cfg = create_fake_cfg(tmp_path_shared).model_copy(
+        update={
+            "concurrent_operations": True,
+            "fuse_operations": fuse_operations,
+            "group_multi_target_operations": group_multi_target_operations,
+        }
+    )
+    do_task_prep(cfg)
+    plan = OperationPlan.load(cfg.operation_plan_path)
+    assert len(plan.groups) == ngroups
+
+
+@pytest.mark.parametrize("concurrent_operations", [False, True])
+def test_do_task_prep_launcher(
+    tmp_path_shared: Path, concurrent_operations: bool
+) -> None:
+    cfg = create_fake_cfg(tmp_path_shared).model_copy(
+        update={"concurrent_operations": concurrent_operations}
+    )
+    assert cfg.launcher == Launcher.MPIRUN
+    do_task_prep(cfg)
+    job = cfg.main_job_path.read_text()
+    assert "srun" not in job
+    if concurrent_operations:
+        ngroups = len(OperationPlan.load(cfg.operation_plan_path).groups)
+    else:
+        ngroups = 1
+    assert job.count("mpirun -np") == ngroups
+
+
+def test_do_plan_resources(tmp_path_shared: Path) -> None:
+    cfg = create_fake_cfg(tmp_path_shared).model_copy(
+        update={
+            "concurrent_operations": True,
+            "resources": ResourceLimits(tasks_per_node=8, max_nodes=4),
+        }
+    )
+    plan, template = do_plan_resources(cfg)
+    assert not cfg.root_output_directory.exists()
+    assert len(plan.operations) == 9
+    assert all(ii.elements > 0 for ii in plan.operations)
+    assert f"--nodes={plan.nodes}" in template
+    assert f"-t {plan.wall_time}" in template
+    assert "operation_group=" in template
+
+    do_task_prep(cfg)
+    assert cfg.main_job_path.read_text() == template
+
+
 @pytest.mark.mpi
 def test_run_operations(tmp_path_shared: Path) -> None:
     cfg = create_fake_cfg(tmp_path_shared)
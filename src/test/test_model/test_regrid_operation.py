@@ -2,9 +2,12 @@ from pathlib import Path
 
 import pytest
 
+from regrid_wrapper.context.comm import COMM
 from regrid_wrapper.model.spec import (
     GenerateWeightFileSpec,
     AbstractRegridSpec,
+    RegridFieldsFromWeightFile,
+    _check_on_root_,
 )
 
 
@@ -23,3 +26,44 @@ class TestGenerateWeightFileSpec:
         self, tmp_path_shared: Path, fake_spec: AbstractRegridSpec
     ) -> None:
         assert fake_spec is not None
+
+    def test_resume(self, fake_spec: GenerateWeightFileSpec) -> None:
+        fake_spec.output_weight_filename.touch()
+        kwargs = fake_spec.model_dump(exclude={"resume"})
+        with pytest.raises(IOError):
+            _ = GenerateWeightFileSpec(**kwargs)
+        spec = GenerateWeightFileSpec(**kwargs, resume=True)
+        assert spec.is_complete()
+
+
+@pytest.mark.mpi
+class TestRegridFieldsFromWeightFile:
+    def test_sad_path(self, fake_spec: GenerateWeightFileSpec) -> None:
+        with pytest.raises(IOError):
+            _ = RegridFieldsFromWeightFile(
+                name="name",
+                src_path=fake_spec.src_path,
+                dst_path=fake_spec.dst_path,
+                weight_filename=fake_spec.output_weight_filename,
+                output_filename=fake_spec.output_weight_filename.parent / "out.nc",
+                fields=("foo",),
+            )
+
+
+def _raise_key_error_() -> None:
+    raise KeyError("foo")
+
+
+@pytest.mark.mpi
+def test_check_on_root_any_error() -> None:
+    # Every rank raises the error of rank 0 instead of waiting on it.
+    _ = COMM.value
+    with pytest.raises(KeyError):
+        _check_on_root_(_raise_key_error_)
+
+
+def test_check_on_root_without_mpi(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(COMM, "_comm", None)
+    with pytest.raises(KeyError):
+        _check_on_root_(_raise_key_error_)
+    assert not COMM.is_initialized
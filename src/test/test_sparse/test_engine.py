@@ -0,0 +1,111 @@
+from pathlib import Path
+
+import netCDF4 as nc
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from regrid_wrapper.concrete.rrfs_dust_data import RRFS_DUST_DATA_ENV
+from regrid_wrapper.sparse.engine import (
+    SparseWeights,
+    load_field_stack,
+    regrid_nc_fields,
+)
+from test.conftest import create_dust_data_file, create_weight_file
+
+
+def create_random_matrix(dst_size: int, src_size: int) -> sp.coo_matrix:
+    rng = np.random.default_rng(1)
+    dense = rng.random((dst_size, src_size)) * (rng.random((dst_size, src_size)) < 0.2)
+    # Leave the final destination element unmapped.
+    dense[-1, :] = 0
+    return sp.coo_matrix(dense)
+
+
+class TestSparseWeights:
+
+    @pytest.mark.parametrize("nthreads", [1, 3])
+    def test_apply(self, tmp_path: Path, nthreads: int) -> None:
+        src_shape, dst_shape = (4, 5), (3, 2)
+        matrix = create_random_matrix(6, 20)
+        path = tmp_path / "weights.nc"
+        create_weight_file(path, matrix)
+
+        weights = SparseWeights.from_file(path, src_shape, dst_shape, nthreads=nthreads)
+        stack = np.random.default_rng(2).random((7, 12) + src_shape)
+        actual = weights.apply(stack)
+
+        expected = np.stack(
+            [
+                (matrix @ ii.reshape(-1)).reshape(dst_shape)
+                for ii in stack.reshape((-1,) + src_shape)
+            ]
+        ).reshape((7, 12) + dst_shape)
+        assert actual.shape == expected.shape
+        assert np.allclose(actual, expected)
+
+    def test_apply_keeps_unmapped(self, tmp_path: Path) -> None:
+        path = tmp_path / "weights.nc"
+        create_weight_file(path, create_random_matrix(6, 20))
+        weights = SparseWeights.from_file(path, (4, 5), (3, 2))
+        out = np.full((2, 3, 2), -999.0)
+
+        actual = weights.apply(np.ones((2, 4, 5)), out=out)
+
+        assert actual is out
+        assert not weights.dst_mapped[-1, -1]
+        assert (actual[:, -1, -1] == -999.0).all()
+
+    def test_apply_masked_sources(self, tmp_path: Path) -> None:
+        # Each destination averages two sources.
+        matrix = sp.coo_matrix(
+            np.array([[0.5, 0.5, 0, 0], [0, 0, 0.5, 0.5], [0, 0, 0, 0]])
+        )
+        path = tmp_path / "weights.nc"
+        create_weight_file(path, matrix)
+        weights = SparseWeights.from_file(path, (2, 2), (3,))
+        stack = np.ma.masked_array(
+            [[[1.0, 9.96e36], [3.0, 5.0]], [[1.0, 2.0], [9.96e36, 9.96e36]]],
+            mask=[[[False, True], [False, False]], [[False, False], [True, True]]],
+        )
+
+        actual = weights.apply(stack)
+
+        assert np.allclose(actual[0], [1.0, 4.0, 0.0])
+        assert not np.ma.getmaskarray(actual[0]).any()
+        assert np.allclose(actual[1, :1], [1.5])
+        assert np.ma.getmaskarray(actual[1]).tolist() == [False, True, False]
+
+        out = np.ma.masked_array(np.full((2, 3), -999.0))
+        actual = weights.apply(stack, out=out)
+        assert actual is out
+        assert actual[1, 1] is np.ma.masked
+        assert actual[1, 2] == -999.0
+
+    def test_bad_shape(self, tmp_path: Path) -> None:
+        path = tmp_path / "weights.nc"
+        create_weight_file(path, create_random_matrix(6, 20))
+        with pytest.raises(ValueError):
+            _ = SparseWeights.from_file(path, (4, 4), (3, 2))
+
+
+def test_regrid_nc_fields(tmp_path: Path) -> None:
+    src_path = tmp_path / "src.nc"
+    dst_path = tmp_path / "dst.nc"
+    weight_path = tmp_path / "weights.nc"
+    ds = create_dust_data_file(src_path)
+    _ = create_dust_data_file(dst_path)
+    with nc.Dataset(dst_path, "a") as dst:
+        for field_name in RRFS_DUST_DATA_ENV.fields:
+            dst.variables[field_name][:] = 0
+    shape = ds["geolat"].shape
+    size = int(np.prod(shape))
+    create_weight_file(weight_path, sp.identity(size, format="coo"))
+
+    weights = SparseWeights.from_file(weight_path, shape, shape)
+    regrid_nc_fields(weights, src_path, dst_path, RRFS_DUST_DATA_ENV.fields)
+
+    expected = load_field_stack(src_path, RRFS_DUST_DATA_ENV.fields)
+    actual = load_field_stack(dst_path, RRFS_DUST_DATA_ENV.fields)
+    assert actual.shape == (len(RRFS_DUST_DATA_ENV.fields) * 12,) + shape
+    assert np.allclose(actual, expected)
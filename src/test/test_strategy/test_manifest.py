@@ -0,0 +1,106 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.strategy.manifest import Manifest
+from test.test_strategy.test_core import MockRegridOperation
+from test.test_strategy.test_scheduler import FakeSpec
+
+
+def create_operation(tmp_path: Path) -> MockRegridOperation:
+    src = tmp_path / "src.nc"
+    outputs = (tmp_path / "weights.nc", tmp_path / "output.nc")
+    if COMM.rank == 0:
+        src.write_bytes(b"src")
+        for path in outputs:
+            path.write_bytes(b"output")
+    COMM.barrier()
+    return MockRegridOperation(FakeSpec(name="fake", inputs=(src,), outputs=outputs))
+
+
+@pytest.mark.mpi
+def test_manifest(tmp_path_shared: Path) -> None:
+    op = create_operation(tmp_path_shared)
+    manifest = Manifest(directory=tmp_path_shared / "manifest")
+    assert not manifest.is_complete(op)
+
+    manifest.record(op)
+
+    assert manifest.entry_path("fake").exists()
+    assert manifest.is_complete(op)
+
+
+@pytest.mark.mpi
+def test_manifest_half_written_output(tmp_path_shared: Path) -> None:
+    op = create_operation(tmp_path_shared)
+    manifest = Manifest(directory=tmp_path_shared / "manifest")
+    manifest.record(op)
+
+    if COMM.rank == 0:
+        op.spec.output_paths()[1].write_bytes(b"out")
+    COMM.barrier()
+    assert not manifest.is_complete(op)
+
+    manifest.prepare(op)
+    assert not any(ii.exists() for ii in op.spec.output_paths())
+    assert not manifest.entry_path("fake").exists()
+
+
+@pytest.mark.mpi
+@pytest.mark.parametrize("checksum", [False, True])
+def test_manifest_modified_output(tmp_path_shared: Path, checksum: bool) -> None:
+    op = create_operation(tmp_path_shared)
+    manifest = Manifest(directory=tmp_path_shared / "manifest", checksum=checksum)
+    manifest.record(op)
+    entry = manifest.load("fake")
+    assert all((ii.sha256 is not None) == checksum for ii in entry.outputs)
+
+    # Same size, different contents.
+    if COMM.rank == 0:
+        path = op.spec.output_paths()[1]
+        stat = path.stat()
+        path.write_bytes(b"OUTPUT")
+        if checksum:
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    COMM.barrier()
+    assert not manifest.is_complete(op)
+
+
+@pytest.mark.mpi
+def test_manifest_changed_input(tmp_path_shared: Path) -> None:
+    op = create_operation(tmp_path_shared)
+    manifest = Manifest(directory=tmp_path_shared / "manifest")
+    manifest.record(op)
+
+    if COMM.rank == 0:
+        src = op.spec.input_paths()[0]
+        stat = src.stat()
+        os.utime(src, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    COMM.barrier()
+    assert not manifest.is_complete(op)
+
+
+@pytest.mark.mpi
+def test_manifest_directory_output(tmp_path_shared: Path) -> None:
+    # Unconsolidated zarr stores are directories.
+    store = tmp_path_shared / "output.zarr"
+    chunk = store / "foo" / "c" / "0"
+    if COMM.rank == 0:
+        chunk.parent.mkdir(parents=True)
+        (store / "zarr.json").write_bytes(b"{}")
+        chunk.write_bytes(b"chunk")
+    COMM.barrier()
+    op = MockRegridOperation(FakeSpec(name="fake", inputs=(), outputs=(store,)))
+    manifest = Manifest(directory=tmp_path_shared / "manifest")
+    manifest.record(op)
+    assert manifest.is_complete(op)
+
+    if COMM.rank == 0:
+        chunk.write_bytes(b"chunk-")
+    COMM.barrier()
+    assert not manifest.is_complete(op)
+
+    manifest.prepare(op)
+    assert not store.exists()
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import pytest
+
+from regrid_wrapper.context.instrument import RunReport, SpanStats
+from regrid_wrapper.model.config import ResourceLimits
+from regrid_wrapper.strategy.resources import (
+    ResourceModel,
+    calibrate_resource_model,
+    format_wall_time,
+    plan_resources,
+)
+from test.conftest import create_rrfs_grid_file
+from test.test_strategy.test_core import MockRegridOperation
+from test.test_strategy.test_scheduler import FakeSpec
+
+
+def create_operations(tmp_path: Path) -> list:
+    small = tmp_path / "small.nc"
+    large = tmp_path / "large.nc"
+    # The largest variables are the corner coordinates.
+    _ = create_rrfs_grid_file(small, nlon=9, nlat=9)
+    _ = create_rrfs_grid_file(large, nlon=99, nlat=99)
+    return [
+        MockRegridOperation(FakeSpec(name="small", inputs=(small,))),
+        MockRegridOperation(FakeSpec(name="large", inputs=(large,))),
+    ]
+
+
+def test_format_wall_time() -> None:
+    assert format_wall_time(1) == "00:10:00"
+    assert format_wall_time(3601) == "01:01:00"
+
+
+def test_plan_resources(tmp_path: Path) -> None:
+    ops = create_operations(tmp_path)
+    model = ResourceModel(
+        rank_overhead_bytes=0,
+        bytes_per_element=1000.0,
+        operation_overhead_seconds=1.0,
+        seconds_per_element=0.01,
+    )
+    limits = ResourceLimits(
+        tasks_per_node=2,
+        memory_per_node_bytes=10**7,
+        max_nodes=10,
+        target_seconds=100.0,
+    )
+
+    plan = plan_resources(ops, limits, model)
+
+    assert [ii.elements for ii in plan.operations] == [100, 10000]
+    # One node meets both limits: 10000 * 1000 / 2 bytes per rank and
+    # 2 + 101 / 2 seconds.
+    assert plan.nodes == 1
+    assert plan.estimated_seconds == pytest.approx(2 + 101.0 / 2)
+
+    limits = limits.model_copy(update={"memory_per_node_bytes": 4 * 10**6})
+    plan = plan_resources(ops, limits, model)
+    assert plan.nodes == 3
+    assert plan.memory_per_rank_bytes <= 2 * 10**6
+    assert plan.ntasks == 6
+    assert "large" in plan.format()
+
+
+def test_calibrate_resource_model(tmp_path: Path) -> None:
+    ops = create_operations(tmp_path)
+    base = ResourceModel(rank_overhead_bytes=100, operation_overhead_seconds=1.0)
+
+    def create_stats(duration: float, hwm: int) -> SpanStats:
+        return SpanStats(
+            count=1,
+            min=duration,
+            max=duration,
+            mean=duration,
+            imbalance=1.0,
+            rss_max=hwm,
+            hwm_max=hwm,
+            hwm_growth_max=0,
+        )
+
+    report = RunReport(
+        nproc=4,
+        spans={
+            "small": create_stats(1.25, 100 + 2500),
+            "large": create_stats(26.0, 100 + 250000),
+        },
+        counters={},
+        hwm_by_rank=[0] * 4,
+        hwm_by_host={},
+    )
+
+    actual = calibrate_resource_model(ops, report, base=base)
+
+    assert actual.seconds_per_element == pytest.approx(0.01)
+    assert actual.bytes_per_element == pytest.approx(100.0)
+    assert actual.rank_overhead_bytes == 100
@@ -0,0 +1,62 @@
+from pathlib import Path
+from typing import Tuple
+
+from regrid_wrapper.context.common import PathType
+from regrid_wrapper.model.spec import AbstractRegridSpec
+from regrid_wrapper.strategy.scheduler import OperationPlan, plan_operation_groups
+from test.conftest import create_rrfs_grid_file
+from test.test_strategy.test_core import MockRegridOperation
+
+
+class FakeSpec(AbstractRegridSpec):
+    inputs: Tuple[PathType, ...]
+    outputs: Tuple[PathType, ...] = ()
+
+    def input_paths(self) -> Tuple[Path, ...]:
+        return self.inputs
+
+    def output_paths(self) -> Tuple[Path, ...]:
+        return self.outputs
+
+
+def test_plan_operation_groups(tmp_path: Path) -> None:
+    small = tmp_path / "small.nc"
+    large = tmp_path / "large.nc"
+    _ = create_rrfs_grid_file(small, nlon=10, nlat=10)
+    _ = create_rrfs_grid_file(large, nlon=100, nlat=100)
+    weights = tmp_path / "weights.nc"
+    ops = [
+        MockRegridOperation(FakeSpec(name="small", inputs=(small,))),
+        MockRegridOperation(FakeSpec(name="large", inputs=(large,))),
+        MockRegridOperation(
+            FakeSpec(name="weights", inputs=(small,), outputs=(weights,))
+        ),
+        MockRegridOperation(FakeSpec(name="consumer", inputs=(small, weights))),
+    ]
+
+    plan = plan_operation_groups(ops, 12)
+
+    assert plan.ntasks == 12
+    assert len(plan.groups) == 3
+    assert plan.groups[0].names == ("large",)
+    assert plan.groups[0].ntasks > max(ii.ntasks for ii in plan.groups[1:])
+    assert ("weights", "consumer") in [ii.names for ii in plan.groups]
+
+    path = tmp_path / "plan.json"
+    plan.save(path)
+    assert OperationPlan.load(path) == plan
+
+
+def test_plan_operation_groups_more_operations_than_tasks(tmp_path: Path) -> None:
+    path = tmp_path / "grid.nc"
+    _ = create_rrfs_grid_file(path)
+    ops = [
+        MockRegridOperation(FakeSpec(name=str(ii), inputs=(path,))) for ii in range(5)
+    ]
+
+    plan = plan_operation_groups(ops, 2)
+
+    assert [ii.ntasks for ii in plan.groups] == [1, 1]
+    assert sorted(sum([list(ii.names) for ii in plan.groups], [])) == [
+        str(ii) for ii in range(5)
+    ]